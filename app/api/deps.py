@@ -1,14 +1,18 @@
-from typing import Annotated
-import os
+import secrets
+from functools import cached_property
+from typing import Annotated, AsyncIterator, Callable
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
-from app.core.security import decode_token
+from app.core.cache import CacheBackend, NullCache, build_cache
+from app.core.config import settings
+from app.core.security import decode_token_cached
 
 # --- DB session (PG) ---
-from app.db.database import get_session
+from app.db.database import SessionLocal
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.uow import NullUnitOfWork, UnitOfWork
 
 # Services
 from app.services.auth_service import AuthService
@@ -16,85 +20,238 @@ from app.services.users_service import UsersService
 from app.services.communities_service import CommunitiesService
 from app.services.posts_service import PostsService
 from app.services.onboarding_service import OnboardingService
+from app.services.options_service import OptionsCatalog
+from app.services.community_suggest import CommunitySuggestIndex
 
 # Repos memoria
+from app.repositories.memory.store import MemoryStore
 from app.repositories.memory.users_repo import UsersRepo as UsersRepoMem
 from app.repositories.memory.communities_repo import CommunitiesRepo as CommsRepoMem
 from app.repositories.memory.posts_repo import PostsRepo as PostsRepoMem
 from app.repositories.memory.comments_repo import CommentsRepo as CommentsRepoMem
 
+# Seed memoria (si usamos memoria)
+from app.infra.seed import seed_minimal
+from app.infra.synth import SynthConfig, populate_memory
+
 # Repos PG (nuevos)
 from app.repositories.pg.users_repo_pg import UsersRepoPG
 from app.repositories.pg.communities_repo_pg import CommunitiesRepoPG
 
-# Seed memoria (si usamos memoria)
-from app.infra.seed import seed_minimal
-
 # Repositorios PG
 from app.repositories.pg.posts_repo_pg import PostsRepoPG
 from app.repositories.pg.comments_repo_pg import CommentsRepoPG
+from app.repositories.pg.options_repo_pg import OptionsRepoPG
+
+# Caché de lecturas entre servicios y repos
+from app.repositories.cached import (
+    CachedCommentsRepo, CachedCommunitiesRepo, CachedPostsRepo, CachedUsersRepo,
+)
 
 
 security = HTTPBearer(auto_error=False)
 
-def get_current_user_id(creds: HTTPAuthorizationCredentials | None = Depends(security)) -> str | None:
+async def get_current_user_id(creds: HTTPAuthorizationCredentials | None = Depends(security)) -> str | None:
     if not creds:
         return None
     try:
-        payload = decode_token(creds.credentials)
+        payload = await decode_token_cached(creds.credentials)
         return payload.get("sub")
     except Exception:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido")
 
 UserIdDep = Annotated[str | None, Depends(get_current_user_id)]
 
-BACKEND = os.getenv("STORAGE_BACKEND", "memory").lower()
+async def require_admin(x_admin_token: Annotated[str | None, Header()] = None) -> None:
+    """Endpoints operativos: sin ``ADMIN_TOKEN`` configurado no existen (404)."""
+    if not settings.admin_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Token de administración inválido")
+
+AdminDep = Depends(require_admin)
+
+BACKEND = settings.storage_backend.lower()
+
+# --------- STORE EN MEMORIA (uno por proceso) ---------
+async def build_memory_store() -> MemoryStore:
+    """
+    Crea y siembra el store en memoria. Se llama una sola vez desde el lifespan
+    de la app (ver app/main.py); los repos de cada request comparten esta instancia.
+    """
+    store = MemoryStore()
+    await seed_minimal(store)
+    if settings.memory_synth_scale > 0:
+        await populate_memory(store, SynthConfig().scaled(settings.memory_synth_scale))
+    return store
+
+def get_memory_store(request: Request) -> MemoryStore | None:
+    return getattr(request.app.state, "memory_store", None)
+
+# --------- CACHÉ DE LECTURAS (uno por proceso) ---------
+def build_read_cache() -> CacheBackend:
+    return build_cache(settings.cache_backend, settings.cache_max_entries)
+
+def get_read_cache(request: Request) -> CacheBackend:
+    return getattr(request.app.state, "cache", None) or NullCache()
+
+# --------- OPCIONES PRE-SERIALIZADAS (uno por proceso) ---------
+async def build_options_catalog() -> OptionsCatalog:
+    overrides = None
+    if BACKEND == "pg" and settings.options_source == "db":
+        async with SessionLocal() as session:
+            overrides = await OptionsRepoPG(session).load()
+    return OptionsCatalog(overrides=overrides)
+
+def get_options_catalog(request: Request) -> OptionsCatalog:
+    catalog = getattr(request.app.state, "options_catalog", None)
+    if catalog is None:
+        catalog = request.app.state.options_catalog = OptionsCatalog()
+    return catalog
+
+# --------- AUTOCOMPLETADO DE COMUNIDADES (uno por proceso) ---------
+def get_community_index(request: Request) -> CommunitySuggestIndex | None:
+    return getattr(request.app.state, "community_index", None)
+
+# --------- CONTENEDOR DE SERVICIOS (uno por request) ---------
+class ServiceContainer:
+    """
+    Construye repos y servicios a demanda y los comparte dentro de un mismo request.
+
+    Cada ``_xxx_dep`` pide sólo el servicio que usa la ruta; FastAPI cachea
+    ``get_container`` por request, así que dos dependencias de la misma ruta
+    reciben los mismos repos. La sesión de PG también se abre recién cuando un
+    repo la necesita: las rutas que no tocan la base no ocupan una conexión del pool.
+    """
+
+    def __init__(
+        self,
+        *,
+        store: MemoryStore | None = None,
+        cache: CacheBackend | None = None,
+        vote_buffer=None,
+        session_factory: Callable[[], AsyncSession] | None = None,
+        community_index: CommunitySuggestIndex | None = None,
+    ):
+        self._store = store
+        self._cache = cache
+        self._vote_buffer = vote_buffer
+        self._community_index = community_index
+        self._session_factory = session_factory
+        self._session: AsyncSession | None = None
 
-# --------- FACTORÍA DE REPOS/SERVICIOS ---------
-def build_services(session: AsyncSession | None = None):
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            assert self._session_factory is not None, "AsyncSession requerido para PG"
+            self._session = self._session_factory()
+        return self._session
+
+    @property
+    def store(self) -> MemoryStore:
+        assert self._store is not None, "MemoryStore no inicializado (¿falta el lifespan?)"
+        return self._store
+
+    async def aclose(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @cached_property
+    def uow(self) -> UnitOfWork | NullUnitOfWork:
+        """Transacciones del request; la sesión se pide recién al abrir la primera."""
+        if BACKEND == "pg":
+            return UnitOfWork(lambda: self.session)
+        return NullUnitOfWork()
+
+    def _cached(self, repo, wrapper, ttl: float, **options):
+        if self._cache is None:
+            return repo
+        # las escrituras al caché esperan al COMMIT de la transacción del servicio
+        return wrapper(repo, self._cache, ttl, uow=self.uow, **options)
+
+    # ------- repos -------
+    @cached_property
+    def users_repo(self):
+        repo = UsersRepoPG(self.session) if BACKEND == "pg" else UsersRepoMem(self.store)
+        return self._cached(repo, CachedUsersRepo, settings.cache_ttl_users)
+
+    @cached_property
+    def comms_repo(self):
+        repo = CommunitiesRepoPG(self.session) if BACKEND == "pg" else CommsRepoMem(self.store)
+        return self._cached(
+            repo, CachedCommunitiesRepo, settings.cache_ttl_communities,
+            ranking_ttl=settings.cache_ttl_community_ranking, ranking_size=settings.community_ranking_size,
+        )
+
+    @cached_property
+    def posts_repo(self):
+        repo = PostsRepoPG(self.session) if BACKEND == "pg" else PostsRepoMem(self.store)
+        return self._cached(repo, CachedPostsRepo, settings.cache_ttl_posts)
+
+    @cached_property
+    def comments_repo(self):
+        repo = CommentsRepoPG(self.session) if BACKEND == "pg" else CommentsRepoMem(self.store)
+        return self._cached(repo, CachedCommentsRepo, settings.cache_ttl_posts)
+
+    # ------- servicios -------
+    @cached_property
+    def auth(self) -> AuthService:
+        return AuthService(self.users_repo, self.uow)
+
+    @cached_property
+    def users(self) -> UsersService:
+        return UsersService(self.users_repo, self.uow)
+
+    @cached_property
+    def communities(self) -> CommunitiesService:
+        return CommunitiesService(self.comms_repo, self.uow, self._community_index)
+
+    @cached_property
+    def posts(self) -> PostsService:
+        return PostsService(self.posts_repo, self.comments_repo, self._vote_buffer, self.uow)
+
+    @cached_property
+    def onboarding(self) -> OnboardingService:
+        return OnboardingService(self.users_repo, self.comms_repo, self.uow)
+
+# --- Dependencias inyectables ---
+async def get_container(request: Request) -> AsyncIterator[ServiceContainer]:
+    state = request.app.state
     if BACKEND == "pg":
-        assert session is not None, "AsyncSession requerido para PG"
-        users_repo = UsersRepoPG(session)
-        comms_repo = CommunitiesRepoPG(session)
-        posts_repo = PostsRepoPG(session)        # <<<< PG
-        comments_repo = CommentsRepoPG(session)  # <<<< PG
-        return (
-            AuthService(users_repo),
-            UsersService(users_repo),
-            CommunitiesService(comms_repo),
-            PostsService(posts_repo, comments_repo),
-            OnboardingService(users_repo, comms_repo),
+        container = ServiceContainer(
+            cache=get_read_cache(request),
+            vote_buffer=getattr(state, "vote_buffer", None),
+            session_factory=SessionLocal,
+            community_index=get_community_index(request),
         )
     else:
-        # memoria pura (demo)
-        users_repo = UsersRepoMem()
-        comms_repo = CommsRepoMem()
-        posts_repo = PostsRepoMem(users_repo)
-        comments_repo = CommentsRepoMem()
-        seed_minimal(users_repo, comms_repo, posts_repo, comments_repo)
-        return (
-            AuthService(users_repo),
-            UsersService(users_repo),
-            CommunitiesService(comms_repo),
-            PostsService(posts_repo, comments_repo),
-            OnboardingService(users_repo, comms_repo),
+        container = ServiceContainer(
+            store=get_memory_store(request),
+            cache=get_read_cache(request),
+            community_index=get_community_index(request),
         )
+    try:
+        yield container
+    finally:
+        await container.aclose()
 
-# --- Dependencias inyectables ---
-def _auth_dep(session: AsyncSession = Depends(get_session)) -> AuthService:
-    return build_services(session)[0] if BACKEND == "pg" else build_services()[0]
+ContainerDep = Annotated[ServiceContainer, Depends(get_container)]
+
+def _auth_dep(container: ContainerDep) -> AuthService:
+    return container.auth
 
-def _users_dep(session: AsyncSession = Depends(get_session)) -> UsersService:
-    return build_services(session)[1] if BACKEND == "pg" else build_services()[1]
+def _users_dep(container: ContainerDep) -> UsersService:
+    return container.users
 
-def _comms_dep(session: AsyncSession = Depends(get_session)) -> CommunitiesService:
-    return build_services(session)[2] if BACKEND == "pg" else build_services()[2]
+def _comms_dep(container: ContainerDep) -> CommunitiesService:
+    return container.communities
 
-def _posts_dep(session: AsyncSession = Depends(get_session)) -> PostsService:
-    return build_services(session)[3] if BACKEND == "pg" else build_services()[3]
+def _posts_dep(container: ContainerDep) -> PostsService:
+    return container.posts
 
-def _onboarding_dep(session: AsyncSession = Depends(get_session)) -> OnboardingService:
-    return build_services(session)[4] if BACKEND == "pg" else build_services()[4]
+def _onboarding_dep(container: ContainerDep) -> OnboardingService:
+    return container.onboarding
 
 AuthDep = Annotated[AuthService, Depends(_auth_dep)]
 UsersDep = Annotated[UsersService, Depends(_users_dep)]
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, HTTPException
+
+from app.api.deps import AdminDep
+from app.db.database import get_slow_query_log
+
+router = APIRouter(dependencies=[AdminDep])
+
+
+def _slow_query_log():
+    log = get_slow_query_log()
+    if log is None:
+        raise HTTPException(status_code=404, detail="Registro de consultas lentas deshabilitado (SLOW_QUERY_LOG_ENABLED)")
+    return log
+
+
+@router.get("/admin/slow-queries")
+async def slow_queries(limit: int = 50, shape: str | None = None):
+    log = _slow_query_log()
+    return {
+        "threshold_ms": log.threshold * 1000,
+        "recorded": log.recorded,
+        "items": log.snapshot(limit=max(1, min(limit, 500)), shape=shape),
+    }
+
+
+@router.delete("/admin/slow-queries", status_code=204)
+async def clear_slow_queries():
+    _slow_query_log().clear()
@@ -1,7 +1,6 @@
 from fastapi import APIRouter, HTTPException, status
 from app.api.deps import PostsDep, UserIdDep
 from app.schemas.comments import CommentCreate
-from app.schemas.posts import PostPublic
 
 router = APIRouter()
 
@@ -10,11 +9,11 @@ def list_comments(post_id: str, limit: int = 50, posts: PostsDep = None):
     return {"items": posts.list_comments(post_id, limit)}
 
 @router.post("/posts/{post_id}/comments", status_code=201)
-def add_comment(post_id: str, body: CommentCreate, me: UserIdDep, posts: PostsDep):
+async def add_comment(post_id: str, body: CommentCreate, me: UserIdDep, posts: PostsDep):
     if not me: raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="No autenticado")
-    p = posts.get(post_id, me)
+    p = await posts.get(post_id)
     if not p: raise HTTPException(status_code=404, detail="Post no encontrado")
-    c = posts.add_comment(post_id, me, body)
+    c = await posts.add_comment(post_id=post_id, author_id=me, body=body.content, parent_id=body.parent_id)
     # Devolvemos comentario y post resumido (opcional)
-    updated: PostPublic = posts.get(post_id, me)
+    updated = await posts.get(post_id)
     return {"comment": c, "post": updated}
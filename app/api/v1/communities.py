@@ -1,12 +1,27 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
 from app.api.deps import CommsDep, UserIdDep
-from app.schemas.communities import CommunityCreate, CommunityPublic
+from app.core.conditional import is_fresh, make_etag, not_modified, set_validators
+from app.core.responses import FastJSONResponse
+from app.schemas.common import Page
+from app.schemas.communities import CommunityCreate, CommunityPublic, CommunitySuggestion
 
-router = APIRouter()
+router = APIRouter(default_response_class=FastJSONResponse)
 
-@router.get("/communities", response_model=list[CommunityPublic])
-async def search_communities(q: str | None = None, limit: int = 20, comms: CommsDep = None):
-    return await comms.search(q, limit)
+@router.get("/communities", response_model=Page[CommunityPublic])
+async def search_communities(
+    q: str | None = None, limit: int = Query(20, ge=1, le=100), cursor: str | None = None, comms: CommsDep = None,
+):
+    # CommunityPublic ya validados por el repo: se serializan sin pasar por el response_model
+    return FastJSONResponse(await comms.search(q, limit, cursor))
+
+# Antes de /communities/{community_id}: si no, "suggest" se tomaría como un id
+# response_model=None: la respuesta no se valida, el esquema queda documentado en responses
+@router.get(
+    "/communities/suggest", response_model=None, responses={200: {"model": list[CommunitySuggestion]}},
+)
+async def suggest_communities(prefix: str = "", limit: int = 10, comms: CommsDep = None):
+    # Índice en memoria: no abre sesión ni toca la base
+    return FastJSONResponse(comms.suggest(prefix, limit))
 
 @router.post("/communities", response_model=CommunityPublic, status_code=201)
 async def create_community(body: CommunityCreate, me: UserIdDep, comms: CommsDep):
@@ -14,9 +29,15 @@ async def create_community(body: CommunityCreate, me: UserIdDep, comms: CommsDep
     return await comms.create(body)
 
 @router.get("/communities/{community_id}", response_model=CommunityPublic)
-async def get_community(community_id: str, comms: CommsDep):
-    c = await comms.get(community_id)
+async def get_community(community_id: str, request: Request, response: Response, comms: CommsDep):
+    version = await comms.version(community_id)
+    if version is None: raise HTTPException(status_code=404, detail="No encontrado")
+    etag = make_etag("community", community_id, *version)
+    if is_fresh(request, etag):
+        return not_modified(etag)
+    c = await comms.get(community_id, version)
     if not c: raise HTTPException(status_code=404, detail="No encontrado")
+    set_validators(response, etag)
     return c
 
 @router.post("/communities/{community_id}/join", status_code=204)
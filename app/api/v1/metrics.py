@@ -0,0 +1,79 @@
+from typing import List
+
+from fastapi import APIRouter, Request, Response
+
+from app.api.deps import BACKEND, AdminDep
+from app.core import metrics
+from app.core.config import settings
+from app.core.security import password_hasher
+
+# Expone rutas, volúmenes y estado interno: mismo token que /admin/*
+router = APIRouter(dependencies=[AdminDep])
+
+
+def _pool_lines() -> List[str]:
+    from app.db.database import get_engine
+
+    try:
+        pool = get_engine().pool
+    except RuntimeError:  # todavía sin engine (antes del lifespan)
+        return []
+    return metrics.snapshot_lines(
+        "rau_db_pool_connections", "Conexiones del pool por estado.",
+        [
+            ({"state": "size"}, pool.size()),
+            ({"state": "in_use"}, pool.checkedout()),
+            ({"state": "idle"}, pool.checkedin()),
+            ({"state": "overflow"}, max(pool.overflow(), 0)),
+        ],
+    )
+
+
+def _component_lines(request: Request) -> List[str]:
+    lines: List[str] = []
+    cache = getattr(request.app.state, "cache", None)
+    if cache is not None:
+        stats = cache.stats()
+        lines += metrics.snapshot_lines("rau_cache_entries", "Entradas en el caché de lecturas.", [({}, stats["entries"])])
+        lines += metrics.snapshot_lines(
+            "rau_cache_operations_total", "Lecturas y desalojos del caché de lecturas.",
+            [({"result": k}, stats[k]) for k in ("hits", "misses", "evictions")], kind="counter",
+        )
+
+    hasher = password_hasher.stats()
+    lines += metrics.snapshot_lines(
+        "rau_password_hash_tasks", "Pedidos de bcrypt esperando y en curso.",
+        [({"state": "queued"}, hasher["queued"]), ({"state": "in_flight"}, hasher["in_flight"]),
+         ({"state": "workers"}, hasher["max_workers"])],
+    )
+    lines += metrics.snapshot_lines(
+        "rau_password_hash_completed_total", "Pedidos de bcrypt terminados.", [({}, hasher["completed"])], kind="counter",
+    )
+    lines += metrics.snapshot_lines(
+        "rau_password_hash_wait_seconds_total", "Tiempo total en cola esperando un thread de bcrypt.",
+        [({}, hasher["wait_seconds_total"])], kind="counter",
+    )
+
+    buffer = getattr(request.app.state, "vote_buffer", None)
+    if buffer is not None:
+        lines += metrics.snapshot_lines("rau_vote_buffer_pending", "Votos en memoria sin volcar.", [({}, len(buffer.pending))])
+        lines += metrics.snapshot_lines(
+            "rau_vote_buffer_flushed_total", "Votos volcados a Postgres.", [({}, buffer.flushed_votes)], kind="counter",
+        )
+        lines += metrics.snapshot_lines(
+            "rau_vote_buffer_failed_flushes_total", "Volcados fallidos (se reintentan).",
+            [({}, buffer.failed_flushes)], kind="counter",
+        )
+        lines += metrics.snapshot_lines(
+            "rau_vote_buffer_dropped_total", "Votos descartados por fallar solos al volcarse.",
+            [({}, buffer.dropped_votes)], kind="counter",
+        )
+    return lines
+
+
+@router.get(settings.metrics_path, include_in_schema=False)
+async def prometheus_metrics(request: Request):
+    extra = _component_lines(request)
+    if BACKEND == "pg":
+        extra += _pool_lines()
+    return Response(metrics.render(extra), media_type=metrics.CONTENT_TYPE)
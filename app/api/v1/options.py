@@ -3,38 +3,53 @@ Rutas para obtener opciones de selección en el onboarding.
 
 Estas rutas exponen listas de carreras, años académicos y años de
 graduación. El frontend las utiliza para poblar los campos de
-selección durante el onboarding. En esta versión las opciones se
-generan en memoria; en el futuro podrían provenir de la base de datos.
+selección durante el onboarding. Las respuestas salen ya serializadas
+de ``OptionsCatalog`` (armado en el lifespan), con ETag y un
+``Cache-Control`` largo: los datos cambian a lo sumo una vez por año.
 """
 
-from fastapi import APIRouter
+from typing import Annotated
 
-from app.services.options_service import OptionsService
+from fastapi import APIRouter, Depends, Request, Response
+
+from app.api.deps import get_options_catalog
+from app.core.conditional import is_fresh, not_modified
+from app.services.options_service import STATIC_CACHE_CONTROL, EncodedOptions, OptionsCatalog
 
 router = APIRouter()
 
-_options_service = OptionsService()
+CatalogDep = Annotated[OptionsCatalog, Depends(get_options_catalog)]
+
+
+def _send(request: Request, options: EncodedOptions, cache_control: str) -> Response:
+    if is_fresh(request, options.etag):
+        return not_modified(options.etag, cache_control=cache_control)
+    return Response(
+        content=options.body,
+        media_type="application/json",
+        headers={"ETag": options.etag, "Cache-Control": cache_control},
+    )
 
 
 @router.get("/options/careers", response_model=list[str])
-def get_careers() -> list[str]:
+async def get_careers(request: Request, catalog: CatalogDep) -> Response:
     """
     Devuelve una lista de carreras disponibles para el onboarding.
     """
-    return _options_service.get_careers()
+    return _send(request, catalog.get("careers"), STATIC_CACHE_CONTROL)
 
 
 @router.get("/options/years", response_model=list[str])
-def get_years() -> list[str]:
+async def get_years(request: Request, catalog: CatalogDep) -> Response:
     """
     Devuelve una lista de años académicos disponibles para el onboarding.
     """
-    return _options_service.get_years()
+    return _send(request, catalog.get("years"), STATIC_CACHE_CONTROL)
 
 
 @router.get("/options/grad-years", response_model=list[str])
-def get_grad_years() -> list[str]:
+async def get_grad_years(request: Request, catalog: CatalogDep) -> Response:
     """
     Devuelve una lista de años de graduación estimados para el onboarding.
     """
-    return _options_service.get_grad_years()
+    return _send(request, catalog.grad_years(), catalog.grad_years_cache_control())
@@ -1,11 +1,26 @@
-from fastapi import APIRouter, HTTPException, status
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
 from app.api.deps import PostsDep, UserIdDep
+from app.core.conditional import is_fresh, make_etag, not_modified, set_validators
+from app.core.responses import FastJSONResponse
+from app.services.errors import NotFound
 
-router = APIRouter()
+# Los listados devuelven FastJSONResponse directamente: los repos ya entregan
+# dicts con la forma final, no hace falta re-validarlos ni pasarlos por jsonable_encoder
+router = APIRouter(default_response_class=FastJSONResponse)
 
 @router.get("/posts")
-async def list_posts(communityId: str | None = None, q: str | None = None, limit: int = 20, posts: PostsDep = None):
-    return await posts.list_posts(community_id=communityId, q=q, limit=limit)
+async def list_posts(
+    communityId: str | None = None,
+    q: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
+    sort: Literal["hot", "top", "new"] | None = None,
+    posts: PostsDep = None,
+):
+    page = await posts.list_posts(community_id=communityId, q=q, limit=limit, cursor=cursor, sort=sort)
+    return FastJSONResponse(page)
 
 @router.post("/posts", status_code=201)
 async def create_post(payload: dict, me: UserIdDep, posts: PostsDep):
@@ -20,10 +35,18 @@ async def create_post(payload: dict, me: UserIdDep, posts: PostsDep):
     )
 
 @router.get("/posts/{post_id}")
-async def get_post(post_id: str, posts: PostsDep):
-    post = await posts.get(post_id)
+async def get_post(post_id: str, request: Request, response: Response, posts: PostsDep):
+    # Sólo ETag: los votos no tocan post.actualizado_en, así que no sirve como Last-Modified
+    version = await posts.version(post_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="No encontrado")
+    etag = make_etag("post", post_id, *version)
+    if is_fresh(request, etag):
+        return not_modified(etag)
+    post = await posts.get(post_id, version)
     if not post:
         raise HTTPException(status_code=404, detail="No encontrado")
+    set_validators(response, etag)
     return post
 
 @router.post("/posts/{post_id}/vote")
@@ -33,7 +56,10 @@ async def vote_post(post_id: str, payload: dict, me: UserIdDep, posts: PostsDep)
     value = int(payload.get("value", 0))
     if value not in (-1, 1):
         raise HTTPException(status_code=400, detail="value debe ser -1 o 1")
-    return await posts.vote(post_id=post_id, user_id=me, value=value)
+    try:
+        return await posts.vote(post_id=post_id, user_id=me, value=value)
+    except NotFound:
+        raise HTTPException(status_code=404, detail="No encontrado")
 
 @router.post("/posts/{post_id}/bookmark")
 async def toggle_bookmark(post_id: str, me: UserIdDep, posts: PostsDep):
@@ -42,8 +68,20 @@ async def toggle_bookmark(post_id: str, me: UserIdDep, posts: PostsDep):
     return await posts.toggle_bookmark(post_id=post_id, user_id=me)
 
 @router.get("/posts/{post_id}/comments")
-async def list_post_comments(post_id: str, limit: int = 50, posts: PostsDep = None):
-    return await posts.list_comments(post_id, limit)
+async def list_post_comments(
+    post_id: str,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: str | None = None,
+    format: Literal["flat", "tree"] = "flat",
+    depth: int = 3,
+    children_limit: int = 10,
+    posts: PostsDep = None,
+):
+    if format == "tree":
+        page = await posts.comment_tree(post_id, limit, cursor, depth=depth, children_limit=children_limit)
+    else:
+        page = await posts.list_comments(post_id, limit, cursor)
+    return FastJSONResponse(page)
 
 @router.delete("/posts/{post_id}", status_code=204)
 async def delete_post(post_id: str, me: UserIdDep, posts: PostsDep):
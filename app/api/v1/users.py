@@ -1,18 +1,26 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, Response, status
 from app.api.deps import UsersDep, UserIdDep
+from app.core.conditional import is_fresh, make_etag, not_modified, set_validators
 from app.schemas.users import UserUpdate, UserPublic
 
 router = APIRouter()
 
 @router.get("/users/{user_id}", response_model=UserPublic)
-async def get_user(user_id: str, users: UsersDep):
+async def get_user(user_id: str, request: Request, response: Response, users: UsersDep):
     """
     Devuelve el usuario público con el ID indicado.
-    Si el repositorio subyacente es asíncrono, se hace await.
+    Con ``If-None-Match`` / ``If-Modified-Since`` vigentes responde 304 sin cargar el usuario.
     """
-    user = await users.get(user_id)
+    version = await users.version(user_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="No encontrado")
+    etag, last_modified = make_etag("user", user_id, *version), version[0]
+    if is_fresh(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+    user = await users.get(user_id, version)
     if not user:
         raise HTTPException(status_code=404, detail="No encontrado")
+    set_validators(response, etag, last_modified)
     return user
 
 @router.patch("/users/me", response_model=UserPublic)
@@ -0,0 +1,133 @@
+"""
+Caché de lecturas con TTL y desalojo LRU.
+
+``CacheBackend`` es la interfaz que usan los repos cacheados
+(``app/repositories/cached.py``); es async para que un backend compartido
+entre workers (Redis, Memcached) pueda implementarla sin cambiar a quien la usa.
+
+Implementaciones incluidas:
+
+- ``LocalTTLCache``: dict LRU en el proceso; guarda los objetos tal cual.
+- ``SharedCacheStandIn``: igual, pero serializa los valores con pickle, así que
+  se comporta como un caché compartido (cada lectura devuelve una copia). Sirve
+  para desarrollar y probar contra la semántica de un caché externo.
+- ``NullCache``: no guarda nada (caché deshabilitado).
+"""
+
+from __future__ import annotations
+
+import pickle
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+_MISSING = object()
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> Any:
+        """Devuelve el valor cacheado o ``None`` si no está (o expiró)."""
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float) -> None: ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None: ...
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]: ...
+
+
+class LocalTTLCache(CacheBackend):
+    """LRU acotado a ``max_entries`` con vencimiento por entrada y contadores de hits/misses."""
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _encode(self, value: Any) -> Any:
+        return value
+
+    def _decode(self, value: Any) -> Any:
+        return value
+
+    async def get(self, key: str) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING or entry[0] <= now:
+                if entry is not _MISSING:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            stored = entry[1]
+        return self._decode(stored)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        if value is None or ttl <= 0:
+            return
+        stored = self._encode(value)
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, stored)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    async def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class SharedCacheStandIn(LocalTTLCache):
+    """Caché local con semántica de caché compartido: guarda bytes, devuelve copias."""
+
+    def _encode(self, value: Any) -> Any:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _decode(self, value: Any) -> Any:
+        return pickle.loads(value)
+
+
+class NullCache(CacheBackend):
+    async def get(self, key: str) -> Any:
+        return None
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        return None
+
+    async def delete(self, *keys: str) -> None:
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": 0, "hits": 0, "misses": 0, "evictions": 0}
+
+
+def build_cache(kind: str, max_entries: int) -> CacheBackend:
+    """Factoría según ``Settings.cache_backend``: ``local``, ``shared`` o ``none``."""
+    if kind == "local":
+        return LocalTTLCache(max_entries)
+    if kind == "shared":
+        return SharedCacheStandIn(max_entries)
+    if kind == "none":
+        return NullCache()
+    raise ValueError(f"cache_backend desconocido: {kind!r}")
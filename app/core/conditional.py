@@ -0,0 +1,82 @@
+"""
+GET condicionales (ETag / Last-Modified).
+
+Las rutas piden primero la *versión* del recurso: una consulta barata que sólo
+trae timestamps y contadores, sin joins ni hidratación. Si el cliente ya tiene
+esa versión (``If-None-Match`` / ``If-Modified-Since``) se responde 304 sin
+cargar ni serializar el recurso.
+
+Los ETag son débiles (``W/"..."``): identifican la versión de los datos, no los
+bytes exactos de la respuesta.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts: Any) -> str:
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def http_date(dt: datetime) -> str:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return format_datetime(dt.astimezone(timezone.utc), usegmt=True)
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_fresh(request: Request, etag: str, last_modified: datetime | None = None) -> bool:
+    """
+    ¿La copia del cliente sigue vigente? Comparación débil de ETag; como indica
+    RFC 9110, ``If-Modified-Since`` sólo se mira si no vino ``If-None-Match``.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        return _opaque(etag) in {_opaque(t) for t in if_none_match.split(",")}
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        # la fecha HTTP tiene resolución de segundos
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def _validators(etag: str, last_modified: datetime | None, cache_control: str) -> dict:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def not_modified(etag: str, last_modified: datetime | None = None, cache_control: str = "no-cache") -> Response:
+    return Response(status_code=304, headers=_validators(etag, last_modified, cache_control))
+
+
+def set_validators(
+    response: Response,
+    etag: str,
+    last_modified: datetime | None = None,
+    cache_control: str = "no-cache",
+) -> None:
+    """``no-cache``: el cliente puede guardar la respuesta pero debe revalidarla."""
+    response.headers.update(_validators(etag, last_modified, cache_control))
@@ -11,6 +11,10 @@ class Settings(BaseSettings):
     # Auth
     secret_key: str = "change-this-in-prod"
     access_token_expire_minutes: int = 60
+    bcrypt_rounds: int = 12                   # costo de bcrypt; al cambiarlo se rehashea en el login
+    password_hash_workers: int = 2            # threads dedicados a bcrypt (tope de concurrencia)
+    token_cache_max_entries: int = 10_000     # tokens JWT ya verificados que se recuerdan
+    token_cache_ttl: float = 300.0            # segundos (0 = sin caché); nunca pasa del exp del token
 
     # CORS
     cors_origins: list[str] = ["http://localhost:5173"]
@@ -19,6 +23,71 @@ class Settings(BaseSettings):
     database_url: str | None = None
     database_url_direct: str | None = None
     storage_backend: str = "memory"   # "pg" para usar Postgres
+    memory_synth_scale: float = 0.0   # > 0: el store en memoria arranca con datos sintéticos (app/infra/synth.py)
+
+    # Pool de conexiones (sólo PG; el engine se crea en el lifespan)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_recycle: int = 1800               # segundos; reabre conexiones viejas (-1 = nunca)
+    db_pool_timeout: float = 30.0             # espera máxima por una conexión libre
+    db_pool_pre_ping: bool = True             # valida cada checkout (un round trip extra)
+    db_pool_warmup: int = 2                   # conexiones abiertas al arrancar (tope: db_pool_size)
+    db_statement_cache_size: int | None = None  # caché interno de asyncpg (None = default del driver)
+    # Prepared statements del lado del servidor:
+    #   "prepared"  -> se preparan y se reutilizan por conexión
+    #   "pgbouncer" -> sin caché y con nombres únicos (pgBouncer/Neon en modo transacción)
+    #   "auto"      -> "pgbouncer" si el host es un pooler de Neon (-pooler) o el puerto es 6432
+    db_statement_mode: str = "auto"
+    db_prepared_statement_cache_size: int = 256   # por conexión; alcanza para todas las formas de consulta
+
+    # Opciones de onboarding (/options/*)
+    options_source: str = "static"            # "db": carreras y años desde opcion_onboarding (sólo PG)
+
+    # Ranking de posts (sort=hot)
+    hot_redecay_interval_seconds: int = 300   # cada cuánto se re-decae el hot_score
+    hot_window_days: int = 7                  # sólo se re-decaen posts más nuevos que esto
+
+    # Votos write-behind (sólo backend PG): se acumulan en memoria y se vuelcan por lotes
+    vote_buffer_enabled: bool = False
+    vote_buffer_flush_interval: float = 0.5   # segundos entre volcados
+    vote_buffer_max_batch: int = 500          # volcar antes si se juntan tantos votos
+    vote_buffer_max_pending: int = 50_000     # con tantos votos en espera, se escribe directo
+    vote_buffer_max_failures: int = 3         # volcados fallidos seguidos antes de aislar votos inválidos
+
+    # Métricas (formato Prometheus); el endpoint pide el header X-Admin-Token, como /admin/*
+    metrics_enabled: bool = False
+    metrics_path: str = "/metrics"            # fuera del prefijo de la API
+
+    # Consultas lentas (sólo PG; ver app/db/slow_queries.py)
+    slow_query_log_enabled: bool = False
+    slow_query_threshold_ms: float = 200.0
+    slow_query_explain_sample_rate: float = 0.1   # fracción de SELECT lentos con EXPLAIN (ANALYZE, BUFFERS)
+    slow_query_explain_cooldown: float = 60.0     # segundos mínimos entre dos EXPLAIN de la misma forma
+    slow_query_buffer_size: int = 200             # entradas recientes en memoria
+    slow_query_log_file: str | None = None        # JSON-lines rotado por tamaño (None = sólo memoria)
+    slow_query_log_max_bytes: int = 5_000_000
+    slow_query_log_backups: int = 3
+
+    # Endpoints /admin/*: deshabilitados si no hay token (header X-Admin-Token)
+    admin_token: str | None = None
+
+    # Profiler por request (sólo env dev/staging; ver app/core/profiling.py).
+    # Sin token el middleware no se instala; se dispara con el header X-Profile
+    profiler_token: str | None = None
+    profiler_interval_ms: float = 1.0         # intervalo de muestreo
+    profiler_output_dir: str = "profiles"     # perfiles .folded (flamegraph.pl / speedscope)
+
+    # Caché de lecturas (posts, usuarios, comunidades)
+    cache_backend: str = "local"              # "local" | "shared" (stand-in de caché compartido) | "none"
+    cache_max_entries: int = 10_000
+    cache_ttl_posts: float = 15.0             # segundos
+    cache_ttl_users: float = 300.0
+    cache_ttl_communities: float = 60.0
+    cache_ttl_community_ranking: float = 15.0 # GET /communities sin q (se invalida en este worker al unirse/salir)
+    community_ranking_size: int = 100         # comunidades del ranking cacheado
+
+    # Autocompletado de comunidades (índice en memoria por proceso)
+    community_suggest_refresh_seconds: float = 300.0   # recarga completa (altas de otros workers, miembros)
 
     model_config = SettingsConfigDict(
         env_file=".env",
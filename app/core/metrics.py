@@ -0,0 +1,220 @@
+"""
+Métricas del proceso en formato de texto de Prometheus.
+
+Registro mínimo en memoria (contadores e histogramas con labels) sin
+dependencias externas. Lo alimentan:
+
+- ``MetricsMiddleware``: latencia y cantidad de requests por ruta (el template,
+  p. ej. ``/api/v1/posts/{post_id}``, no la URL concreta), método y status;
+- ``instrument_engine``: eventos del engine de SQLAlchemy que miden cada
+  sentencia por *forma de consulta*. La forma sale de la opción de ejecución
+  ``query_shape`` que llevan las sentencias de los repos PG
+  (``text(...).execution_options(query_shape="PostsRepoPG.list")``); las que
+  no la tienen se agrupan por verbo (``sql:SELECT``);
+- ``TimedQueuePool`` (ver ``app/db/database.py``): espera por una conexión.
+
+Los valores que ya llevan otros componentes (pool, cachés, hasher, buffer de
+votos) se leen recién al exportar, con ``snapshot_lines``; ver ``app/api/v1/metrics.py``.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+POOL_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[Any], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: Any, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines += [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in items]
+        return lines
+
+
+class Histogram:
+    """Histograma acumulativo (``_bucket``/``_sum``/``_count``) por combinación de labels."""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = HTTP_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple, List[float]] = {}  # labels -> [cuenta por bucket..., +Inf, suma]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: Any) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        for labels, series in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), series):
+                cumulative += n
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {series[-1]!r}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+def snapshot_lines(
+    name: str, help: str, samples: Iterable[Tuple[Dict[str, Any], float]], kind: str = "gauge",
+) -> List[str]:
+    """
+    Valor que lleva otro componente, leído en el momento de exportar.
+    ``samples`` son pares (labels, valor); ``kind`` es ``gauge`` o ``counter``.
+    """
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(tuple(labels), tuple(labels.values()))} {_number(value)}")
+    return lines
+
+
+# ------- Métricas del proceso -------
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "rau_http_request_duration_seconds", "Latencia de los requests HTTP por ruta.", ("method", "route"),
+)
+HTTP_REQUESTS = Counter(
+    "rau_http_requests_total", "Requests HTTP por ruta, método y status.", ("method", "route", "status"),
+)
+DB_STATEMENT_SECONDS = Histogram(
+    "rau_db_statement_duration_seconds", "Duración de las sentencias SQL por forma de consulta.", ("shape",),
+    buckets=DB_BUCKETS,
+)
+DB_STATEMENT_ERRORS = Counter(
+    "rau_db_statement_errors_total", "Sentencias SQL que terminaron en error, por forma de consulta.", ("shape",),
+)
+DB_POOL_WAIT_SECONDS = Histogram(
+    "rau_db_pool_checkout_wait_seconds", "Espera para obtener una conexión del pool (incluye abrirla si hace falta).",
+    buckets=POOL_BUCKETS,
+)
+
+_METRICS = (HTTP_REQUEST_SECONDS, HTTP_REQUESTS, DB_STATEMENT_SECONDS, DB_STATEMENT_ERRORS, DB_POOL_WAIT_SECONDS)
+
+
+def render(extra: Iterable[str] = ()) -> str:
+    lines: List[str] = []
+    for metric in _METRICS:
+        lines += metric.render()
+    lines += extra
+    return "\n".join(lines) + "\n"
+
+
+# ------- HTTP -------
+
+def _route_label(scope) -> str:
+    # Las versiones recientes de FastAPI no copian las rutas al incluir un router:
+    # el path completo (con prefijo) queda en el contexto efectivo, no en la ruta
+    effective = (scope.get("fastapi") or {}).get("effective_route_context")
+    path = getattr(effective, "path", None) or getattr(scope.get("route"), "path", None)
+    return path or "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI puro (sin ``BaseHTTPMiddleware``, que suma una tarea y
+    colas por request). La ruta se lee de ``scope["route"]`` después de que el
+    router la resolvió; las URLs que no matchean van a ``<unmatched>`` para no
+    crear una serie por cada path inventado.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = _route_label(scope)
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, scope["method"], route)
+            HTTP_REQUESTS.inc(scope["method"], route, status)
+
+
+# ------- SQLAlchemy -------
+
+def query_shape(context, statement: str) -> str:
+    """Forma de la consulta: la opción ``query_shape`` o, si no está, el verbo SQL."""
+    shape = context.execution_options.get("query_shape") if context is not None else None
+    if shape:
+        return shape
+    verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "?"
+    return f"sql:{verb}"
+
+
+def instrument_engine(engine) -> None:
+    """Registra los eventos de timing en el engine síncrono subyacente del ``AsyncEngine``."""
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["metrics_started"].pop()
+        DB_STATEMENT_SECONDS.observe(time.perf_counter() - started, query_shape(context, statement))
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("metrics_started"):
+            conn.info["metrics_started"].pop()
+        statement = exception_context.statement or ""
+        DB_STATEMENT_ERRORS.inc(query_shape(exception_context.execution_context, statement))
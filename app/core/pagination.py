@@ -0,0 +1,72 @@
+"""
+Cursores opacos para paginación keyset.
+
+Un cursor es la clave de orden del último elemento de la página, serializada
+como JSON y codificada en base64 url-safe. El cliente lo trata como un string
+opaco y lo devuelve tal cual para pedir la página siguiente; los repos lo usan
+como predicado de búsqueda (``WHERE (creado_en, id) < (...)``) en lugar de OFFSET.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+
+class InvalidCursor(ValueError):
+    """El cursor recibido no se pudo decodificar o no tiene la forma esperada."""
+
+
+def encode_cursor(*parts: Any) -> str:
+    payload = [p.isoformat() if isinstance(p, datetime) else p for p in parts]
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _parse_datetime(value: str) -> datetime:
+    # los cursores propios llevan zona; uno sin zona se toma como UTC para
+    # que comparar contra las fechas (aware) de los repos no falle
+    dt = datetime.fromisoformat(value)
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+
+def decode_cursor(cursor: str, *types: Callable[[Any], Any]) -> tuple:
+    """
+    Decodifica ``cursor`` y convierte cada parte con el tipo indicado
+    (``datetime``, ``int``, ``float`` o ``str``). Las partes ``None`` se respetan
+    y las fechas salen siempre en UTC con zona.
+
+    Raises:
+        InvalidCursor: si el cursor está mal formado.
+    """
+    try:
+        parts = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursor("Cursor inválido") from e
+    if not isinstance(parts, list) or len(parts) != len(types):
+        raise InvalidCursor("Cursor inválido")
+    try:
+        return tuple(
+            None if p is None else _parse_datetime(p) if t is datetime else t(p)
+            for t, p in zip(types, parts)
+        )
+    except (TypeError, ValueError) as e:
+        raise InvalidCursor("Cursor inválido") from e
+
+
+def page_window(rows: list, limit: int, key: Callable[[Any], tuple]) -> tuple[list, str | None]:
+    """
+    Recorta ``rows`` (pedidas con ``limit + 1``) a ``limit`` elementos y arma el
+    cursor de la página siguiente con ``key(último elemento)``. Si no sobró
+    ninguna fila, no hay página siguiente y el cursor es ``None``. Con
+    ``limit < 1`` la página queda vacía (las rutas ya lo impiden con ``Query(ge=1)``).
+    """
+    if limit < 1:
+        return [], None
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*key(rows[-1]))
@@ -0,0 +1,237 @@
+"""
+Profiler por request, a pedido (sólo ``env`` dev/staging).
+
+Un request con el header ``X-Profile: <PROFILER_TOKEN>`` se ejecuta con un
+muestreador en un thread aparte que, cada ``profiler_interval_ms``, toma la pila
+del request:
+
+- si la tarea del request está corriendo en el loop, la pila real del thread
+  del loop (handler, servicio, repo, driver...), recortada desde la corrutina
+  raíz de la tarea;
+- si está suspendida, la cadena lógica de ``await`` (``cr_await``) desde el
+  handler hasta lo que se está esperando, con una hoja ``[await <tipo>]``. Así
+  el tiempo de espera de I/O (la consulta a Postgres, bcrypt en su pool)
+  aparece atribuido al repo o servicio que lo pidió.
+
+El resultado está en formato *folded stacks* (``marco;marco;marco N``), que
+leen ``flamegraph.pl``, speedscope o inferno. Se guarda en
+``profiler_output_dir`` y el id vuelve en el header ``X-Profile-Id``; con
+``X-Profile-Return: folded`` la respuesta es el perfil en vez del cuerpo normal.
+
+Si ``env`` no es dev/staging o no hay token, el middleware ni se instala: sin
+costo. Instalado, un request sin el header sólo paga la búsqueda del header.
+Mientras haya al menos un perfil en curso se baja el switch interval del
+proceso (es global); lo restaura el último en terminar.
+Limitación: los endpoints síncronos corren en el threadpool; su tiempo aparece
+como ``[await Future]`` bajo ``run_in_threadpool``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from types import FrameType
+from typing import List, Optional, Tuple
+
+PROFILE_ENVS = ("dev", "staging")
+
+_ROOT = str(Path(__file__).resolve().parents[2]) + os.sep
+
+
+def _label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(_ROOT):
+        filename = filename[len(_ROOT):]
+    elif "site-packages" in filename:
+        filename = filename.split("site-packages" + os.sep, 1)[-1]
+    name = getattr(code, "co_qualname", code.co_name)  # co_qualname: Python 3.11+
+    return f"{name} ({filename}:{code.co_firstlineno})"
+
+
+def _thread_stack(frame: Optional[FrameType]) -> List[FrameType]:
+    stack = []
+    while frame is not None:
+        stack.append(frame)
+        frame = frame.f_back
+    stack.reverse()  # de la raíz a la hoja
+    return stack
+
+
+def _await_chain(coro) -> Tuple[List[FrameType], Optional[str]]:
+    """Marcos de la cadena ``cr_await`` desde ``coro`` y lo que espera la última."""
+    frames = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        nxt = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+        if nxt is not None and not hasattr(nxt, "cr_frame") and not hasattr(nxt, "gi_frame") and not hasattr(nxt, "ag_frame"):
+            # El iterador de ``await future`` (FutureIter) se muestra como lo que es: un Future
+            return frames, f"[await {type(nxt).__name__.removesuffix('Iter')}]"
+        coro = nxt
+    return frames, None
+
+
+# sys.setswitchinterval es del proceso: con perfiles superpuestos, el valor
+# original se guarda al entrar el primero y se restaura al salir el último
+_switch_lock = threading.Lock()
+_switch_users = 0
+_switch_original = 0.0
+
+
+def _lower_switch_interval(interval: float) -> None:
+    global _switch_users, _switch_original
+    with _switch_lock:
+        if _switch_users == 0:
+            _switch_original = sys.getswitchinterval()
+        _switch_users += 1
+        sys.setswitchinterval(min(sys.getswitchinterval(), interval))
+
+
+def _restore_switch_interval() -> None:
+    global _switch_users
+    with _switch_lock:
+        _switch_users -= 1
+        if _switch_users == 0:
+            sys.setswitchinterval(_switch_original)
+
+
+def _below(frames: List[FrameType], origin: FrameType) -> List[FrameType]:
+    """Los marcos debajo de ``origin`` (el middleware), sin el loop ni el servidor."""
+    try:
+        return frames[frames.index(origin) + 1:]
+    except ValueError:
+        return frames
+
+
+class Sampler:
+    """
+    Muestrea la pila de ``task`` (que corre en el thread ``loop_thread``) hasta
+    ``stop``. Las pilas arrancan debajo de ``origin``, el marco del middleware.
+    """
+
+    def __init__(self, task: asyncio.Task, loop: asyncio.AbstractEventLoop, interval: float, origin: FrameType):
+        self.task = task
+        self.loop = loop
+        self.origin = origin
+        self.loop_thread = threading.get_ident()
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.dropped = 0            # muestras descartadas por un error al tomarlas
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self.started = self.finished = 0.0
+
+    def _sample(self) -> None:
+        if asyncio.current_task(self.loop) is self.task:
+            frames = _below(_thread_stack(sys._current_frames().get(self.loop_thread)), self.origin)
+            leaf = None
+        else:
+            frames, leaf = _await_chain(self.task.get_coro())
+            frames = _below(frames, self.origin)
+        labels = [_label(f.f_code) for f in frames]
+        if leaf:
+            labels.append(leaf)
+        if labels and not self._stop.is_set():  # no contar la espera del propio stop()
+            self.samples[";".join(labels)] += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self._sample()
+            except Exception:  # carreras con el loop: se descarta la muestra
+                self.dropped += 1
+
+    def start(self) -> None:
+        # El thread muestreador necesita el GIL: con el switch interval por defecto
+        # (5 ms) sólo lo obtendría cada 5 ms. Se baja mientras dure el perfil
+        _lower_switch_interval(self.interval / 2)
+        self.started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.finished = time.perf_counter()
+        _restore_switch_interval()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in self.samples.most_common())
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class ProfilerMiddleware:
+    def __init__(self, app, *, token: str, interval_ms: float, output_dir: str):
+        self.app = app
+        self.token = token
+        self.interval = interval_ms / 1000
+        self.output_dir = Path(output_dir)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        supplied = _header(scope, b"x-profile")
+        if supplied is None or not secrets.compare_digest(supplied, self.token):
+            await self.app(scope, receive, send)
+            return
+        await self._profile(scope, receive, send)
+
+    async def _profile(self, scope, receive, send):
+        # Se retienen los mensajes de respuesta para poder agregar el id del perfil
+        # (o reemplazar el cuerpo) después de medir el request completo
+        messages = []
+
+        async def capture(message):
+            messages.append(message)
+
+        sampler = Sampler(asyncio.current_task(), asyncio.get_running_loop(), self.interval, sys._getframe())
+        sampler.start()
+        try:
+            await self.app(scope, receive, capture)
+        finally:
+            sampler.stop()
+
+        profile_id = await asyncio.to_thread(self._store, scope, sampler)
+        if (_header(scope, b"x-profile-return") or "").lower() == "folded":
+            body = sampler.folded().encode()
+            await send({
+                "type": "http.response.start", "status": 200,
+                "headers": [(b"content-type", b"text/plain; charset=utf-8"),
+                            (b"content-length", str(len(body)).encode()),
+                            (b"x-profile-id", profile_id.encode())],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+        for message in messages:
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]}
+            await send(message)
+
+    def _store(self, scope, sampler: Sampler) -> str:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        path = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+        profile_id = f"{stamp}-{scope['method']}-{path}"
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        elapsed_ms = (sampler.finished - sampler.started) * 1000
+        header = (
+            f"# {scope['method']} {scope['path']} {elapsed_ms:.1f} ms, "
+            f"{sum(sampler.samples.values())} muestras, {sampler.dropped} descartadas\n"
+        )
+        (self.output_dir / f"{profile_id}.folded").write_text(header + sampler.folded(), encoding="utf-8")
+        return profile_id
@@ -0,0 +1,21 @@
+"""
+Puntaje "hot" de los posts: votos (y algo de actividad en comentarios)
+decaídos por la edad del post, al estilo Hacker News.
+
+La misma fórmula existe en SQL como la función ``post_hot_score`` (ver
+``rau_db_dump_postgres.sql``); si se cambia una hay que cambiar la otra.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+GRAVITY = 1.8
+COMMENT_WEIGHT = 0.5
+AGE_OFFSET_HOURS = 2.0
+
+
+def hot_score(score: int, comments_count: int, created_at: datetime, now: datetime | None = None) -> float:
+    now = now or datetime.now(timezone.utc)
+    age_hours = max((now - created_at).total_seconds(), 0.0) / 3600.0
+    return (score + COMMENT_WEIGHT * comments_count) / (age_hours + AGE_OFFSET_HOURS) ** GRAVITY
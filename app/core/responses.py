@@ -0,0 +1,56 @@
+"""
+Respuesta JSON rápida para los listados calientes.
+
+``FastJSONResponse`` serializa con orjson (si está instalado; si no, con el
+``json`` de la stdlib) y entiende directamente datetimes, dicts de los repos y
+modelos Pydantic. Se habilita por router::
+
+    router = APIRouter(default_response_class=FastJSONResponse)
+
+y las rutas que devuelven formas ya confiables (dicts armados por los repos,
+``Page``) pueden devolver ``FastJSONResponse(data)`` directamente: FastAPI no
+vuelve a validar contra el ``response_model`` ni pasa por ``jsonable_encoder``.
+Esas rutas declaran el esquema con ``response_model=None`` y ``responses=``.
+
+Los datetimes salen en ISO 8601 con el offset tal cual (``+00:00`` para UTC),
+igual que ``datetime.isoformat()`` en ``jsonable_encoder``: un mismo campo
+tiene el mismo formato en el listado y en el detalle.
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # dependencia opcional
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date)):  # sólo llega acá con la stdlib
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"{type(obj).__name__} no es serializable a JSON")
+
+
+class FastJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(
+            content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+        ).encode("utf-8")
@@ -1,9 +1,16 @@
+import asyncio
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
 import jwt
 from passlib.context import CryptContext
+from app.core.cache import LocalTTLCache
 from app.core.config import settings
 
-pwd_ctx = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Si cambia el costo (bcrypt_rounds), los hashes viejos se regeneran en el próximo login
+pwd_ctx = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
 
 def hash_password(plain: str) -> str:
     return pwd_ctx.hash(plain)
@@ -11,6 +18,73 @@ def hash_password(plain: str) -> str:
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd_ctx.verify(plain, hashed)
 
+
+class PasswordHasher:
+    """
+    Ejecuta bcrypt fuera del event loop, en un pool de threads dedicado.
+
+    Cada hash/verify tarda ~100-300 ms de CPU; corriéndolo inline en un handler
+    async se bloquea todo el worker de uvicorn. Acá el pool tiene
+    ``max_workers`` threads (el tope de concurrencia) y el resto de los
+    pedidos espera en la cola del executor. bcrypt libera el GIL mientras
+    calcula, así que los threads alcanzan.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self.queued = 0             # pedidos esperando un thread libre
+        self.in_flight = 0          # pedidos calculando
+        self.completed = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _run(self, enqueued_at: float, fn, *args):
+        waited = time.perf_counter() - enqueued_at
+        with self._lock:
+            self.queued -= 1
+            self.in_flight += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+
+    async def _submit(self, fn, *args):
+        with self._lock:
+            self.queued += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._run, time.perf_counter(), fn, *args)
+
+    async def hash(self, plain: str) -> str:
+        return await self._submit(pwd_ctx.hash, plain)
+
+    async def verify_and_update(self, plain: str, hashed: str | bytes) -> tuple[bool, str | None]:
+        """
+        Verifica la contraseña. Si es correcta pero el hash quedó con una
+        configuración vieja de ``pwd_ctx`` (p.ej. menos rounds), devuelve
+        además el hash nuevo para que el repo lo persista.
+        """
+        return await self._submit(pwd_ctx.verify_and_update, plain, hashed)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "queued": self.queued,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+
+
+password_hasher = PasswordHasher(settings.password_hash_workers)
+
 def create_access_token(sub: str, minutes: int | None = None) -> str:
     """
     Crea un token JWT de acceso para el usuario identificado por ``sub``.
@@ -35,3 +109,24 @@ def create_access_token(sub: str, minutes: int | None = None) -> str:
 
 def decode_token(token: str) -> dict:
     return jwt.decode(token, settings.secret_key, algorithms=["HS256"])
+
+
+# token -> claims ya verificados; cada entrada vence a más tardar en el ``exp`` del token
+_token_cache = LocalTTLCache(settings.token_cache_max_entries)
+
+async def decode_token_cached(token: str) -> dict:
+    """
+    Igual que ``decode_token`` pero recuerda los tokens ya verificados, así una
+    sesión activa no paga la verificación HMAC + parseo en cada request.
+
+    Sólo se cachean tokens válidos, con un TTL que nunca supera su ``exp``
+    (ni ``settings.token_cache_ttl``). Los tokens inválidos se verifican siempre.
+    """
+    claims = await _token_cache.get(token)
+    if claims is None:
+        claims = decode_token(token)
+        ttl = settings.token_cache_ttl
+        if "exp" in claims:
+            ttl = min(ttl, claims["exp"] - time.time())
+        await _token_cache.set(token, claims, ttl)
+    return claims
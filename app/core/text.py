@@ -0,0 +1,47 @@
+"""
+Normalización de texto en español para búsquedas en memoria.
+
+Replica, de forma aproximada, lo que hace Postgres con la configuración
+``spanish`` de full-text search: minúsculas, sin acentos, sin stopwords y
+con un stemming liviano por sufijos. No busca ser un Snowball completo,
+sólo que "apuntes" encuentre "apunte" y "complejidad" encuentre "complejidades".
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import List
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+_STOPWORDS = frozenset("""
+a al algo con contra cual de del desde donde el ella ellas ellos en entre era es esa ese eso esta
+este esto estos estas fue ha hay la las le les lo los mas me mi mis muy no nos o para pero por que
+se sea si sin sobre su sus tambien te tu un una uno unos unas y ya yo
+""".split())
+
+# Sufijos en orden de prueba: los más largos primero
+_SUFFIXES = (
+    "amientos", "imientos", "amiento", "imiento", "aciones", "uciones", "idades",
+    "acion", "ucion", "mente", "idad", "ables", "ibles", "istas", "able", "ible",
+    "ista", "osos", "osas", "oso", "osa", "es", "s", "a", "o", "e",
+)
+
+
+def fold(text: str) -> str:
+    """Minúsculas y sin marcas diacríticas ("Álgebra" -> "algebra")."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def stem(word: str) -> str:
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[: -len(suffix)]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Tokens normalizados y stemmizados, sin stopwords."""
+    return [stem(w) for w in _WORD_RE.findall(fold(text)) if w not in _STOPWORDS]
@@ -1,26 +1,172 @@
+"""
+Engine y sesiones de SQLAlchemy (backend PG).
+
+El engine no se crea al importar el módulo sino en el lifespan de la app
+(``init_engine``), con los parámetros de pool de ``Settings``. Así el backend en
+memoria no necesita ``DATABASE_URL`` y los procesos que no usan la base no
+pagan el costo de crear el pool.
+
+``SessionLocal`` existe desde el import (los módulos lo importan por nombre),
+pero recién queda ligado a un engine después de ``init_engine``.
+"""
+
 from __future__ import annotations
-import os
+
+import asyncio
+import logging
+import time
 from typing import AsyncIterator
+from uuid import uuid4
 
+from sqlalchemy.engine import URL, make_url
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-DATABASE_URL = os.getenv("DATABASE_URL")
-if not DATABASE_URL:
-    raise RuntimeError("DATABASE_URL no está configurada")
+from app.core import metrics
+from app.core.config import settings
+from app.db.slow_queries import SlowQueryLog, instrument_engine as instrument_slow_queries
 
-engine: AsyncEngine = create_async_engine(
-    DATABASE_URL,
-    pool_size=5,             # el pool real lo maneja Neon (pgBouncer); esto es el pool local del cliente
-    max_overflow=10,
-    pool_pre_ping=True,
-)
+logger = logging.getLogger(__name__)
+
+_engine: AsyncEngine | None = None
+_slow_query_log: SlowQueryLog | None = None
 
 SessionLocal = async_sessionmaker(
-    bind=engine,
     expire_on_commit=False,
     class_=AsyncSession,
 )
 
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Pool por defecto de asyncpg que además mide la espera de cada checkout."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.DB_POOL_WAIT_SECONDS.observe(time.perf_counter() - started)
+
+
+def uses_transaction_pooler(url: URL) -> bool:
+    """¿Las conexiones pasan por un pooler en modo transacción? (ver ``db_statement_mode``)"""
+    mode = settings.db_statement_mode
+    if mode != "auto":
+        return mode == "pgbouncer"
+    return "-pooler" in (url.host or "") or url.port == 6432
+
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid4()}__"
+
+
+def _asyncpg_connect_args(url: URL) -> dict:
+    """
+    Estrategia de prepared statements para asyncpg.
+
+    Conexión directa: cada forma de consulta (ver las sentencias a nivel de
+    módulo en ``app/repositories/pg``) se prepara una vez por conexión y se
+    reutiliza: Postgres no la vuelve a parsear y, tras unas pocas ejecuciones,
+    puede quedarse con un plan genérico en vez de planificar en cada llamada.
+
+    Detrás de pgBouncer en modo transacción la conexión del servidor cambia
+    entre transacciones y un statement preparado en una puede no existir (o
+    existir con otro texto) en la siguiente: se desactivan los cachés y cada
+    prepare usa un nombre único.
+    """
+    if uses_transaction_pooler(url):
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": _unique_statement_name,
+        }
+    args = {"prepared_statement_cache_size": settings.db_prepared_statement_cache_size}
+    if settings.db_statement_cache_size is not None:
+        args["statement_cache_size"] = settings.db_statement_cache_size
+    return args
+
+
+def build_engine(url: str | None = None) -> AsyncEngine:
+    url = url or settings.database_url
+    if not url:
+        raise RuntimeError("DATABASE_URL no está configurada")
+    parsed = make_url(url)
+    connect_args = _asyncpg_connect_args(parsed) if parsed.get_driver_name() == "asyncpg" else {}
+    engine = create_async_engine(
+        url,
+        poolclass=TimedQueuePool if settings.metrics_enabled else AsyncAdaptedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_recycle=settings.db_pool_recycle,
+        pool_timeout=settings.db_pool_timeout,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args=connect_args,
+    )
+    if settings.metrics_enabled:
+        metrics.instrument_engine(engine)
+    return engine
+
+
+def _build_slow_query_log() -> SlowQueryLog:
+    return SlowQueryLog(
+        threshold_ms=settings.slow_query_threshold_ms,
+        explain_sample_rate=settings.slow_query_explain_sample_rate,
+        explain_cooldown=settings.slow_query_explain_cooldown,
+        max_entries=settings.slow_query_buffer_size,
+        log_file=settings.slow_query_log_file,
+        log_max_bytes=settings.slow_query_log_max_bytes,
+        log_backups=settings.slow_query_log_backups,
+    )
+
+
+async def warm_up(engine: AsyncEngine, connections: int) -> int:
+    """
+    Abre ``connections`` conexiones en paralelo y las devuelve al pool, para que
+    los primeros requests no paguen el handshake (TCP + TLS + auth).
+    """
+    n = max(0, min(connections, settings.db_pool_size))
+    if not n:
+        return 0
+    conns = await asyncio.gather(*(engine.connect().start() for _ in range(n)), return_exceptions=True)
+    opened = [c for c in conns if not isinstance(c, BaseException)]
+    await asyncio.gather(*(c.close() for c in opened))
+    if len(opened) < n:
+        logger.warning("Warm-up del pool: %d de %d conexiones abiertas", len(opened), n)
+    return len(opened)
+
+
+async def init_engine(url: str | None = None) -> AsyncEngine:
+    """Crea el engine (una vez por proceso), liga ``SessionLocal`` y calienta el pool."""
+    global _engine, _slow_query_log
+    if _engine is None:
+        _engine = build_engine(url)
+        if settings.slow_query_log_enabled:
+            _slow_query_log = _slow_query_log or _build_slow_query_log()
+            instrument_slow_queries(_engine, _slow_query_log)
+        SessionLocal.configure(bind=_engine)
+        await warm_up(_engine, settings.db_pool_warmup)
+    return _engine
+
+
+async def dispose_engine() -> None:
+    global _engine
+    if _engine is not None:
+        await _engine.dispose()
+        _engine = None
+        SessionLocal.configure(bind=None)
+
+
+def get_engine() -> AsyncEngine:
+    if _engine is None:
+        raise RuntimeError("Engine no inicializado (¿falta init_engine en el lifespan?)")
+    return _engine
+
+
+def get_slow_query_log() -> SlowQueryLog | None:
+    """El registro de consultas lentas, o None si está deshabilitado (o el backend no es PG)."""
+    return _slow_query_log
+
+
 async def get_session() -> AsyncIterator[AsyncSession]:
     """
     Dependencia que proporciona una sesión asíncrona de SQLAlchemy.
@@ -0,0 +1,199 @@
+"""
+Registro de consultas lentas (opt-in, ``SLOW_QUERY_LOG_ENABLED=true``).
+
+Eventos del engine miden cada sentencia; las que superan
+``slow_query_threshold_ms`` se registran con:
+
+- el SQL normalizado (espacios colapsados, literales reemplazados por ``?``);
+- la *forma* de los parámetros (tipo y largo, nunca los valores);
+- la duración y la forma de consulta (``query_shape``, ver ``app/core/metrics.py``).
+
+Para una muestra de los SELECT lentos (``slow_query_explain_sample_rate``, y a
+lo sumo uno por forma cada ``slow_query_explain_cooldown`` segundos) se corre
+``EXPLAIN (ANALYZE, BUFFERS)`` en segundo plano, en otra conexión, y el plan se
+agrega a la entrada. Nunca se explican escrituras: ANALYZE ejecuta la sentencia.
+
+Las entradas quedan en un buffer circular en memoria (``GET /admin/slow-queries``)
+y, si se configura ``slow_query_log_file``, en un archivo JSON-lines rotado por tamaño.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.metrics import query_shape
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$:])-?\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+_READS = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+_WRITES = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE)\b", re.IGNORECASE)
+_MAX_SQL_CHARS = 4000
+
+
+def normalize_sql(statement: str) -> str:
+    sql = _STRING_LITERAL.sub("?", statement)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    return _WHITESPACE.sub(" ", sql).strip()[:_MAX_SQL_CHARS]
+
+
+def _value_shape(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, (list, tuple)):
+        inner = {_value_shape(v) for v in value}
+        return f"{type(value).__name__}[{len(value)}]<{'|'.join(sorted(inner)) or '?'}>"
+    if isinstance(value, (str, bytes)):
+        return f"{type(value).__name__}({len(value)})"
+    return type(value).__name__
+
+
+def parameter_shapes(parameters: Any) -> Any:
+    """Tipos (y largos) de los parámetros ligados, sin sus valores."""
+    if isinstance(parameters, dict):
+        return {k: _value_shape(v) for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_value_shape(v) for v in parameters]
+    return _value_shape(parameters)
+
+
+class SlowQueryLog:
+    def __init__(
+        self,
+        *,
+        threshold_ms: float,
+        explain_sample_rate: float = 0.0,
+        explain_cooldown: float = 60.0,
+        max_entries: int = 200,
+        log_file: Optional[str] = None,
+        log_max_bytes: int = 5_000_000,
+        log_backups: int = 3,
+    ):
+        self.threshold = threshold_ms / 1000
+        self.explain_sample_rate = explain_sample_rate
+        self.explain_cooldown = explain_cooldown
+        self.entries: Deque[Dict[str, Any]] = deque(maxlen=max_entries)
+        self.recorded = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._last_explain: Dict[str, float] = {}
+        self._tasks: set = set()
+        self._file_logger: Optional[logging.Logger] = None
+        if log_file:
+            file_logger = logging.getLogger(f"{__name__}.file")
+            file_logger.propagate = False
+            file_logger.setLevel(logging.INFO)
+            if not file_logger.handlers:
+                handler = RotatingFileHandler(log_file, maxBytes=log_max_bytes, backupCount=log_backups, encoding="utf-8")
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                file_logger.addHandler(handler)
+            self._file_logger = file_logger
+
+    # ------- registro -------
+    def _write(self, record: Dict[str, Any]) -> None:
+        if self._file_logger is not None:
+            self._file_logger.info(json.dumps(record, ensure_ascii=False, default=str))
+
+    def record(self, *, shape: str, statement: str, parameters: Any, seconds: float) -> Dict[str, Any]:
+        entry = {
+            "id": next(self._ids),
+            "at": datetime.now(timezone.utc).isoformat(),
+            "shape": shape,
+            "duration_ms": round(seconds * 1000, 3),
+            "sql": normalize_sql(statement),
+            "params": parameter_shapes(parameters),
+            "explain": None,
+        }
+        with self._lock:
+            self.entries.append(entry)
+            self.recorded += 1
+        logger.warning("Consulta lenta (%.1f ms) %s", entry["duration_ms"], shape)
+        self._write(entry)
+        return entry
+
+    def snapshot(self, limit: int = 50, shape: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Las entradas más recientes primero."""
+        with self._lock:
+            items = list(self.entries)
+        if shape:
+            items = [e for e in items if e["shape"] == shape]
+        return items[::-1][:limit]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.entries.clear()
+
+    # ------- EXPLAIN -------
+    def _should_explain(self, shape: str, statement: str) -> bool:
+        if self.explain_sample_rate <= 0 or not _READS.match(statement) or _WRITES.search(statement):
+            return False
+        if random.random() >= self.explain_sample_rate:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_explain.get(shape, float("-inf")) < self.explain_cooldown:
+                return False
+            self._last_explain[shape] = now
+        return True
+
+    async def _explain(self, engine: AsyncEngine, entry: Dict[str, Any], statement: str, parameters: Any) -> None:
+        try:
+            async with engine.connect() as conn:  # sin commit: se descarta al cerrar
+                conn = await conn.execution_options(slow_query_skip=True)
+                res = await conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+                entry["explain"] = "\n".join(row[0] for row in res)
+        except Exception as exc:  # el plan es un extra: nunca debe romper nada
+            entry["explain"] = f"EXPLAIN falló: {exc}"
+        self._write({"id": entry["id"], "shape": entry["shape"], "explain": entry["explain"]})
+
+    def maybe_explain(self, engine: AsyncEngine, entry: Dict[str, Any], statement: str, parameters: Any) -> None:
+        if engine.dialect.name != "postgresql" or not self._should_explain(entry["shape"], statement):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._explain(engine, entry, statement, parameters))
+        self._tasks.add(task)  # referencia fuerte hasta que termine
+        task.add_done_callback(self._tasks.discard)
+
+
+def instrument_engine(engine: AsyncEngine, log: SlowQueryLog) -> None:
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["slow_query_started"].pop()
+        if seconds < log.threshold or context.execution_options.get("slow_query_skip"):
+            return
+        entry = log.record(
+            shape=query_shape(context, statement), statement=statement, parameters=parameters, seconds=seconds,
+        )
+        if not executemany:
+            log.maybe_explain(engine, entry, statement, parameters)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("slow_query_started"):
+            conn.info["slow_query_started"].pop()
@@ -0,0 +1,113 @@
+"""
+Unidad de trabajo: una transacción por llamada de servicio.
+
+Los repos PG sólo ejecutan sentencias sobre la sesión; no hacen ``commit``.
+Quien delimita la transacción es el servicio::
+
+    async with self.uow.transaction():
+        await self.users.set_onboarding(...)
+        await self.comms.join_many(...)
+
+La transacción más externa hace un único COMMIT al salir (o ROLLBACK si salió
+por excepción). Las anidadas abren un SAVEPOINT, así que un paso que falla
+puede deshacerse sin perder lo anterior si el llamador atrapa la excepción.
+
+Lo que no es de la base (escrituras e invalidaciones del caché de lecturas) se
+registra con ``after_commit`` y corre recién después del COMMIT; si la
+transacción (o el SAVEPOINT donde se registró) se deshace, se descarta.
+"""
+
+from __future__ import annotations
+
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+AfterCommit = Callable[[], Awaitable[object]]
+
+
+async def _run_callbacks(callbacks: List[AfterCommit]) -> None:
+    for callback in callbacks:
+        try:
+            await callback()
+        except Exception:  # el COMMIT ya se hizo: un caché caído no debe convertirlo en error
+            logger.exception("Falló un callback post-commit")
+
+
+class UnitOfWork:
+    """
+    Transacciones sobre la sesión del request.
+
+    Recibe una función que devuelve la sesión (no la sesión en sí) para no
+    abrirla hasta que haga falta; ver ``ServiceContainer`` en ``app/api/deps.py``.
+    """
+
+    def __init__(self, session_provider: Callable[[], AsyncSession]):
+        self._session_provider = session_provider
+        self._depth = 0
+        self._callbacks: List[List[AfterCommit]] = []  # uno por nivel abierto
+
+    @property
+    def active(self) -> bool:
+        return self._depth > 0
+
+    async def after_commit(self, callback: AfterCommit) -> None:
+        """Corre ``callback`` después del COMMIT de la transacción abierta (o ya, si no hay)."""
+        if self._callbacks:
+            self._callbacks[-1].append(callback)
+        else:
+            await _run_callbacks([callback])
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[AsyncSession]:
+        session = self._session_provider()
+        if self._depth:
+            self._depth += 1
+            self._callbacks.append([])
+            try:
+                async with session.begin_nested():
+                    yield session
+            except BaseException:
+                self._callbacks.pop()  # SAVEPOINT deshecho: sus callbacks también
+                raise
+            else:
+                callbacks = self._callbacks.pop()
+                self._callbacks[-1].extend(callbacks)
+            finally:
+                self._depth -= 1
+            return
+
+        # Externa: se apoya en el autobegin de la sesión, así que las lecturas
+        # hechas antes de entrar quedan dentro de la misma transacción
+        self._depth = 1
+        self._callbacks = [[]]
+        try:
+            try:
+                yield session
+            except BaseException:
+                await session.rollback()
+                raise
+            await session.commit()
+            callbacks = self._callbacks[0]
+        finally:
+            self._depth = 0
+            self._callbacks = []
+        # ya fuera de la transacción: un callback puede abrir otra
+        await _run_callbacks(callbacks)
+
+
+class NullUnitOfWork:
+    """Backend en memoria: las escrituras se aplican en el acto, no hay nada que confirmar."""
+
+    active = False
+
+    async def after_commit(self, callback: AfterCommit) -> None:
+        await _run_callbacks([callback])
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[None]:
+        yield None
@@ -0,0 +1,72 @@
+"""
+Jobs periódicos del backend.
+
+El lifespan de la app los lanza como tareas de asyncio. También pueden
+correrse una vez desde la línea de comandos (por ejemplo desde un cron)::
+
+    python -m app.infra.jobs
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+from app.core.config import settings
+from app.db.database import SessionLocal, dispose_engine, init_engine
+from app.repositories.memory.communities_repo import CommunitiesRepo as CommsRepoMem
+from app.repositories.memory.posts_repo import PostsRepo as PostsRepoMem
+from app.repositories.memory.store import MemoryStore
+from app.repositories.pg.communities_repo_pg import CommunitiesRepoPG
+from app.repositories.pg.posts_repo_pg import PostsRepoPG
+from app.services.community_suggest import CommunitySuggestIndex
+
+logger = logging.getLogger(__name__)
+
+
+async def redecay_hot(store: MemoryStore | None = None) -> int:
+    """Re-decae el hot_score de los posts recientes (en el store si se pasa, si no en PG)."""
+    if store is not None:
+        return await PostsRepoMem(store).redecay_hot(settings.hot_window_days)
+    async with SessionLocal.begin() as session:
+        return await PostsRepoPG(session).redecay_hot(settings.hot_window_days)
+
+
+async def refresh_community_index(index: CommunitySuggestIndex, store: MemoryStore | None = None) -> int:
+    """Recarga el índice de autocompletado (nombres y miembros) desde el store o PG."""
+    index.begin_refresh()  # las altas de este worker durante la lectura no se pierden
+    if store is not None:
+        entries = await CommsRepoMem(store).index_entries()
+    else:
+        async with SessionLocal() as session:
+            entries = await CommunitiesRepoPG(session).index_entries()
+    index.replace(entries)
+    return len(entries)
+
+
+async def run_every(seconds: float, job: Callable[..., Awaitable[object]], *args) -> None:
+    """Corre ``job(*args)`` cada ``seconds`` segundos hasta que se cancele la tarea."""
+    while True:
+        await asyncio.sleep(seconds)
+        try:
+            await job(*args)
+        except Exception:
+            logger.exception("Falló el job periódico %s", getattr(job, "__name__", job))
+
+
+async def _redecay_once() -> int:
+    await init_engine()
+    try:
+        return await redecay_hot()
+    finally:
+        await dispose_engine()
+
+
+def main() -> None:
+    updated = asyncio.run(_redecay_once())
+    print(f"post: hot_score re-decaído en {updated} fila(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Reconstruye los contadores desnormalizados de ``post`` (upvotes, downvotes,
+score, comments_count) a partir de ``post_voto`` y ``comentario``, y
+``comunidad.member_count`` a partir de ``comunidad_miembro``.
+
+Uso::
+
+    python -m app.infra.reconcile_stats
+"""
+
+import asyncio
+
+from app.db.database import SessionLocal, dispose_engine, init_engine
+from typing import Dict
+
+from app.repositories.pg.communities_repo_pg import CommunitiesRepoPG
+from app.repositories.pg.posts_repo_pg import PostsRepoPG
+
+
+async def reconcile() -> Dict[str, int]:
+    await init_engine()
+    try:
+        async with SessionLocal.begin() as session:
+            return {
+                "post": await PostsRepoPG(session).reconcile_stats(),
+                "comunidad": await CommunitiesRepoPG(session).reconcile_member_counts(),
+            }
+    finally:
+        await dispose_engine()
+
+
+def main() -> None:
+    for table, fixed in asyncio.run(reconcile()).items():
+        print(f"{table}: {fixed} fila(s) con contadores corregidos")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,56 +1,67 @@
 from app.schemas.users import UserCreate
 from app.schemas.communities import CommunityCreate
-from app.schemas.posts import PostCreate
-from app.schemas.comments import CommentCreate
+from app.repositories.memory.store import MemoryStore
 from app.repositories.memory.users_repo import UsersRepo
 from app.repositories.memory.communities_repo import CommunitiesRepo
 from app.repositories.memory.posts_repo import PostsRepo
 from app.repositories.memory.comments_repo import CommentsRepo
 
-def seed_minimal(users: UsersRepo, comms: CommunitiesRepo, posts: PostsRepo, comments: CommentsRepo):
+async def seed_minimal(store: MemoryStore) -> None:
+    """
+    Carga los datos demo en el store en memoria. Se llama una sola vez desde
+    el lifespan de la app; si los datos ya existen no hace nada.
+    """
+    users = UsersRepo(store)
+    comms = CommunitiesRepo(store)
+    posts = PostsRepo(store)
+    comments = CommentsRepo(store)
+
     # Usuarios demo (si no existen)
-    prof = users.get_by_email("prof@ucema.edu.ar")
+    prof = await users.get_by_email("prof@ucema.edu.ar")
     if not prof:
-        prof_pub = users.create(UserCreate(
+        await users.create(UserCreate(
             name="Profe Demo", email="prof@ucema.edu.ar", username="prof",
             role="Profesor", password="secret123"
         ))
-        prof = users.get_by_email("prof@ucema.edu.ar")
-    est = users.get_by_email("est@ucema.edu.ar")
+        prof = await users.get_by_email("prof@ucema.edu.ar")
+    est = await users.get_by_email("est@ucema.edu.ar")
     if not est:
-        est_pub = users.create(UserCreate(
+        await users.create(UserCreate(
             name="Estudiante Demo", email="est@ucema.edu.ar", username="estu",
             role="Estudiante", password="secret123"
         ))
-        est = users.get_by_email("est@ucema.edu.ar")
+        est = await users.get_by_email("est@ucema.edu.ar")
 
     prof_id = prof["id"]
     est_id = est["id"]
 
     # Comunidades demo (si no hay)
     if not comms.data:
-        c1 = comms.create(CommunityCreate(name="Ingeniería Informática", description="Carrera UCEMA"))
-        c2 = comms.create(CommunityCreate(name="Algoritmos y Estructuras", description="AAyED"))
-        c3 = comms.create(CommunityCreate(name="Redes II", description="Routing, TCP/IP, BGP"))
+        c1 = await comms.create(CommunityCreate(name="Ingeniería Informática", description="Carrera UCEMA"))
+        c2 = await comms.create(CommunityCreate(name="Algoritmos y Estructuras", description="AAyED"))
+        c3 = await comms.create(CommunityCreate(name="Redes II", description="Routing, TCP/IP, BGP"))
 
         # Membresías básicas
-        comms.join(c1.id, prof_id)
-        comms.join(c1.id, est_id)
-        comms.join(c2.id, est_id)
-        comms.join(c3.id, est_id)
+        await comms.join(c1.id, prof_id)
+        await comms.join(c1.id, est_id)
+        await comms.join(c2.id, est_id)
+        await comms.join(c3.id, est_id)
 
         # Posts demo
-        p1 = posts.create(prof_id, PostCreate(
-            community_id=c1.id, title="Bienvenidos a RAU", content="Reglas básicas y recursos", tag="Anuncio"
-        ))
-        p2 = posts.create(est_id, PostCreate(
-            community_id=c2.id, title="Duda sobre complejidad", content="¿O(log n) vs O(n)? ejemplo práctico", tag="Pregunta"
-        ))
-        p3 = posts.create(est_id, PostCreate(
-            community_id=c3.id, title="Apuntes para el parcial", content="Comparto mi resumen en PDF", tag="Recurso"
-        ))
+        p1 = await posts.create(
+            community_id=c1.id, author_id=prof_id,
+            title="Bienvenidos a RAU", body="Reglas básicas y recursos", tag="Anuncio",
+        )
+        p2 = await posts.create(
+            community_id=c2.id, author_id=est_id,
+            title="Duda sobre complejidad", body="¿O(log n) vs O(n)? ejemplo práctico", tag="Pregunta",
+        )
+        p3 = await posts.create(
+            community_id=c3.id, author_id=est_id,
+            title="Apuntes para el parcial", body="Comparto mi resumen en PDF", tag="Recurso",
+        )
 
         # Comentarios demo
-        comments.create(p1.id, est_id, CommentCreate(content="¡Gracias, profe!"))
-        comments.create(p2.id, prof_id, CommentCreate(content="Traé el caso y lo vemos."))
-        comments.create(p3.id, prof_id, CommentCreate(content="Buen material."))
+        await comments.create(post_id=p1["id"], author_id=est_id, body="¡Gracias, profe!", parent_id=None)
+        await comments.create(post_id=p2["id"], author_id=prof_id, body="Traé el caso y lo vemos.", parent_id=None)
+        await comments.create(post_id=p3["id"], author_id=prof_id, body="Buen material.", parent_id=None)
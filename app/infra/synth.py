@@ -0,0 +1,501 @@
+"""
+Generador de datos sintéticos a escala (usuarios, membresías, posts,
+comentarios anidados, votos y guardados).
+
+Uso (Postgres, carga masiva con COPY en una sola transacción)::
+
+    python -m app.infra.synth --scale 10            # ~100k usuarios, ~1M posts
+    python -m app.infra.synth --users 50000 --posts 200000 --seed 7
+    python -m app.infra.synth --scale 1 --dry-run   # sólo genera y cuenta filas
+
+Backend en memoria: ``MEMORY_SYNTH_SCALE=0.1`` hace que el lifespan cargue el
+store con ``populate_memory`` después de los datos demo (también sirve para
+los benchmarks: ``python -m benchmarks.run --set memory_synth_scale=0.1``).
+
+Las distribuciones son sesgadas, como en una red social real:
+
+- popularidad de usuarios, comunidades y posts según Zipf (pocos concentran
+  casi toda la actividad);
+- cantidad de comentarios, votos, membresías y guardados con cola de Pareto;
+- respuestas por apego preferencial: los comentarios que ya tienen
+  respuestas atraen más, lo que da hilos profundos y muchas hojas.
+
+Los ids se asignan en bloques contiguos a continuación de los existentes, los
+contadores desnormalizados de ``post`` (votos, comentarios, hot_score) se
+calculan al generar y, al final, se ajustan las secuencias y se corre
+``ANALYZE``. Todos los usuarios comparten la contraseña ``--password``
+(un solo hash de bcrypt). Correr contra una base sin tráfico.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import random
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from sqlalchemy import text
+
+from app.core.ranking import hot_score
+from app.core.security import password_hasher
+from app.repositories.memory.store import MemoryStore
+
+_WORDS = (
+    "parcial final apunte resumen ejercicio práctico teoría clase consulta duda profesor "
+    "cursada materia carrera examen nota entrega trabajo grupo proyecto bibliografía "
+    "finanzas economía contabilidad estadística álgebra análisis cálculo programación "
+    "algoritmos datos redes marketing derecho negocios inversión mercado modelo "
+    "regresión matriz integral derivada función variable tabla gráfico caso empresa "
+    "balance costo riesgo tasa bono acción python sql código repositorio compilar"
+).split()
+
+_SUBJECTS = (
+    "Finanzas", "Economía", "Contabilidad", "Estadística", "Álgebra", "Análisis Matemático",
+    "Programación", "Algoritmos", "Bases de Datos", "Redes", "Marketing", "Derecho",
+    "Negocios", "Ciencia de Datos", "Microeconomía", "Macroeconomía", "Sistemas Operativos",
+    "Ingeniería de Software", "Recursos Humanos", "Comercio Internacional",
+)
+
+_TAGS = ("Pregunta", "Recurso", "Apunte", "Discusión")
+_TAG_WEIGHTS = (50, 20, 20, 10)
+
+
+@dataclass(frozen=True)
+class SynthConfig:
+    users: int = 10_000
+    communities: int = 200
+    posts: int = 100_000
+    comments_per_post: float = 4.0          # medias; la distribución tiene cola larga
+    votes_per_post: float = 12.0
+    comment_votes_per_comment: float = 1.0
+    memberships_per_user: float = 4.0
+    bookmarks_per_user: float = 2.0
+    root_comment_share: float = 0.35        # fracción de comentarios top-level
+    upvote_share: float = 0.8
+    zipf_alpha: float = 1.1                 # exponente de popularidad (Zipf)
+    pareto_tail: float = 1.6                # exponente de los conteos (Pareto, > 1)
+    days: int = 180                         # antigüedad del post más viejo
+    seed: int = 1
+    password: str = "secret123"
+
+    def scaled(self, factor: float) -> "SynthConfig":
+        """Escala usuarios y posts linealmente y las comunidades con la raíz."""
+        return replace(
+            self,
+            users=max(1, round(self.users * factor)),
+            posts=max(1, round(self.posts * factor)),
+            communities=max(1, round(self.communities * factor ** 0.5)),
+        )
+
+
+@dataclass
+class Offsets:
+    """Último id existente por tabla: los generados empiezan en el siguiente."""
+    usuario: int = 0
+    comunidad: int = 0
+    post: int = 0
+    comentario: int = 0
+
+
+@dataclass
+class PostChunk:
+    posts: List[tuple]
+    comments: List[tuple]
+    post_votes: List[tuple]
+    comment_votes: List[tuple]
+
+
+class _Zipf:
+    """Muestrea ids de ``[first, first + n)`` con popularidad ~ 1/rango^alpha."""
+
+    def __init__(self, rng: random.Random, first: int, n: int, alpha: float):
+        self._rng = rng
+        self._ids = list(range(first, first + n))
+        rng.shuffle(self._ids)  # el rango de popularidad no depende del id
+        self._cum = list(itertools.accumulate(r ** -alpha for r in range(1, n + 1)))
+        self._positions = range(n)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def one(self) -> int:
+        return self.sample(1)[0]
+
+    def sample(self, k: int) -> List[int]:
+        return [self._ids[i] for i in self._rng.choices(self._positions, cum_weights=self._cum, k=k)]
+
+    def distinct(self, k: int) -> List[int]:
+        k = min(k, len(self._ids))
+        seen: Dict[int, None] = {}
+        for _ in range(8):  # con mucho sesgo puede costar juntar k distintos: se corta
+            for i in self.sample(k - len(seen)):
+                seen[i] = None
+            if len(seen) >= k:
+                break
+        return list(seen)
+
+
+class Synth:
+    """
+    Genera filas como tuplas en el orden de columnas de las tablas de PG
+    (ver ``_PG_COLUMNS``); ``populate_memory`` las traduce a registros del store.
+    """
+
+    def __init__(self, config: SynthConfig, offsets: Offsets, now: Optional[datetime] = None):
+        self.config = config
+        self.offsets = offsets
+        self.now = now or datetime.now(timezone.utc)
+        self.start = self.now - timedelta(days=config.days)
+        self.rng = random.Random(config.seed)
+        self.user_pop = _Zipf(self.rng, offsets.usuario + 1, config.users, config.zipf_alpha)
+        self.community_pop = _Zipf(self.rng, offsets.comunidad + 1, config.communities, config.zipf_alpha)
+        self.creators: Dict[int, int] = {}  # comunidad_id -> usuario_id
+
+    # ------- helpers -------
+    def _count(self, mean: float, cap: int) -> int:
+        """Entero >= 0 con media ``mean`` y cola de Pareto, acotado a ``cap``."""
+        a = self.config.pareto_tail
+        return min(cap, int(mean * (a - 1) * (self.rng.paretovariate(a) - 1)))
+
+    def _words(self, lo: int, hi: int) -> str:
+        return " ".join(self.rng.choices(_WORDS, k=self.rng.randint(lo, hi)))
+
+    def _at(self, fraction: float) -> datetime:
+        """Instante a ``fraction`` del período generado (0 = inicio, 1 = ahora)."""
+        return self.start + (self.now - self.start) * min(max(fraction, 0.0), 1.0)
+
+    # ------- tablas -------
+    def users(self) -> Iterator[tuple]:
+        """(usuario_id, email, nombrecompleto, username, rol, creado_en)"""
+        n = self.config.users
+        for i in range(n):
+            uid = self.offsets.usuario + 1 + i
+            rol = "Profesor" if self.rng.random() < 0.05 else "Estudiante"
+            yield (uid, f"synth{uid}@alumnos.ucema.edu.ar", f"Usuario Sintético {uid}",
+                   f"synth{uid}", rol, self._at(i / n * 0.5))
+
+    def communities(self) -> Iterator[tuple]:
+        """(comunidad_id, nombre, descripcion, creado_por, creado_en)"""
+        n = self.config.communities
+        for i in range(n):
+            cid = self.offsets.comunidad + 1 + i
+            subject = _SUBJECTS[i % len(_SUBJECTS)]
+            creator = self.user_pop.one()
+            self.creators[cid] = creator
+            yield (cid, f"{subject} {cid}", f"Comunidad de {subject.lower()}", creator, self._at(i / n * 0.5))
+
+    def memberships(self) -> Iterator[tuple]:
+        """(comunidad_id, usuario_id, rol, unido_en); los creadores quedan como 'O'."""
+        owned: Dict[int, List[int]] = {}
+        for cid, uid in self.creators.items():
+            owned.setdefault(uid, []).append(cid)
+        cap = len(self.community_pop)
+        for uid in range(self.offsets.usuario + 1, self.offsets.usuario + 1 + self.config.users):
+            mine = set(owned.get(uid, ()))
+            for cid in mine:
+                yield (cid, uid, "O", self._at(0.5))
+            k = 1 + self._count(self.config.memberships_per_user - 1, cap)
+            for cid in self.community_pop.distinct(k):
+                if cid not in mine:
+                    yield (cid, uid, "U", self._at(0.5 + self.rng.random() * 0.5))
+
+    def post_chunks(self, chunk_size: int) -> Iterator[PostChunk]:
+        """
+        Posts con sus comentarios y votos, en bloques. Dentro de cada post los
+        comentarios salen en orden de creación y los ids crecen con el tiempo.
+        """
+        cfg = self.config
+        a = cfg.pareto_tail
+        comment_id = self.offsets.comentario
+        for first in range(0, cfg.posts, chunk_size):
+            chunk = PostChunk([], [], [], [])
+            for i in range(first, min(first + chunk_size, cfg.posts)):
+                pid = self.offsets.post + 1 + i
+                created = self._at(i / cfg.posts + self.rng.uniform(-0.001, 0.001))
+                # una sola "popularidad" por post para comentarios y votos: los
+                # posts con muchos votos son también los más comentados
+                popularity = (a - 1) * (self.rng.paretovariate(a) - 1)
+                n_comments = min(5_000, int(popularity * cfg.comments_per_post))
+                n_votes = min(len(self.user_pop), int(popularity * cfg.votes_per_post))
+
+                up = down = 0
+                for uid in self.user_pop.distinct(n_votes):
+                    value = 1 if self.rng.random() < cfg.upvote_share else -1
+                    up += value == 1
+                    down += value == -1
+                    chunk.post_votes.append((pid, uid, value, created))
+
+                attach: List[int] = []  # apego preferencial: un id por comentario y por respuesta recibida
+                t = created
+                for _ in range(n_comments):
+                    comment_id += 1
+                    t = min(self.now, t + timedelta(minutes=self.rng.expovariate(1 / 30)))
+                    parent = None
+                    if attach and self.rng.random() >= cfg.root_comment_share:
+                        parent = self.rng.choice(attach)
+                        attach.append(parent)
+                    attach.append(comment_id)
+                    chunk.comments.append((comment_id, pid, self.user_pop.one(), parent, self._words(3, 40), t))
+                    for uid in self.user_pop.distinct(self._count(cfg.comment_votes_per_comment, 1_000)):
+                        value = 1 if self.rng.random() < cfg.upvote_share else -1
+                        chunk.comment_votes.append((comment_id, uid, value, t))
+
+                score = up - down
+                chunk.posts.append((
+                    pid, self.community_pop.one(), self.user_pop.one(),
+                    self._words(4, 10).capitalize(), self._words(10, 80),
+                    created, created, "A", self.rng.choices(_TAGS, weights=_TAG_WEIGHTS)[0],
+                    up, down, score, n_comments, hot_score(score, n_comments, created, self.now),
+                ))
+            yield chunk
+
+    def bookmarks(self) -> Iterator[tuple]:
+        """(post_id, usuario_id, guardado_en)"""
+        post_pop = _Zipf(self.rng, self.offsets.post + 1, self.config.posts, self.config.zipf_alpha)
+        for uid in range(self.offsets.usuario + 1, self.offsets.usuario + 1 + self.config.users):
+            for pid in post_pop.distinct(self._count(self.config.bookmarks_per_user, 500)):
+                yield (pid, uid, self._at(0.5 + self.rng.random() * 0.5))
+
+
+# ------- Postgres -------
+
+_PG_COLUMNS = {
+    "usuario": ("usuario_id", "email", "nombrecompleto", "username", "rol", "creado_en", "password_hash"),
+    "comunidad": ("comunidad_id", "nombre", "descripcion", "creado_por", "creado_en"),
+    "comunidad_miembro": ("comunidad_id", "usuario_id", "rol", "unido_en"),
+    "post": ("post_id", "comunidad_id", "autor_id", "titulo", "cuerpo", "creado_en", "actualizado_en",
+             "estado", "etiqueta", "upvotes", "downvotes", "score", "comments_count", "hot_score"),
+    "comentario": ("comentario_id", "post_id", "autor_id", "comentario_padre_id", "cuerpo", "creado_en"),
+    "post_voto": ("post_id", "usuario_id", "valor", "votado_en"),
+    "comentario_voto": ("comentario_id", "usuario_id", "valor", "votado_en"),
+    "post_guardado": ("post_id", "usuario_id", "guardado_en"),
+}
+
+_OFFSETS = text("""
+    SELECT
+      (SELECT COALESCE(MAX(usuario_id), 0) FROM usuario),
+      (SELECT COALESCE(MAX(comunidad_id), 0) FROM comunidad),
+      (SELECT COALESCE(MAX(post_id), 0) FROM post),
+      (SELECT COALESCE(MAX(comentario_id), 0) FROM comentario)
+""")
+
+_SETVAL = text("""
+    SELECT
+      setval(pg_get_serial_sequence('usuario', 'usuario_id'), (SELECT MAX(usuario_id) FROM usuario)),
+      setval(pg_get_serial_sequence('comunidad', 'comunidad_id'), (SELECT MAX(comunidad_id) FROM comunidad)),
+      setval(pg_get_serial_sequence('post', 'post_id'), (SELECT MAX(post_id) FROM post)),
+      setval(pg_get_serial_sequence('comentario', 'comentario_id'), (SELECT MAX(comentario_id) FROM comentario))
+""")
+
+# COPY no pasa por CommunitiesRepoPG.join: member_count de las comunidades nuevas
+_MEMBER_COUNTS = text("""
+    UPDATE comunidad c SET member_count = s.n
+    FROM (
+      SELECT comunidad_id, COUNT(*)::int AS n
+      FROM comunidad_miembro
+      WHERE comunidad_id > :after
+      GROUP BY comunidad_id
+    ) s
+    WHERE c.comunidad_id = s.comunidad_id
+""")
+
+_COPY_BATCH = 50_000
+
+
+def _batched(rows: Iterable[tuple], size: int) -> Iterator[List[tuple]]:
+    it = iter(rows)
+    while batch := list(itertools.islice(it, size)):
+        yield batch
+
+
+async def load_pg(config: SynthConfig, *, chunk_posts: int = 5_000, now: Optional[datetime] = None) -> Dict[str, int]:
+    """Genera y carga todo con COPY en una transacción. Devuelve filas por tabla."""
+    from app.db.database import dispose_engine, get_engine, init_engine
+
+    await init_engine()
+    counts = dict.fromkeys(_PG_COLUMNS, 0)
+    try:
+        password_hash = (await password_hasher.hash(config.password)).encode()
+        async with get_engine().begin() as conn:
+            offsets = Offsets(*(await conn.execute(_OFFSETS)).one())
+            synth = Synth(config, offsets, now)
+            raw = (await conn.get_raw_connection()).driver_connection
+
+            async def copy(table: str, rows: Sequence[tuple]) -> None:
+                if rows:
+                    await raw.copy_records_to_table(table, records=rows, columns=_PG_COLUMNS[table])
+                    counts[table] += len(rows)
+
+            for batch in _batched(synth.users(), _COPY_BATCH):
+                await copy("usuario", [row + (password_hash,) for row in batch])
+            await copy("comunidad", list(synth.communities()))
+            for batch in _batched(synth.memberships(), _COPY_BATCH):
+                await copy("comunidad_miembro", batch)
+            await conn.execute(_MEMBER_COUNTS, {"after": offsets.comunidad})
+            for chunk in synth.post_chunks(chunk_posts):
+                await copy("post", chunk.posts)
+                await copy("comentario", chunk.comments)
+                await copy("post_voto", chunk.post_votes)
+                await copy("comentario_voto", chunk.comment_votes)
+            for batch in _batched(synth.bookmarks(), _COPY_BATCH):
+                await copy("post_guardado", batch)
+            await conn.execute(_SETVAL)
+        # ANALYZE fuera de la transacción de carga: estadísticas al día para el planner
+        async with get_engine().connect() as conn:
+            await conn.execute(text(f"ANALYZE {', '.join(_PG_COLUMNS)}"))
+            await conn.commit()
+    finally:
+        await dispose_engine()
+    return counts
+
+
+def generate_only(config: SynthConfig, *, chunk_posts: int = 5_000) -> Dict[str, int]:
+    """Genera sin escribir en ningún lado (para medir tamaños y tiempos)."""
+    synth = Synth(config, Offsets())
+    counts = {
+        "usuario": sum(1 for _ in synth.users()),
+        "comunidad": sum(1 for _ in synth.communities()),
+        "comunidad_miembro": sum(1 for _ in synth.memberships()),
+        "post": 0, "comentario": 0, "post_voto": 0, "comentario_voto": 0,
+    }
+    for chunk in synth.post_chunks(chunk_posts):
+        counts["post"] += len(chunk.posts)
+        counts["comentario"] += len(chunk.comments)
+        counts["post_voto"] += len(chunk.post_votes)
+        counts["comentario_voto"] += len(chunk.comment_votes)
+    counts["post_guardado"] = sum(1 for _ in synth.bookmarks())
+    return counts
+
+
+# ------- Store en memoria -------
+
+async def populate_memory(store: MemoryStore, config: SynthConfig, now: Optional[datetime] = None) -> Dict[str, int]:
+    """Carga los datos sintéticos en el store, con los mismos registros que crean los repos en memoria."""
+    password_hash = await password_hasher.hash(config.password)
+    with store.lock:
+        offsets = Offsets(
+            usuario=store.reserve_ids("usuario", config.users) - 1,
+            comunidad=store.reserve_ids("comunidad", config.communities) - 1,
+            post=store.reserve_ids("post", config.posts) - 1,
+        )
+        synth = Synth(config, offsets, now)
+        counts = dict.fromkeys(_PG_COLUMNS, 0)
+
+        for uid, email, name, username, role, created in synth.users():
+            rec = {
+                "id": str(uid), "usuario_id": str(uid), "name": name, "username": username,
+                "email": email, "role": role, "password_hash": password_hash,
+                "avatar_url": None, "title": None, "bio": None,
+                "created_at": created, "updated_at": created,
+            }
+            store.users[rec["id"]] = rec
+            store.index_user(rec)
+            counts["usuario"] += 1
+
+        for cid, name, description, _creator, created in synth.communities():
+            store.communities[str(cid)] = {
+                "id": str(cid), "name": name, "description": description,
+                "created_at": created, "updated_at": created,
+            }
+            store.members[str(cid)] = set()
+            counts["comunidad"] += 1
+
+        for cid, uid, _rol, _joined in synth.memberships():
+            store.members[str(cid)].add(str(uid))
+            counts["comunidad_miembro"] += 1
+
+        # la cantidad de comentarios recién se conoce al generarlos: se avanza la secuencia al final
+        synth.offsets.comentario = last_comment = store.reserve_ids("comentario", 0) - 1
+        new_posts: List[dict] = []
+        for chunk in synth.post_chunks(5_000):
+            for (pid, cid, author, title, body, created, updated, status, tag,
+                 up, down, score, n_comments, hot) in chunk.posts:
+                rec = {
+                    "id": str(pid), "community_id": str(cid), "author_id": str(author),
+                    "title": title, "body": body, "tag": tag, "best_comment_id": None,
+                    "created_at": created, "updated_at": updated, "status": status,
+                    "upvotes": up, "downvotes": down, "score": score,
+                    "comments_count": n_comments, "hot_score": hot,
+                }
+                store.posts[rec["id"]] = rec
+                new_posts.append(rec)
+            for pid, uid, value, _at in chunk.post_votes:
+                store.post_votes.setdefault(str(pid), {})[str(uid)] = value
+            for comment_id, pid, author, parent, body, created in chunk.comments:
+                rec = {
+                    "id": str(comment_id), "post_id": str(pid), "author_id": str(author),
+                    "parent_id": str(parent) if parent is not None else None,
+                    "body": body, "created_at": created, "updated_at": created,
+                }
+                store.comments[rec["id"]] = rec
+                store.index_comment(rec)
+                last_comment = comment_id
+            for comment_id, uid, value, _at in chunk.comment_votes:
+                store.comment_votes.setdefault(str(comment_id), {})[str(uid)] = value
+            counts["post"] += len(chunk.posts)
+            counts["comentario"] += len(chunk.comments)
+            counts["post_voto"] += len(chunk.post_votes)
+            counts["comentario_voto"] += len(chunk.comment_votes)
+        store.index_posts_bulk(new_posts)
+        store.advance_ids("comentario", last_comment)
+
+        for pid, uid, _at in synth.bookmarks():
+            store.bookmarks.add((str(pid), str(uid)))
+            counts["post_guardado"] += 1
+    return counts
+
+
+# ------- CLI -------
+
+def main(argv: Optional[List[str]] = None) -> None:
+    defaults = SynthConfig()
+    parser = argparse.ArgumentParser(prog="python -m app.infra.synth", description="Carga datos sintéticos en Postgres")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplica usuarios y posts (comunidades: raíz)")
+    parser.add_argument("--users", type=int, help=f"default {defaults.users} x scale")
+    parser.add_argument("--communities", type=int, help=f"default {defaults.communities} x sqrt(scale)")
+    parser.add_argument("--posts", type=int, help=f"default {defaults.posts} x scale")
+    parser.add_argument("--comments-per-post", type=float, default=defaults.comments_per_post)
+    parser.add_argument("--votes-per-post", type=float, default=defaults.votes_per_post)
+    parser.add_argument("--memberships-per-user", type=float, default=defaults.memberships_per_user)
+    parser.add_argument("--bookmarks-per-user", type=float, default=defaults.bookmarks_per_user)
+    parser.add_argument("--zipf-alpha", type=float, default=defaults.zipf_alpha)
+    parser.add_argument("--days", type=int, default=defaults.days)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--password", default=defaults.password)
+    parser.add_argument("--chunk-posts", type=int, default=5_000, help="posts por bloque de COPY")
+    parser.add_argument("--dry-run", action="store_true", help="generar y contar sin escribir en la base")
+    args = parser.parse_args(argv)
+    if args.zipf_alpha <= 0:
+        parser.error("--zipf-alpha debe ser > 0")
+
+    config = replace(
+        defaults.scaled(args.scale),
+        comments_per_post=args.comments_per_post,
+        votes_per_post=args.votes_per_post,
+        memberships_per_user=args.memberships_per_user,
+        bookmarks_per_user=args.bookmarks_per_user,
+        zipf_alpha=args.zipf_alpha,
+        days=args.days,
+        seed=args.seed,
+        password=args.password,
+    )
+    overrides = {k: getattr(args, k) for k in ("users", "communities", "posts") if getattr(args, k)}
+    config = replace(config, **overrides)
+
+    started = time.perf_counter()
+    if args.dry_run:
+        counts = generate_only(config, chunk_posts=args.chunk_posts)
+    else:
+        counts = asyncio.run(load_pg(config, chunk_posts=args.chunk_posts))
+    elapsed = time.perf_counter() - started
+    for table, n in counts.items():
+        print(f"{table:<18} {n:>12,}")
+    print(f"{sum(counts.values()):,} filas en {elapsed:.1f}s" + (" (dry-run)" if args.dry_run else ""))
+
+
+if __name__ == "__main__":
+    main()
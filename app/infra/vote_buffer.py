@@ -0,0 +1,207 @@
+"""
+Buffer write-behind para votos de posts.
+
+Con ``Settings.vote_buffer_enabled`` (sólo backend PG), ``POST /posts/{id}/vote``
+no escribe en la base: registra el voto en memoria, coalescido por
+(post, usuario) — si alguien cambia su voto varias veces sólo persiste el
+último — y responde al instante con un puntaje optimista. Una tarea de fondo
+vuelca el buffer en un único upsert multi-fila cada ``flush_interval``
+segundos, o antes si se juntan ``max_batch`` votos. En el shutdown se espera
+el volcado en curso y se hace uno último (con reintentos) antes de cerrar.
+
+Un lote que falla vuelve entero a ``pending``. Tras ``max_failures`` fallos
+seguidos el próximo volcado parte el lote en mitades hasta aislar los votos
+que fallan solos (p. ej. de un usuario borrado) y los descarta; si ningún
+sub-lote prospera, lo que falla es la base y se sigue reintentando. Con
+``max_pending`` votos en espera ``add`` rechaza los nuevos (``VoteBufferFull``)
+y el servicio los escribe directo.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Iterable, List, Tuple
+
+from app.core.cache import CacheBackend
+from app.db.database import SessionLocal
+from app.repositories.cached import post_key
+from app.repositories.pg.posts_repo_pg import PostsRepoPG
+
+logger = logging.getLogger(__name__)
+
+Vote = Tuple[str, str, int]  # (post_id, usuario_id, valor)
+
+
+class VoteBufferFull(RuntimeError):
+    """El buffer llegó a ``max_pending``: el voto hay que escribirlo directo."""
+
+
+class VoteBuffer:
+    def __init__(
+        self,
+        flush_fn: Callable[[List[Vote]], Awaitable[Iterable[str]]],
+        *,
+        flush_interval: float,
+        max_batch: int,
+        max_pending: int = 50_000,
+        max_failures: int = 3,
+        cache: CacheBackend | None = None,
+    ):
+        """
+        Args:
+            flush_fn: persiste un lote de votos y devuelve los post_id actualizados.
+            max_pending: tope de votos en espera; más allá ``add`` los rechaza.
+            max_failures: fallos seguidos antes de partir el lote para aislar votos inválidos.
+            cache: caché de lecturas a invalidar para los posts volcados.
+        """
+        self.flush_fn = flush_fn
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.max_failures = max_failures
+        self.cache = cache
+        self.pending: Dict[Tuple[str, str], int] = {}
+        self.flushed_votes = 0
+        self.failed_flushes = 0
+        self.dropped_votes = 0
+        self._consecutive_failures = 0
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._inflight: asyncio.Task | None = None
+
+    def add(self, post_id: str, user_id: str, value: int) -> int:
+        """
+        Encola el voto y devuelve el valor que estaba pendiente para ese (post,
+        usuario), o 0. Reemplazar un voto pendiente siempre se acepta; uno
+        nuevo con el buffer lleno levanta ``VoteBufferFull``.
+        """
+        key = (post_id, user_id)
+        if key not in self.pending and len(self.pending) >= self.max_pending:
+            self._wake.set()
+            raise VoteBufferFull(f"{len(self.pending)} votos pendientes")
+        prev = self.pending.get(key, 0)
+        self.pending[key] = value
+        if len(self.pending) >= self.max_batch:
+            self._wake.set()
+        return prev
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            if not self.pending:
+                return 0
+            batch, self.pending = self.pending, {}
+            votes = sorted((pid, uid, val) for (pid, uid), val in batch.items())
+            dropped: List[Vote] = []
+            try:
+                if self._consecutive_failures >= self.max_failures and len(votes) > 1:
+                    post_ids = await self._flush_isolating(votes, dropped)
+                else:
+                    post_ids = await self.flush_fn(votes)
+            except BaseException:
+                # también si se cancela: se re-encolan sin pisar votos más nuevos
+                # que hayan llegado mientras tanto (los ya volcados de un lote
+                # partido se vuelven a escribir: el upsert es idempotente)
+                for key, val in batch.items():
+                    self.pending.setdefault(key, val)
+                self.failed_flushes += 1
+                self._consecutive_failures += 1
+                raise
+            self._consecutive_failures = 0
+            self.flushed_votes += len(votes) - len(dropped)
+        if self.cache is not None:
+            await self.cache.delete(*(post_key(str(pid)) for pid in post_ids))
+        return len(votes) - len(dropped)
+
+    async def _flush_isolating(self, votes: List[Vote], dropped: List[Vote]) -> List[str]:
+        """
+        Vuelca ``votes`` partiendo en mitades los sub-lotes que fallan. Los votos
+        que fallan solos se descartan (y se agregan a ``dropped``) sólo si algún
+        sub-lote prosperó: si todo falla, o fallan más intentos seguidos que los
+        necesarios para aislar un par de votos, el problema es la base y se
+        re-lanza el último error sin descartar nada.
+        """
+        budget = (len(votes) - 1).bit_length() + 2
+        misses = 0
+        succeeded = False
+        suspects: List[Tuple[Vote, Exception]] = []
+        post_ids: List[str] = []
+        stack = [votes]
+        while stack:
+            chunk = stack.pop()
+            try:
+                post_ids.extend(await self.flush_fn(chunk))
+                misses, succeeded = 0, True
+            except Exception as exc:
+                misses += 1
+                if misses > budget:
+                    raise
+                if len(chunk) > 1:
+                    half = len(chunk) // 2
+                    stack.extend([chunk[half:], chunk[:half]])
+                else:
+                    suspects.append((chunk[0], exc))
+        if not succeeded:
+            raise suspects[-1][1]
+        for vote, exc in suspects:
+            dropped.append(vote)
+            self.dropped_votes += 1
+            logger.error("Voto descartado tras %d volcados fallidos: %s (%r)",
+                         self._consecutive_failures, vote, exc)
+        return post_ids
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            # En una tarea aparte y con shield: cancelar el loop (stop) no corta
+            # un volcado a mitad de camino; stop() lo espera
+            self._inflight = asyncio.create_task(self.flush())
+            try:
+                await asyncio.shield(self._inflight)
+            except Exception:
+                logger.exception("Falló el volcado del buffer de votos (%d pendientes)", len(self.pending))
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, retries: int = 3, retry_delay: float = 0.5) -> None:
+        """
+        Detiene la tarea de fondo, espera el volcado en curso y vuelca lo
+        pendiente, reintentando ``retries`` veces. Si aun así falla, los votos
+        quedan en ``pending`` y se registran en el log (no se re-lanza: el
+        shutdown sigue).
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._inflight is not None and not self._inflight.done():
+            try:
+                await self._inflight
+            except Exception:
+                pass  # los votos volvieron a ``pending``: se reintentan abajo
+        for attempt in range(1, retries + 1):
+            try:
+                await self.flush()
+                return
+            except Exception:
+                logger.warning("Falló el volcado de %d votos en el shutdown (intento %d/%d)",
+                               len(self.pending), attempt, retries, exc_info=True)
+                if attempt < retries:
+                    await asyncio.sleep(retry_delay)
+        votes = sorted((pid, uid, val) for (pid, uid), val in self.pending.items())
+        logger.error("No se pudieron persistir %d votos en el shutdown: %s", len(votes), votes)
+
+
+async def flush_to_pg(votes: List[Vote]) -> List[str]:
+    """``flush_fn`` para Postgres: un lote por transacción, con su propia sesión."""
+    async with SessionLocal.begin() as session:
+        return await PostsRepoPG(session).vote_many(votes)
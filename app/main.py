@@ -1,9 +1,63 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.core.config import settings
+from app.core.pagination import InvalidCursor
 from app.api.v1 import auth, users, communities, posts, comments, health, onboarding, options  # importa options
+from app.api.v1 import admin, metrics as metrics_routes
+from app.core.metrics import MetricsMiddleware
+from app.core.profiling import PROFILE_ENVS, ProfilerMiddleware
+from app.api.deps import BACKEND, build_memory_store, build_options_catalog, build_read_cache
+from app.db.database import dispose_engine, init_engine
+from app.infra import jobs
+from app.infra.vote_buffer import VoteBuffer, flush_to_pg
+from app.services.community_suggest import CommunitySuggestIndex
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Backend en memoria: un único store por proceso, sembrado una vez
+    app.state.cache = build_read_cache()
+    store = None
+    if BACKEND == "pg":
+        # Engine y pool recién acá: el backend en memoria no necesita DATABASE_URL
+        await init_engine()
+    else:
+        store = app.state.memory_store = await build_memory_store()
+    app.state.options_catalog = await build_options_catalog()
+    # Autocompletado de comunidades: índice en memoria, recargado periódicamente
+    community_index = app.state.community_index = CommunitySuggestIndex()
+    await jobs.refresh_community_index(community_index, store)
+    # Votos write-behind (opcional, sólo PG)
+    vote_buffer = None
+    if BACKEND == "pg" and settings.vote_buffer_enabled:
+        vote_buffer = app.state.vote_buffer = VoteBuffer(
+            flush_to_pg,
+            flush_interval=settings.vote_buffer_flush_interval,
+            max_batch=settings.vote_buffer_max_batch,
+            max_pending=settings.vote_buffer_max_pending,
+            max_failures=settings.vote_buffer_max_failures,
+            cache=app.state.cache,
+        )
+        vote_buffer.start()
+    # Re-decaimiento periódico del hot_score del feed
+    redecay = asyncio.create_task(jobs.run_every(settings.hot_redecay_interval_seconds, jobs.redecay_hot, store))
+    reindex = asyncio.create_task(jobs.run_every(
+        settings.community_suggest_refresh_seconds, jobs.refresh_community_index, community_index, store,
+    ))
+    yield
+    redecay.cancel()
+    reindex.cancel()
+    if vote_buffer is not None:
+        await vote_buffer.stop()   # vuelca los votos pendientes antes de salir
+    if BACKEND == "pg":
+        await dispose_engine()
+
 
-app = FastAPI(title=settings.app_name)
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
 
 # CORS…
 app.add_middleware(
@@ -14,6 +68,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Latencia y status por ruta (GET settings.metrics_path los expone)
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
+# Profiler a pedido: fuera de dev/staging (o sin token) ni se instala
+if settings.env in PROFILE_ENVS and settings.profiler_token:
+    app.add_middleware(
+        ProfilerMiddleware,
+        token=settings.profiler_token,
+        interval_ms=settings.profiler_interval_ms,
+        output_dir=settings.profiler_output_dir,
+    )
+
+# Cursores de paginación mal formados -> 400 (en vez de 500)
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
 # Routers
 api_prefix = settings.api_v1_prefix
 app.include_router(auth.router, prefix=api_prefix, tags=["auth"])
@@ -24,3 +96,6 @@ app.include_router(comments.router, prefix=api_prefix, tags=["comments"])
 app.include_router(health.router, prefix=api_prefix, tags=["health"])
 app.include_router(onboarding.router, prefix=api_prefix, tags=["onboarding"])
 app.include_router(options.router, prefix=api_prefix, tags=["options"])
+app.include_router(admin.router, prefix=api_prefix, tags=["admin"], include_in_schema=False)
+if settings.metrics_enabled:
+    app.include_router(metrics_routes.router, tags=["metrics"])
@@ -0,0 +1,197 @@
+"""
+Repos con caché de lectura.
+
+Envuelven a cualquier repo (memoria o PG) y se ubican entre los servicios y
+el repo real: las lecturas por id pasan por el ``CacheBackend`` y las
+escrituras invalidan (o refrescan) las entradas afectadas. Todo lo que no se
+redefine acá se delega tal cual al repo envuelto.
+
+Cada entrada guarda ``(versión, valor)``. La versión es la misma tupla que
+usan las rutas para el ETag (``repo.version``): ``get_versioned`` sólo sirve
+la entrada si coincide con la versión recién leída, así un GET condicional que
+no termina en 304 cuesta una sola consulta (la de la versión). Las entradas
+escritas sin versión (p. ej. tras un voto) sirven para ``get`` pero no para
+``get_versioned``, que las recarga.
+
+Las escrituras e invalidaciones del caché que siguen a una escritura en el
+repo se registran en la unidad de trabajo (``uow.after_commit``) y corren
+recién después del COMMIT: si la transacción se deshace, el caché no se toca.
+
+Con varios workers y un caché local, las invalidaciones sólo llegan al worker
+que hizo la escritura; el TTL acota cuánto puede durar un dato viejo en el resto.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.cache import CacheBackend
+from app.schemas.communities import CommunityCreate, CommunityPublic
+from app.schemas.users import UserPublic
+
+
+def post_key(post_id: str) -> str:
+    return f"post:{post_id}"
+
+
+def user_key(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+def community_key(community_id: str) -> str:
+    return f"community:{community_id}"
+
+
+COMMUNITY_RANKING_KEY = "communities:ranking"
+
+
+class _CachedRepo:
+    def __init__(self, repo, cache: CacheBackend, ttl: float, *, uow=None):
+        self.repo = repo
+        self.cache = cache
+        self.ttl = ttl
+        self.uow = uow
+
+    def __getattr__(self, name: str):
+        return getattr(self.repo, name)
+
+    async def _store(self, key: str, value: Any, version: Optional[tuple] = None) -> None:
+        if value is None:
+            await self.cache.delete(key)
+        else:
+            await self.cache.set(key, (version, value), self.ttl)
+
+    async def _cached_get(self, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        entry = await self.cache.get(key)
+        if entry is not None:
+            return entry[1]
+        value = await load()
+        await self._store(key, value)
+        return value
+
+    async def _versioned_get(self, key: str, version: tuple, load: Callable[[], Awaitable[Any]]) -> Any:
+        entry = await self.cache.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        value = await load()
+        await self._store(key, value, version)
+        return value
+
+    async def _after_commit(self, callback: Callable[[], Awaitable[Any]]) -> None:
+        if self.uow is None:
+            await callback()
+        else:
+            await self.uow.after_commit(callback)
+
+    async def _store_after_commit(self, key: str, value: Any) -> None:
+        await self._after_commit(lambda: self._store(key, value))
+
+    async def _invalidate_after_commit(self, *keys: str) -> None:
+        await self._after_commit(lambda: self.cache.delete(*keys))
+
+
+class CachedPostsRepo(_CachedRepo):
+    async def get(self, post_id: str) -> Optional[Dict[str, Any]]:
+        return await self._cached_get(post_key(post_id), lambda: self.repo.get(post_id))
+
+    async def get_versioned(self, post_id: str, version: tuple) -> Optional[Dict[str, Any]]:
+        return await self._versioned_get(post_key(post_id), version, lambda: self.repo.get(post_id))
+
+    async def vote(self, *, post_id: str, user_id: str, value: int) -> Dict[str, Any]:
+        post = await self.repo.vote(post_id=post_id, user_id=user_id, value=value)
+        await self._store_after_commit(post_key(post_id), post)
+        return post
+
+    async def delete(self, post_id: str) -> Dict[str, Any]:
+        res = await self.repo.delete(post_id)
+        await self._invalidate_after_commit(post_key(post_id))
+        return res
+
+
+class CachedCommentsRepo(_CachedRepo):
+    """No cachea comentarios: sólo invalida el post cuando cambia su comments_count."""
+
+    async def create(self, *, post_id: str, author_id: str, body: str, parent_id: Optional[str]) -> Dict[str, Any]:
+        comment = await self.repo.create(post_id=post_id, author_id=author_id, body=body, parent_id=parent_id)
+        await self._invalidate_after_commit(post_key(post_id))
+        return comment
+
+
+class CachedUsersRepo(_CachedRepo):
+    async def get_public(self, user_id: str) -> Optional[UserPublic]:
+        return await self._cached_get(user_key(user_id), lambda: self.repo.get_public(user_id))
+
+    async def get_public_versioned(self, user_id: str, version: tuple) -> Optional[UserPublic]:
+        return await self._versioned_get(user_key(user_id), version, lambda: self.repo.get_public(user_id))
+
+    async def update(self, user_id: str, patch: dict) -> Optional[UserPublic]:
+        user = await self.repo.update(user_id, patch)
+        await self._store_after_commit(user_key(user_id), user)
+        return user
+
+
+class CachedCommunitiesRepo(_CachedRepo):
+    """
+    Además de las comunidades por id, cachea el ranking sin filtro de
+    ``search`` (las ``ranking_size`` primeras por miembros y nombre, ya
+    ordenadas): las páginas que caen dentro se arman sin ir al repo. Las
+    altas de comunidades y de miembros lo invalidan tras el COMMIT; en otros
+    workers ``ranking_ttl`` acota cuánto pueden atrasar sus contadores.
+    """
+
+    def __init__(
+        self, repo, cache: CacheBackend, ttl: float, *, uow=None, ranking_ttl: float = 0.0, ranking_size: int = 0,
+    ):
+        super().__init__(repo, cache, ttl, uow=uow)
+        self.ranking_ttl = ranking_ttl
+        self.ranking_size = ranking_size
+
+    async def _ranking(self) -> Tuple[CommunityPublic, ...]:
+        ranking = await self.cache.get(COMMUNITY_RANKING_KEY)
+        if ranking is None:
+            ranking = tuple(await self.repo.search(None, self.ranking_size))
+            await self.cache.set(COMMUNITY_RANKING_KEY, ranking, self.ranking_ttl)
+        return ranking
+
+    async def search(
+        self, q: str | None, limit: int = 20, after: Optional[Tuple[int, str]] = None,
+    ) -> List[CommunityPublic]:
+        if q or self.ranking_size <= 0 or self.ranking_ttl <= 0:
+            return await self.repo.search(q, limit, after=after)
+        ranking = await self._ranking()
+        start = 0
+        if after:
+            # el cursor es la última comunidad entregada: se busca por igualdad
+            # (el orden de ``nombre`` es el de la collation de la base, no el de Python)
+            start = next((i + 1 for i, c in enumerate(ranking) if (c.member_count, c.name) == tuple(after)), -1)
+        complete = len(ranking) < self.ranking_size  # el ranking ya tiene todas las comunidades
+        if start >= 0 and (complete or start + limit <= len(ranking)):
+            return list(ranking[start:start + limit])
+        return await self.repo.search(q, limit, after=after)
+
+    async def create(self, body: CommunityCreate) -> CommunityPublic:
+        community = await self.repo.create(body)
+        await self._invalidate_after_commit(COMMUNITY_RANKING_KEY)
+        return community
+
+    async def get(self, community_id: str) -> Optional[CommunityPublic]:
+        return await self._cached_get(community_key(community_id), lambda: self.repo.get(community_id))
+
+    async def get_versioned(self, community_id: str, version: tuple) -> Optional[CommunityPublic]:
+        return await self._versioned_get(
+            community_key(community_id), version, lambda: self.repo.get(community_id),
+        )
+
+    async def join(self, community_id: str, user_id: str) -> None:
+        await self.repo.join(community_id, user_id)
+        await self._invalidate_after_commit(community_key(community_id), COMMUNITY_RANKING_KEY)
+
+    async def join_many(self, user_id: str, community_ids: Iterable[str]) -> Set[str]:
+        community_ids = list(community_ids)
+        joined = await self.repo.join_many(user_id, community_ids)
+        await self._invalidate_after_commit(*(community_key(cid) for cid in community_ids), COMMUNITY_RANKING_KEY)
+        return joined
+
+    async def leave(self, community_id: str, user_id: str) -> None:
+        await self.repo.leave(community_id, user_id)
+        await self._invalidate_after_commit(community_key(community_id), COMMUNITY_RANKING_KEY)
@@ -1,20 +1,99 @@
-import uuid
-from typing import Dict, List
-from app.schemas.comments import CommentCreate, CommentPublic
+import bisect
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.ranking import hot_score
+from app.repositories.memory.store import MemoryStore, utcnow
 
 class CommentsRepo:
-    def __init__(self):
-        self.data: Dict[str, dict] = {}   # id -> {id, post_id, author_id, content}
+    """
+    Repositorio de comentarios en memoria. Devuelve los mismos dicts que CommentsRepoPG.
+    """
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    @property
+    def data(self) -> Dict[str, dict]:
+        return self.store.comments
 
     def _gen_id(self) -> str:
-        return str(uuid.uuid4())
+        return self.store.next_id("comentario")
+
+    def _to_public(self, rec: dict) -> Dict[str, Any]:
+        votes = self.store.comment_votes.get(rec["id"], {})
+        up = sum(1 for v in votes.values() if v == 1)
+        down = sum(1 for v in votes.values() if v == -1)
+        return {**rec, "upvotes": up, "downvotes": down, "score": up - down}
+
+    def _sort_key(self, comment_id: str) -> Tuple[datetime, int]:
+        return (self.store.comments[comment_id]["created_at"], int(comment_id))
+
+    async def list_for_post(
+        self,
+        post_id: str,
+        limit: int = 50,
+        after: Optional[Tuple[datetime, int]] = None,
+    ) -> List[Dict[str, Any]]:
+        with self.store.lock:
+            ids = self.store.comments_by_post.get(post_id, [])
+            lo = bisect.bisect_right(ids, after, key=self._sort_key) if after else 0
+            return [self._to_public(self.store.comments[cid]) for cid in ids[lo:lo + limit]]
+
+    async def list_tree(
+        self,
+        *,
+        post_id: str,
+        parent_id: Optional[str],
+        limit: int,
+        after: Optional[Tuple[datetime, int]],
+        depth: int,
+        children_limit: int,
+    ) -> List[Dict[str, Any]]:
+        """
+        Igual que CommentsRepoPG.list_tree: filas planas con ``depth`` y
+        ``reply_count``, recorriendo el árbol por niveles desde los índices del store.
+        """
+        with self.store.lock:
+            if parent_id:
+                level = self.store.comment_replies.get(parent_id, [])
+            else:
+                level = self.store.comment_roots.get(post_id, [])
+            lo = bisect.bisect_right(level, after, key=self._sort_key) if after else 0
+            frontier = [cid for cid in level[lo:lo + limit] if self.store.comments[cid]["post_id"] == post_id]
+            out: List[Dict[str, Any]] = []
+            level_depth = 1
+            while frontier:
+                next_frontier: List[str] = []
+                for cid in frontier:
+                    replies = self.store.comment_replies.get(cid, [])
+                    out.append({**self._to_public(self.store.comments[cid]), "depth": level_depth, "reply_count": len(replies)})
+                    if level_depth < depth:
+                        next_frontier.extend(replies[:children_limit])
+                frontier = next_frontier
+                level_depth += 1
+        return out
 
-    def create(self, post_id: str, author_id: str, body: CommentCreate) -> CommentPublic:
+    async def create(self, *, post_id: str, author_id: str, body: str, parent_id: Optional[str]) -> Dict[str, Any]:
         cid = self._gen_id()
-        rec = {"id": cid, "post_id": post_id, "author_id": author_id, "content": body.content}
-        self.data[cid] = rec
-        return CommentPublic(**rec)
+        now = utcnow()
+        rec = {
+            "id": cid,
+            "post_id": post_id,
+            "author_id": author_id,
+            "parent_id": parent_id,
+            "body": body,
+            "created_at": now,
+            "updated_at": now,
+        }
+        with self.store.lock:
+            self.store.comments[cid] = rec
+            self.store.index_comment(rec)
+            post = self.store.posts.get(post_id)
+            if post:
+                post["comments_count"] += 1
+                post["hot_score"] = hot_score(post["score"], post["comments_count"], post["created_at"])
+            return self._to_public(rec)
 
-    def list_for_post(self, post_id: str, limit: int = 50) -> List[CommentPublic]:
-        items = [CommentPublic(**r) for r in self.data.values() if r["post_id"] == post_id]
-        return items[:limit]
+    async def vote(self, *, comment_id: str, user_id: str, value: int) -> Dict[str, Any]:
+        with self.store.lock:
+            self.store.comment_votes.setdefault(comment_id, {})[user_id] = int(value)
+            return self._to_public(self.store.comments[comment_id])
@@ -1,38 +1,80 @@
-import uuid
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from app.repositories.memory.store import MemoryStore, utcnow
 from app.schemas.communities import CommunityCreate, CommunityPublic
 
 class CommunitiesRepo:
-    def __init__(self):
-        self.data: Dict[str, dict] = {}           # id -> {id,name,description}
-        self.members: Dict[str, set] = {}         # community_id -> {user_ids}
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    @property
+    def data(self) -> Dict[str, dict]:
+        return self.store.communities
 
     def _gen_id(self) -> str:
-        return str(uuid.uuid4())
+        return self.store.next_id("comunidad")
+
+    def _to_public(self, c: dict) -> CommunityPublic:
+        mc = len(self.store.members.get(c["id"], ()))
+        return CommunityPublic(id=c["id"], name=c["name"], description=c["description"], member_count=mc)
 
-    def create(self, body: CommunityCreate) -> CommunityPublic:
+    async def create(self, body: CommunityCreate) -> CommunityPublic:
         cid = self._gen_id()
-        self.data[cid] = {"id": cid, "name": body.name, "description": body.description}
-        self.members[cid] = set()
+        now = utcnow()
+        rec = {"id": cid, "name": body.name, "description": body.description, "created_at": now, "updated_at": now}
+        with self.store.lock:
+            self.store.communities[cid] = rec
+            self.store.members[cid] = set()
         return CommunityPublic(id=cid, name=body.name, description=body.description, member_count=0)
 
-    def join(self, community_id: str, user_id: str) -> None:
-        self.members.setdefault(community_id, set()).add(user_id)
-
-    def leave(self, community_id: str, user_id: str) -> None:
-        self.members.setdefault(community_id, set()).discard(user_id)
-
-    def get(self, community_id: str) -> CommunityPublic | None:
-        c = self.data.get(community_id)
-        if not c: return None
-        mc = len(self.members.get(community_id, set()))
-        return CommunityPublic(**c, member_count=mc)
-
-    def search(self, q: str | None, limit: int = 20) -> List[CommunityPublic]:
-        out = []
-        for c in self.data.values():
-            if q and q.lower() not in c["name"].lower():
-                continue
-            out.append(self.get(c["id"]))
-            if len(out) >= limit: break
-        return out
+    async def join(self, community_id: str, user_id: str) -> None:
+        with self.store.lock:
+            self.store.members.setdefault(community_id, set()).add(user_id)
+
+    async def join_many(self, user_id: str, community_ids: Iterable[str]) -> Set[str]:
+        with self.store.lock:
+            joined = set()
+            for cid in set(community_ids):
+                if cid in self.store.communities:
+                    self.store.members.setdefault(cid, set()).add(user_id)
+                    joined.add(cid)
+            return joined
+
+    async def leave(self, community_id: str, user_id: str) -> None:
+        with self.store.lock:
+            self.store.members.setdefault(community_id, set()).discard(user_id)
+
+    async def get(self, community_id: str) -> CommunityPublic | None:
+        with self.store.lock:
+            c = self.store.communities.get(community_id)
+            return self._to_public(c) if c else None
+
+    async def version(self, community_id: str) -> Optional[Tuple]:
+        with self.store.lock:
+            c = self.store.communities.get(community_id)
+            return (c["updated_at"], len(self.store.members.get(community_id, ()))) if c else None
+
+    async def index_entries(self) -> List[Tuple[str, str, int]]:
+        with self.store.lock:
+            return [
+                (cid, c["name"], len(self.store.members.get(cid, ())))
+                for cid, c in self.store.communities.items()
+            ]
+
+    async def search(
+        self,
+        q: str | None,
+        limit: int = 20,
+        after: Optional[Tuple[int, str]] = None,
+    ) -> List[CommunityPublic]:
+        needle = q.lower() if q else None
+        with self.store.lock:
+            out = [
+                self._to_public(c) for c in self.store.communities.values()
+                if not needle or needle in c["name"].lower()
+            ]
+        # mismo orden que el repo PG: miembros DESC, nombre ASC
+        out.sort(key=lambda c: (-c.member_count, c.name))
+        if after:
+            seek = (-after[0], after[1])
+            out = [c for c in out if (-c.member_count, c.name) > seek]
+        return out[:limit]
@@ -1,55 +1,201 @@
-import uuid
-from typing import Dict, List
-from app.schemas.posts import PostCreate, PostPublic
-from app.schemas.common import VoteStatus
-from app.repositories.memory.users_repo import UsersRepo
+import bisect
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.ranking import hot_score
+from app.repositories.memory.store import MemoryStore, utcnow
+
+# Campo de orden de cada modo del feed; el desempate siempre es post_id DESC
+_SORT_FIELD = {"new": "created_at", "hot": "hot_score", "top": "score", "relevance": "rank"}
 
 class PostsRepo:
-    def __init__(self, users_repo: UsersRepo):
-        self.users_repo = users_repo
-        self.posts: Dict[str, dict] = {}
-        self.votes: Dict[tuple, VoteStatus] = {}
-        self.comments_count: Dict[str, int] = {}
+    """
+    Repositorio de posts en memoria. Devuelve los mismos dicts que PostsRepoPG
+    para que PostsService no distinga backends.
+    """
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    @property
+    def posts(self) -> Dict[str, dict]:
+        return self.store.posts
 
     def _gen_id(self) -> str:
-        return str(uuid.uuid4())
+        return self.store.next_id("post")
+
+    def _to_public(self, rec: dict) -> Dict[str, Any]:
+        community = self.store.communities.get(rec["community_id"])
+        return {**rec, "community_name": community["name"] if community else None}
+
+    async def list(
+        self,
+        community_id: Optional[str],
+        q: Optional[str],
+        limit: int = 20,
+        after: Optional[tuple] = None,
+        sort: str = "new",
+    ) -> List[Dict[str, Any]]:
+        """
+        Posts activos ordenados según ``sort`` (``new``, ``hot``, ``top`` o
+        ``relevance``), filtrados por el índice invertido si viene ``q``.
+        ``after`` es la clave keyset ``(valor de orden, post_id)`` del último post entregado.
+        """
+        with self.store.lock:
+            if sort == "new" and not q:
+                return self._list_new(community_id, limit, after)
+            if q:
+                ranks = self.store.search_posts(q)
+                candidates = [self.store.posts[pid] for pid in ranks]
+            else:
+                index = self.store.posts_by_community.get(community_id, []) if community_id else self.store.posts_by_time
+                ranks = {}
+                candidates = [self.store.posts[pid] for _, _, pid in index]
+            field = _SORT_FIELD[sort]
+            ranked = []
+            for rec in candidates:
+                if rec["status"] != "A" or (community_id and rec["community_id"] != community_id):
+                    continue
+                item = {**self._to_public(rec), "rank": ranks[rec["id"]]} if q else self._to_public(rec)
+                key = (item[field], int(rec["id"]))
+                if after and key >= after:
+                    continue
+                ranked.append((key, item))
+        ranked.sort(key=lambda kv: kv[0], reverse=True)
+        return [item for _, item in ranked[:limit]]
+
+    def _list_new(self, community_id: Optional[str], limit: int, after: Optional[Tuple[Any, int]]) -> List[Dict[str, Any]]:
+        out: List[Dict[str, Any]] = []
+        if community_id:
+            index = self.store.posts_by_community.get(community_id, [])
+        else:
+            index = self.store.posts_by_time
+        # el índice está ordenado ascendente por (creado_en, id); el feed va
+        # del más nuevo al más viejo, arrancando antes de la clave ``after``
+        hi = bisect.bisect_left(index, after) if after else len(index)
+        for i in range(hi - 1, -1, -1):
+            rec = self.store.posts[index[i][2]]
+            if rec["status"] != "A":
+                continue
+            out.append(self._to_public(rec))
+            if len(out) >= limit:
+                break
+        return out
 
-    def create(self, author_id: str, body: PostCreate) -> PostPublic:
+    async def get(self, post_id: str) -> Optional[Dict[str, Any]]:
+        with self.store.lock:
+            rec = self.store.posts.get(post_id)
+            return self._to_public(rec) if rec else None
+
+    async def version(self, post_id: str) -> Optional[Tuple]:
+        rec = self.store.posts.get(post_id)
+        if not rec:
+            return None
+        return (rec["updated_at"], rec["status"], rec["upvotes"], rec["downvotes"],
+                rec["comments_count"], rec["best_comment_id"])
+
+    async def get_vote(self, post_id: str, user_id: str) -> int:
+        with self.store.lock:
+            return self.store.post_votes.get(post_id, {}).get(user_id, 0)
+
+    async def create(
+        self,
+        *,
+        community_id: str,
+        author_id: str,
+        title: str,
+        body: str,
+        tag: str,
+    ) -> Dict[str, Any]:
         pid = self._gen_id()
+        now = utcnow()
         rec = {
             "id": pid,
-            "community_id": body.community_id,
-            "title": body.title,
-            "content": body.content,
-            "tag": body.tag,  # etiqueta del nuevo post
+            "community_id": community_id,
             "author_id": author_id,
+            "title": title,
+            "body": body,
+            "tag": tag,  # etiqueta del nuevo post
+            "best_comment_id": None,
+            "created_at": now,
+            "updated_at": now,
+            "status": "A",
+            # contadores desnormalizados, igual que las columnas de ``post`` en PG
+            "upvotes": 0,
+            "downvotes": 0,
+            "score": 0,
+            "comments_count": 0,
+            "hot_score": 0.0,
         }
-        self.posts[pid] = rec
-        self.comments_count[pid] = 0
-        return self._to_public(rec, current_user_id=author_id)
+        with self.store.lock:
+            self.store.posts[pid] = rec
+            self.store.index_post(rec)
+            return self._to_public(rec)
 
-    # ... (otros métodos list(), get(), vote(), etc. sin cambios) ...
+    async def vote(self, *, post_id: str, user_id: str, value: int) -> Optional[Dict[str, Any]]:
+        """Como el repo PG: sobre un post inexistente no registra nada y devuelve ``None``."""
+        value = int(value)
+        with self.store.lock:
+            rec = self.store.posts.get(post_id)
+            if rec is None:
+                return None
+            votes = self.store.post_votes.setdefault(post_id, {})
+            prev = votes.get(user_id, 0)
+            votes[user_id] = value
+            if prev != value:
+                rec["upvotes"] += (value == 1) - (prev == 1)
+                rec["downvotes"] += (value == -1) - (prev == -1)
+                rec["score"] += value - prev
+                rec["hot_score"] = hot_score(rec["score"], rec["comments_count"], rec["created_at"])
+        return await self.get(post_id)
 
-    def delete(self, post_id: str) -> None:
+    async def toggle_bookmark(self, *, post_id: str, user_id: str) -> Dict[str, Any]:
+        key = (post_id, user_id)
+        with self.store.lock:
+            if key in self.store.bookmarks:
+                self.store.bookmarks.discard(key)
+                action = "removed"
+            else:
+                self.store.bookmarks.add(key)
+                action = "added"
+        return {"status": "ok", "action": action}
+
+    async def delete(self, post_id: str) -> Dict[str, Any]:
         """
-        Elimina un post de la memoria y sus votos asociados.
+        Marca el post como 'E' (Eliminado), igual que el repo PG, y lo saca
+        de los índices del feed.
         """
-        self.posts.pop(post_id, None)
-        self.votes = {k: v for k, v in self.votes.items() if k[1] != post_id}
-        self.comments_count.pop(post_id, None)
-
-    def _to_public(self, rec: dict, current_user_id: str | None = None) -> PostPublic:
-        author = self.users_repo.get_public(rec["author_id"])
-        up, down = self._score(rec["id"])
-        return PostPublic(
-            id=rec["id"],
-            community_id=rec["community_id"],
-            title=rec["title"],
-            content=rec["content"],
-            tag=rec["tag"],
-            author=author,
-            upvotes=up,
-            downvotes=down,
-            vote_status=self._vote_status(rec["id"], current_user_id),
-            comments_count=self.comments_count.get(rec["id"], 0),
-        )
+        with self.store.lock:
+            rec = self.store.posts.get(post_id)
+            if rec and rec["status"] != "E":
+                rec["status"] = "E"
+                self.store.unindex_post(rec)
+        return {"status": "deleted"}
+
+    async def reconcile_stats(self) -> int:
+        """Recalcula los contadores a partir de los índices de votos y comentarios."""
+        fixed = 0
+        with self.store.lock:
+            for pid, rec in self.store.posts.items():
+                votes = self.store.post_votes.get(pid, {}).values()
+                up = sum(1 for v in votes if v == 1)
+                down = sum(1 for v in votes if v == -1)
+                stats = {
+                    "upvotes": up,
+                    "downvotes": down,
+                    "score": up - down,
+                    "comments_count": len(self.store.comments_by_post.get(pid, ())),
+                }
+                if any(rec[k] != v for k, v in stats.items()):
+                    rec.update(stats)
+                    rec["hot_score"] = hot_score(rec["score"], rec["comments_count"], rec["created_at"])
+                    fixed += 1
+        return fixed
+
+    async def redecay_hot(self, window_days: int = 7) -> int:
+        """Re-decae el hot_score de los posts activos recientes, como el repo PG."""
+        now = utcnow()
+        updated = 0
+        with self.store.lock:
+            for rec in self.store.posts.values():
+                if rec["status"] == "A" and (now - rec["created_at"]).days < window_days:
+                    rec["hot_score"] = hot_score(rec["score"], rec["comments_count"], rec["created_at"], now)
+                    updated += 1
+        return updated
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import bisect
+import itertools
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Set, Tuple
+
+from app.core.text import tokenize
+
+# Pesos de búsqueda como en ts_rank: título = 'A' (1.0), cuerpo = 'B' (0.4)
+TITLE_WEIGHT = 1.0
+BODY_WEIGHT = 0.4
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class MemoryStore:
+    """
+    Almacenamiento en memoria compartido por todos los repos del backend "memory".
+
+    Se crea una sola vez en el lifespan de la app y vive lo que vive el proceso,
+    así que los datos escritos sobreviven entre requests. Además de las tablas
+    (dicts por id) mantiene índices secundarios para no recorrer todo en cada lectura:
+
+    - ``users_by_email``: email -> usuario_id
+    - ``posts_by_community``: comunidad_id -> [(creado_en, post_id)] ordenado por tiempo
+    - ``posts_by_time``: [(creado_en, post_id)] ordenado por tiempo (feed global)
+    - ``comments_by_post``: post_id -> [comentario_id] en orden de creación
+    - ``comment_roots`` / ``comment_replies``: post_id / comentario_padre_id -> [comentario_id]
+      en orden de creación (árbol de respuestas)
+    - ``post_votes``: post_id -> {usuario_id: valor}
+    - ``search_index``: término -> {post_id: peso} (índice invertido de posts activos)
+
+    Toda mutación (y toda lectura que cruce varios índices) debe hacerse con
+    ``store.lock`` tomado, porque las rutas síncronas corren en el threadpool.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self._seq: Dict[str, itertools.count] = {}
+
+        # Tablas
+        self.users: Dict[str, dict] = {}
+        self.onboarding: Dict[str, dict] = {}
+        self.communities: Dict[str, dict] = {}
+        self.members: Dict[str, Set[str]] = {}       # comunidad_id -> {usuario_id}
+        self.posts: Dict[str, dict] = {}
+        self.comments: Dict[str, dict] = {}
+        self.comment_votes: Dict[str, Dict[str, int]] = {}
+        self.bookmarks: Set[Tuple[str, str]] = set()  # (post_id, usuario_id)
+
+        # Índices secundarios
+        self.users_by_email: Dict[str, str] = {}
+        self.posts_by_community: Dict[str, List[Tuple[datetime, int, str]]] = {}
+        self.posts_by_time: List[Tuple[datetime, int, str]] = []
+        self.comments_by_post: Dict[str, List[str]] = {}
+        self.comment_roots: Dict[str, List[str]] = {}
+        self.comment_replies: Dict[str, List[str]] = {}
+        self.post_votes: Dict[str, Dict[str, int]] = {}
+        self.search_index: Dict[str, Dict[str, float]] = {}
+
+    def next_id(self, table: str) -> str:
+        """Ids secuenciales por tabla, igual que los BIGSERIAL de Postgres."""
+        with self.lock:
+            seq = self._seq.setdefault(table, itertools.count(1))
+            return str(next(seq))
+
+    def reserve_ids(self, table: str, n: int) -> int:
+        """Reserva ``n`` ids consecutivos de ``table`` y devuelve el primero (cargas masivas)."""
+        with self.lock:
+            first = int(self.next_id(table))
+            self._seq[table] = itertools.count(first + n)
+            return first
+
+    def advance_ids(self, table: str, last_id: int) -> None:
+        """Garantiza que los próximos ids de ``table`` sean mayores que ``last_id``."""
+        with self.lock:
+            current = int(self.next_id(table))
+            self._seq[table] = itertools.count(max(current, last_id + 1))
+
+    # ------- mantenimiento de índices -------
+    def index_user(self, rec: dict) -> None:
+        self.users_by_email[rec["email"].lower()] = rec["id"]
+
+    def index_post(self, rec: dict) -> None:
+        key = (rec["created_at"], int(rec["id"]), rec["id"])
+        bisect.insort(self.posts_by_time, key)
+        bisect.insort(self.posts_by_community.setdefault(rec["community_id"], []), key)
+        self.comments_by_post.setdefault(rec["id"], [])
+        self.post_votes.setdefault(rec["id"], {})
+        for term, weight in self._post_terms(rec).items():
+            self.search_index.setdefault(term, {})[rec["id"]] = weight
+
+    def index_posts_bulk(self, recs: List[dict]) -> None:
+        """Como ``index_post`` para muchos posts: ordena cada índice una sola vez."""
+        touched = set()
+        for rec in recs:
+            key = (rec["created_at"], int(rec["id"]), rec["id"])
+            self.posts_by_time.append(key)
+            self.posts_by_community.setdefault(rec["community_id"], []).append(key)
+            touched.add(rec["community_id"])
+            self.comments_by_post.setdefault(rec["id"], [])
+            self.post_votes.setdefault(rec["id"], {})
+            for term, weight in self._post_terms(rec).items():
+                self.search_index.setdefault(term, {})[rec["id"]] = weight
+        self.posts_by_time.sort()
+        for community_id in touched:
+            self.posts_by_community[community_id].sort()
+
+    def unindex_post(self, rec: dict) -> None:
+        key = (rec["created_at"], int(rec["id"]), rec["id"])
+        for bucket in (self.posts_by_time, self.posts_by_community.get(rec["community_id"], [])):
+            i = bisect.bisect_left(bucket, key)
+            if i < len(bucket) and bucket[i] == key:
+                del bucket[i]
+        for term in self._post_terms(rec):
+            postings = self.search_index.get(term)
+            if postings is not None:
+                postings.pop(rec["id"], None)
+                if not postings:
+                    del self.search_index[term]
+
+    @staticmethod
+    def _post_terms(rec: dict) -> Dict[str, float]:
+        terms: Dict[str, float] = {}
+        for term in tokenize(rec["title"]):
+            terms[term] = terms.get(term, 0.0) + TITLE_WEIGHT
+        for term in tokenize(rec["body"]):
+            terms[term] = terms.get(term, 0.0) + BODY_WEIGHT
+        return terms
+
+    def search_posts(self, query: str) -> Dict[str, float]:
+        """
+        post_id -> relevancia para los posts que contienen todos los términos
+        de ``query`` (AND, como ``websearch_to_tsquery``).
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return {}
+        postings = sorted((self.search_index.get(t, {}) for t in terms), key=len)
+        hits = dict(postings[0])
+        for other in postings[1:]:
+            hits = {pid: w + other[pid] for pid, w in hits.items() if pid in other}
+            if not hits:
+                break
+        return hits
+
+    def index_comment(self, rec: dict) -> None:
+        self.comments_by_post.setdefault(rec["post_id"], []).append(rec["id"])
+        if rec["parent_id"] is None:
+            self.comment_roots.setdefault(rec["post_id"], []).append(rec["id"])
+        else:
+            self.comment_replies.setdefault(rec["parent_id"], []).append(rec["id"])
@@ -1,58 +1,93 @@
-import uuid
 from typing import Dict
 from app.repositories.base import BaseRepo
+from app.repositories.memory.store import MemoryStore, utcnow
 from app.schemas.users import UserCreate, UserPublic
-from app.core.security import hash_password, verify_password
+from app.core.security import password_hasher
+
+_PRIVATE = ("password_hash", "usuario_id", "created_at", "updated_at")
+
+def _default_onboarding() -> dict:
+    return {"done": False, "careers": [], "year": None, "graduation_year": None, "favorite_communities": []}
 
 class UsersRepo(BaseRepo):
-    def __init__(self):
-        self.data: Dict[str, dict] = {}  # id -> dict
-        self.onboarding: Dict[str, dict] = {}  # user_id -> onboarding dict
+    """
+    Repositorio de usuarios en memoria sobre el ``MemoryStore`` compartido.
+    Duck-typing compatible con UsersRepoPG (métodos async, mismos retornos).
+    """
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    @property
+    def data(self) -> Dict[str, dict]:
+        return self.store.users
 
     def _gen_id(self) -> str:
-        return str(uuid.uuid4())
+        return self.store.next_id("usuario")
 
-    def create(self, user: UserCreate) -> UserPublic:
+    @staticmethod
+    def _to_public(rec: dict) -> UserPublic:
+        return UserPublic(**{k: v for k, v in rec.items() if k not in _PRIVATE})
+
+    async def create(self, user: UserCreate) -> UserPublic:
+        password_hash = await password_hasher.hash(user.password)
         uid = self._gen_id()
+        now = utcnow()
         record = {
             "id": uid,
+            "usuario_id": uid,   # mismo nombre de clave que devuelve el repo PG
             "name": user.name,
             "username": user.username,
             "email": user.email,
             "role": user.role,
-            "password_hash": hash_password(user.password),
-            "avatar_url": None, "title": None, "bio": None
+            "password_hash": password_hash,
+            "avatar_url": None, "title": None, "bio": None,
+            "created_at": now, "updated_at": now,
         }
-        self.data[uid] = record
-        self.onboarding[uid] = {"done": False, "careers": [], "year": None, "graduation_year": None, "favorite_communities": []}
-        return UserPublic(**{k:v for k,v in record.items() if k!="password_hash"})
-
-    def get_by_email(self, email: str) -> dict | None:
-        return next((u for u in self.data.values() if u["email"] == email), None)
-
-    def get_public(self, user_id: str) -> UserPublic | None:
-        rec = self.data.get(user_id)
-        return UserPublic(**{k:v for k,v in rec.items() if k!="password_hash"}) if rec else None
-
-    def verify(self, email: str, password: str) -> dict | None:
-        rec = self.get_by_email(email)
-        if rec and verify_password(password, rec["password_hash"]):
-            return rec
-        return None
-
-    def update(self, user_id: str, patch: dict) -> UserPublic | None:
-        if user_id not in self.data: return None
-        self.data[user_id].update({k:v for k,v in patch.items() if v is not None})
-        rec = self.data[user_id]
-        return UserPublic(**{k:v for k,v in rec.items() if k!="password_hash"})
-
-    def get_onboarding(self, user_id: str) -> dict:
-        return self.onboarding.get(user_id, {"done": False, "careers": [], "year": None, "graduation_year": None, "favorite_communities": []})
-
-    def set_onboarding(self, user_id: str, data: dict) -> dict:
-        state = self.onboarding.get(user_id) or {}
-        state.update(data)
-        # marcar como done si tiene al menos algo útil
-        state["done"] = bool(state.get("careers") or state.get("favorite_communities"))
-        self.onboarding[user_id] = state
-        return state
+        with self.store.lock:
+            self.store.users[uid] = record
+            self.store.index_user(record)
+            self.store.onboarding[uid] = _default_onboarding()
+        return self._to_public(record)
+
+    async def get_by_email(self, email: str) -> dict | None:
+        with self.store.lock:
+            uid = self.store.users_by_email.get(email.lower())
+            return self.store.users.get(uid) if uid else None
+
+    async def get_public(self, user_id: str) -> UserPublic | None:
+        rec = self.store.users.get(user_id)
+        return self._to_public(rec) if rec else None
+
+    async def version(self, user_id: str) -> tuple | None:
+        rec = self.store.users.get(user_id)
+        return (rec["updated_at"],) if rec else None
+
+    async def verify(self, email: str, password: str) -> dict | None:
+        rec = await self.get_by_email(email)
+        if not rec:
+            return None
+        ok, new_hash = await password_hasher.verify_and_update(password, rec["password_hash"])
+        if ok and new_hash:
+            with self.store.lock:
+                rec["password_hash"] = new_hash
+        return rec if ok else None
+
+    async def update(self, user_id: str, patch: dict) -> UserPublic | None:
+        with self.store.lock:
+            rec = self.store.users.get(user_id)
+            if not rec: return None
+            rec.update({k: v for k, v in patch.items() if v is not None})
+            rec["updated_at"] = utcnow()
+            return self._to_public(rec)
+
+    async def get_onboarding(self, user_id: str) -> dict:
+        return dict(self.store.onboarding.get(user_id) or _default_onboarding())
+
+    async def set_onboarding(self, user_id: str, data: dict) -> dict:
+        with self.store.lock:
+            state = self.store.onboarding.get(user_id) or {}
+            state.update(data)
+            # marcar como done si tiene al menos algo útil
+            state["done"] = bool(state.get("careers") or state.get("favorite_communities"))
+            self.store.onboarding[user_id] = state
+            return dict(state)
@@ -1,7 +1,107 @@
 from __future__ import annotations
-from typing import Any, Dict, Optional, List
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Optional, List, Tuple
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import TextClause
+
+# ------- Sentencias (una por forma de consulta, armadas una sola vez) -------
+
+_SEEK = "AND (c.creado_en, c.comentario_id) > (:after_ts, :after_id)"
+
+
+@lru_cache(maxsize=None)
+def _list_for_post_statement(seek: bool) -> TextClause:
+    return text(f"""
+        SELECT
+          c.comentario_id, c.post_id, c.autor_id, c.comentario_padre_id, c.cuerpo,
+          c.creado_en, c.actualizado_en,
+          COALESCE(SUM(CASE WHEN cv.valor = 1 THEN 1 ELSE 0 END),0)::int AS upvotes,
+          COALESCE(SUM(CASE WHEN cv.valor = -1 THEN 1 ELSE 0 END),0)::int AS downvotes,
+          COALESCE(SUM(CASE WHEN cv.valor = 1 THEN 1 WHEN cv.valor = -1 THEN -1 ELSE 0 END),0)::int AS score
+        FROM comentario c
+        LEFT JOIN comentario_voto cv ON cv.comentario_id = c.comentario_id
+        WHERE c.post_id = :pid {_SEEK if seek else ""}
+        GROUP BY c.comentario_id
+        ORDER BY c.creado_en ASC, c.comentario_id ASC
+        LIMIT :lim
+    """).execution_options(query_shape="CommentsRepoPG.list_for_post")
+
+
+@lru_cache(maxsize=None)
+def _tree_statement(under_parent: bool, seek: bool) -> TextClause:
+    level = "c.comentario_padre_id = :parent" if under_parent else "c.comentario_padre_id IS NULL"
+    return text(f"""
+        WITH RECURSIVE tree AS (
+          (SELECT c.comentario_id, c.post_id, c.autor_id, c.comentario_padre_id, c.cuerpo,
+                  c.creado_en, c.actualizado_en, 1 AS depth
+           FROM comentario c
+           WHERE c.post_id = :pid AND {level} {_SEEK if seek else ""}
+           ORDER BY c.creado_en, c.comentario_id
+           LIMIT :lim)
+          UNION ALL
+          SELECT ch.comentario_id, ch.post_id, ch.autor_id, ch.comentario_padre_id, ch.cuerpo,
+                 ch.creado_en, ch.actualizado_en, t.depth + 1
+          FROM tree t
+          CROSS JOIN LATERAL (
+            SELECT * FROM comentario c
+            WHERE c.comentario_padre_id = t.comentario_id
+            ORDER BY c.creado_en, c.comentario_id
+            LIMIT :per_level
+          ) ch
+          WHERE t.depth < :depth
+        )
+        SELECT
+          t.*,
+          (SELECT COUNT(*) FROM comentario r WHERE r.comentario_padre_id = t.comentario_id)::int AS reply_count,
+          COALESCE(v.upvotes, 0)::int AS upvotes,
+          COALESCE(v.downvotes, 0)::int AS downvotes,
+          COALESCE(v.upvotes - v.downvotes, 0)::int AS score
+        FROM tree t
+        LEFT JOIN LATERAL (
+          SELECT COUNT(*) FILTER (WHERE cv.valor = 1)  AS upvotes,
+                 COUNT(*) FILTER (WHERE cv.valor = -1) AS downvotes
+          FROM comentario_voto cv WHERE cv.comentario_id = t.comentario_id
+        ) v ON true
+        ORDER BY t.depth, t.creado_en, t.comentario_id
+    """).execution_options(query_shape="CommentsRepoPG.list_tree")
+
+
+# El contador post.comments_count y el hot_score se ajustan en la misma sentencia
+_CREATE = text("""
+    WITH ins AS (
+      INSERT INTO comentario (post_id, autor_id, comentario_padre_id, cuerpo)
+      VALUES (:pid, :uid, :parent, :body)
+      RETURNING comentario_id, post_id, autor_id, comentario_padre_id, cuerpo, creado_en, actualizado_en
+    ), bump AS (
+      UPDATE post SET
+        comments_count = comments_count + 1,
+        hot_score = post_hot_score(score, comments_count + 1, creado_en)
+      WHERE post_id = (SELECT post_id FROM ins)
+    )
+    SELECT * FROM ins
+""").execution_options(query_shape="CommentsRepoPG.create")
+
+_VOTE_UPSERT = text("""
+    INSERT INTO comentario_voto (comentario_id, usuario_id, valor)
+    VALUES (:cid, :uid, :val)
+    ON CONFLICT (comentario_id, usuario_id) DO UPDATE SET valor = EXCLUDED.valor, votado_en = NOW()
+""").execution_options(query_shape="CommentsRepoPG.vote")
+
+_GET_WITH_VOTES = text("""
+    SELECT
+      c.comentario_id, c.post_id, c.autor_id, c.comentario_padre_id, c.cuerpo,
+      c.creado_en, c.actualizado_en,
+      COALESCE(SUM(CASE WHEN cv.valor = 1 THEN 1 ELSE 0 END),0)::int AS upvotes,
+      COALESCE(SUM(CASE WHEN cv.valor = -1 THEN 1 ELSE 0 END),0)::int AS downvotes,
+      COALESCE(SUM(CASE WHEN cv.valor = 1 THEN 1 WHEN cv.valor = -1 THEN -1 ELSE 0 END),0)::int AS score
+    FROM comentario c
+    LEFT JOIN comentario_voto cv ON cv.comentario_id = c.comentario_id
+    WHERE c.comentario_id = :cid
+    GROUP BY c.comentario_id
+""").execution_options(query_shape="CommentsRepoPG.vote:read")
+
 
 class CommentsRepoPG:
     def __init__(self, session: AsyncSession):
@@ -22,59 +122,66 @@ class CommentsRepoPG:
             "score": int(row.get("score", 0)),
         }
 
-    async def list_for_post(self, post_id: str, limit: int = 50) -> List[Dict[str, Any]]:
-        sql = """
-        SELECT
-          c.comentario_id, c.post_id, c.autor_id, c.comentario_padre_id, c.cuerpo,
-          c.creado_en, c.actualizado_en,
-          COALESCE(SUM(CASE WHEN cv.valor = 1 THEN 1 ELSE 0 END),0)::int AS upvotes,
-          COALESCE(SUM(CASE WHEN cv.valor = -1 THEN 1 ELSE 0 END),0)::int AS downvotes,
-          COALESCE(SUM(CASE WHEN cv.valor = 1 THEN 1 WHEN cv.valor = -1 THEN -1 ELSE 0 END),0)::int AS score
-        FROM comentario c
-        LEFT JOIN comentario_voto cv ON cv.comentario_id = c.comentario_id
-        WHERE c.post_id = :pid
-        GROUP BY c.comentario_id
-        ORDER BY c.creado_en ASC
-        LIMIT :lim
+    async def list_for_post(
+        self,
+        post_id: str,
+        limit: int = 50,
+        after: Optional[Tuple[datetime, int]] = None,
+    ) -> List[Dict[str, Any]]:
         """
-        res = await self.session.execute(text(sql), {"pid": int(post_id), "lim": limit})
+        Comentarios del post en orden de creación. ``after`` es la clave
+        ``(creado_en, comentario_id)`` del último comentario ya entregado (keyset).
+        """
+        params: Dict[str, Any] = {"pid": int(post_id), "lim": limit}
+        if after:
+            params["after_ts"], params["after_id"] = after
+        res = await self.session.execute(_list_for_post_statement(bool(after)), params)
         return [self._to_public(dict(r)) for r in res.mappings().all()]
 
-    async def create(self, *, post_id: str, author_id: str, body: str, parent_id: Optional[str]) -> Dict[str, Any]:
-        sql = """
-        INSERT INTO comentario (post_id, autor_id, comentario_padre_id, cuerpo)
-        VALUES (:pid, :uid, :parent, :body)
-        RETURNING comentario_id, post_id, autor_id, comentario_padre_id, cuerpo, creado_en, actualizado_en
+    async def list_tree(
+        self,
+        *,
+        post_id: str,
+        parent_id: Optional[str],
+        limit: int,
+        after: Optional[Tuple[datetime, int]],
+        depth: int,
+        children_limit: int,
+    ) -> List[Dict[str, Any]]:
+        """
+        Subárbol de comentarios en una sola consulta (CTE recursiva).
+
+        El primer nivel son las respuestas a ``parent_id`` (o los comentarios
+        top-level si es None), paginadas por keyset con ``after`` y ``limit``.
+        Cada nivel siguiente trae hasta ``children_limit`` respuestas por
+        comentario, hasta ``depth`` niveles. Devuelve filas planas con ``depth``
+        y ``reply_count`` (respuestas directas totales) para armar el árbol.
         """
-        res = await self.session.execute(text(sql), {
+        params: Dict[str, Any] = {
+            "pid": int(post_id), "lim": limit, "depth": depth, "per_level": children_limit,
+        }
+        if parent_id:
+            params["parent"] = int(parent_id)
+        if after:
+            params["after_ts"], params["after_id"] = after
+        stmt = _tree_statement(bool(parent_id), bool(after))
+        res = await self.session.execute(stmt, params)
+        return [
+            {**self._to_public(dict(r)), "depth": r["depth"], "reply_count": r["reply_count"]}
+            for r in res.mappings().all()
+        ]
+
+    async def create(self, *, post_id: str, author_id: str, body: str, parent_id: Optional[str]) -> Dict[str, Any]:
+        res = await self.session.execute(_CREATE, {
             "pid": int(post_id), "uid": int(author_id),
             "parent": int(parent_id) if parent_id else None,
             "body": body
         })
         row = dict(res.mappings().one())
-        await self.session.commit()
         row.update({"upvotes": 0, "downvotes": 0, "score": 0})
         return self._to_public(row)
 
     async def vote(self, *, comment_id: str, user_id: str, value: int) -> Dict[str, Any]:
-        upsert = """
-        INSERT INTO comentario_voto (comentario_id, usuario_id, valor)
-        VALUES (:cid, :uid, :val)
-        ON CONFLICT (comentario_id, usuario_id) DO UPDATE SET valor = EXCLUDED.valor, votado_en = NOW()
-        """
-        await self.session.execute(text(upsert), {"cid": int(comment_id), "uid": int(user_id), "val": int(value)})
-        await self.session.commit()
-        sql = """
-        SELECT
-          c.comentario_id, c.post_id, c.autor_id, c.comentario_padre_id, c.cuerpo,
-          c.creado_en, c.actualizado_en,
-          COALESCE(SUM(CASE WHEN cv.valor = 1 THEN 1 ELSE 0 END),0)::int AS upvotes,
-          COALESCE(SUM(CASE WHEN cv.valor = -1 THEN 1 ELSE 0 END),0)::int AS downvotes,
-          COALESCE(SUM(CASE WHEN cv.valor = 1 THEN 1 WHEN cv.valor = -1 THEN -1 ELSE 0 END),0)::int AS score
-        FROM comentario c
-        LEFT JOIN comentario_voto cv ON cv.comentario_id = c.comentario_id
-        WHERE c.comentario_id = :cid
-        GROUP BY c.comentario_id
-        """
-        res = await self.session.execute(text(sql), {"cid": int(comment_id)})
+        await self.session.execute(_VOTE_UPSERT, {"cid": int(comment_id), "uid": int(user_id), "val": int(value)})
+        res = await self.session.execute(_GET_WITH_VOTES, {"cid": int(comment_id)})
         return self._to_public(dict(res.mappings().one()))
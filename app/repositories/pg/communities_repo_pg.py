@@ -1,11 +1,109 @@
 from __future__ import annotations
-from typing import List, Optional, Dict, Any
+from functools import lru_cache
+from typing import Iterable, List, Optional, Dict, Any, Set, Tuple
 
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import TextClause
 
 from app.schemas.communities import CommunityCreate, CommunityPublic
 
+_CREATE = text("""
+    INSERT INTO comunidad (nombre, descripcion, es_oficial)
+    VALUES (:nombre, :desc, false)
+    RETURNING comunidad_id, nombre, descripcion
+""").execution_options(query_shape="CommunitiesRepoPG.create")
+
+# member_count se mantiene en la misma sentencia que escribe la membresía:
+# sólo cuenta las filas que realmente se insertaron o borraron
+_JOIN = text("""
+    WITH ins AS (
+        INSERT INTO comunidad_miembro (comunidad_id, usuario_id, rol)
+        VALUES (:cid, :uid, 'U')
+        ON CONFLICT (comunidad_id, usuario_id) DO NOTHING
+        RETURNING comunidad_id
+    )
+    UPDATE comunidad SET member_count = member_count + 1
+    WHERE comunidad_id IN (SELECT comunidad_id FROM ins)
+""").execution_options(query_shape="CommunitiesRepoPG.join")
+
+# las filas de ``ins`` no son visibles para el SELECT del mismo statement:
+# el resultado es lo insertado más lo que ya existía
+_JOIN_MANY = text("""
+    WITH ins AS (
+        INSERT INTO comunidad_miembro (comunidad_id, usuario_id, rol)
+        SELECT c.comunidad_id, :uid, 'U'
+        FROM unnest(CAST(:cids AS bigint[])) AS u(cid)
+        JOIN comunidad c ON c.comunidad_id = u.cid
+        ON CONFLICT (comunidad_id, usuario_id) DO NOTHING
+        RETURNING comunidad_id
+    ), bump AS (
+        UPDATE comunidad SET member_count = member_count + 1
+        WHERE comunidad_id IN (SELECT comunidad_id FROM ins)
+    )
+    SELECT comunidad_id FROM ins
+    UNION
+    SELECT comunidad_id FROM comunidad_miembro
+    WHERE usuario_id = :uid AND comunidad_id = ANY(CAST(:cids AS bigint[]))
+""").execution_options(query_shape="CommunitiesRepoPG.join_many")
+
+_LEAVE = text("""
+    WITH del AS (
+        DELETE FROM comunidad_miembro
+        WHERE comunidad_id = :cid AND usuario_id = :uid
+        RETURNING comunidad_id
+    )
+    UPDATE comunidad SET member_count = member_count - 1
+    WHERE comunidad_id IN (SELECT comunidad_id FROM del)
+""").execution_options(query_shape="CommunitiesRepoPG.leave")
+
+_GET = text("""
+    SELECT comunidad_id, nombre, descripcion, member_count
+    FROM comunidad
+    WHERE comunidad_id = :cid
+""").execution_options(query_shape="CommunitiesRepoPG.get")
+
+_VERSION = text("""
+    SELECT actualizado_en, member_count
+    FROM comunidad
+    WHERE comunidad_id = :cid
+""").execution_options(query_shape="CommunitiesRepoPG.version")
+
+_INDEX_ENTRIES = text("""
+    SELECT comunidad_id, nombre, member_count FROM comunidad
+""").execution_options(query_shape="CommunitiesRepoPG.index_entries")
+
+_RECONCILE_MEMBER_COUNTS = text("""
+    UPDATE comunidad c SET member_count = s.n
+    FROM (
+      SELECT c2.comunidad_id, COUNT(m.usuario_id)::int AS n
+      FROM comunidad c2
+      LEFT JOIN comunidad_miembro m ON m.comunidad_id = c2.comunidad_id
+      GROUP BY c2.comunidad_id
+    ) s
+    WHERE c.comunidad_id = s.comunidad_id AND c.member_count <> s.n
+""").execution_options(query_shape="CommunitiesRepoPG.reconcile_member_counts")
+
+
+@lru_cache(maxsize=None)
+def _search_statement(by_name: bool, seek: bool) -> TextClause:
+    conditions = []
+    if by_name:
+        conditions.append("nombre ILIKE '%' || :q || '%'")
+    if seek:
+        # orden mixto (DESC, ASC): no sirve la comparación de filas
+        conditions.append("(member_count < :after_mc OR (member_count = :after_mc AND nombre > :after_name))")
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    # ORDER BY member_count DESC, nombre: lo recorre idx_comunidad_ranking sin ordenar
+    return text(f"""
+        SELECT comunidad_id, nombre, descripcion, member_count
+        FROM comunidad
+        {where}
+        ORDER BY member_count DESC, nombre
+        LIMIT :lim
+    """).execution_options(query_shape="CommunitiesRepoPG.search")
+
+
 class CommunitiesRepoPG:
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -20,73 +118,68 @@ class CommunitiesRepoPG:
         )
 
     async def create(self, body: CommunityCreate) -> CommunityPublic:
-        q = text("""
-            INSERT INTO comunidad (nombre, descripcion, es_oficial)
-            VALUES (:nombre, :desc, false)
-            RETURNING comunidad_id, nombre, descripcion
-        """)
-        res = await self.session.execute(q, {"nombre": body.name, "desc": body.description})
+        res = await self.session.execute(_CREATE, {"nombre": body.name, "desc": body.description})
         row = res.mappings().one()
-        await self.session.commit()
         row = dict(row)
         row["member_count"] = 0
         return self._to_public(row)
 
     async def join(self, community_id: str, user_id: str) -> None:
-        q = text("""
-            INSERT INTO comunidad_miembro (comunidad_id, usuario_id, rol)
-            VALUES (:cid, :uid, 'U')
-            ON CONFLICT (comunidad_id, usuario_id) DO NOTHING
-        """)
-        await self.session.execute(q, {"cid": int(community_id), "uid": int(user_id)})
-        await self.session.commit()
+        await self.session.execute(_JOIN, {"cid": int(community_id), "uid": int(user_id)})
+
+    async def join_many(self, user_id: str, community_ids: Iterable[str]) -> Set[str]:
+        """
+        Une al usuario a varias comunidades en un solo INSERT multi-fila.
+        Ignora ids inexistentes y membresías previas; devuelve el conjunto de
+        ``community_ids`` de las que el usuario queda siendo miembro.
+        """
+        cids = sorted({int(cid) for cid in community_ids})
+        if not cids:
+            return set()
+        res = await self.session.execute(_JOIN_MANY, {"uid": int(user_id), "cids": cids})
+        return {str(r[0]) for r in res.all()}
 
     async def leave(self, community_id: str, user_id: str) -> None:
-        q = text("""
-            DELETE FROM comunidad_miembro
-            WHERE comunidad_id = :cid AND usuario_id = :uid
-        """)
-        await self.session.execute(q, {"cid": int(community_id), "uid": int(user_id)})
-        await self.session.commit()
+        await self.session.execute(_LEAVE, {"cid": int(community_id), "uid": int(user_id)})
 
     async def get(self, community_id: str) -> Optional[CommunityPublic]:
-        q = text("""
-            SELECT c.comunidad_id, c.nombre, c.descripcion,
-                   COUNT(m.usuario_id)::int AS member_count
-            FROM comunidad c
-            LEFT JOIN comunidad_miembro m ON m.comunidad_id = c.comunidad_id
-            WHERE c.comunidad_id = :cid
-            GROUP BY c.comunidad_id, c.nombre, c.descripcion
-        """)
-        res = await self.session.execute(q, {"cid": int(community_id)})
+        res = await self.session.execute(_GET, {"cid": int(community_id)})
         row = res.mappings().first()
         return self._to_public(row) if row else None
 
-    async def search(self, qtext: str | None, limit: int = 20) -> List[CommunityPublic]:
+    async def version(self, community_id: str) -> Optional[Tuple]:
+        res = await self.session.execute(_VERSION, {"cid": int(community_id)})
+        row = res.first()
+        return tuple(row) if row else None
+
+    async def search(
+        self,
+        qtext: str | None,
+        limit: int = 20,
+        after: Optional[Tuple[int, str]] = None,
+    ) -> List[CommunityPublic]:
+        """
+        Comunidades ordenadas por cantidad de miembros y nombre. ``after`` es la
+        clave ``(member_count, nombre)`` de la última comunidad entregada (keyset).
+        """
+        params: Dict[str, Any] = {"lim": limit}
         if qtext:
-            q = text("""
-                SELECT c.comunidad_id, c.nombre, c.descripcion,
-                       COUNT(m.usuario_id)::int AS member_count
-                FROM comunidad c
-                LEFT JOIN comunidad_miembro m ON m.comunidad_id = c.comunidad_id
-                WHERE c.nombre ILIKE '%' || :q || '%'
-                GROUP BY c.comunidad_id, c.nombre, c.descripcion
-                ORDER BY member_count DESC, c.nombre
-                LIMIT :lim
-            """)
-            params = {"q": qtext, "lim": limit}
-        else:
-            q = text("""
-                SELECT c.comunidad_id, c.nombre, c.descripcion,
-                       COUNT(m.usuario_id)::int AS member_count
-                FROM comunidad c
-                LEFT JOIN comunidad_miembro m ON m.comunidad_id = c.comunidad_id
-                GROUP BY c.comunidad_id, c.nombre, c.descripcion
-                ORDER BY member_count DESC, c.nombre
-                LIMIT :lim
-            """)
-            params = {"lim": limit}
-
-        res = await self.session.execute(q, params)
+            params["q"] = qtext
+        if after:
+            params["after_mc"], params["after_name"] = after
+        res = await self.session.execute(_search_statement(bool(qtext), bool(after)), params)
         rows = res.mappings().all()
         return [self._to_public(r) for r in rows]
+
+    async def index_entries(self) -> List[Tuple[str, str, int]]:
+        """``(id, nombre, member_count)`` de todas las comunidades, para el autocompletado."""
+        res = await self.session.execute(_INDEX_ENTRIES)
+        return [(str(cid), nombre, member_count) for cid, nombre, member_count in res.all()]
+
+    async def reconcile_member_counts(self) -> int:
+        """
+        Recalcula ``comunidad.member_count`` a partir de ``comunidad_miembro``.
+        Sólo toca las filas que derivaron; devuelve cuántas se corrigieron.
+        """
+        res = await self.session.execute(_RECONCILE_MEMBER_COUNTS)
+        return res.rowcount
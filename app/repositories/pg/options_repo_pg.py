@@ -0,0 +1,26 @@
+from __future__ import annotations
+from typing import Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+_LOAD = text("""
+    SELECT tipo, valor
+    FROM opcion_onboarding
+    ORDER BY tipo, orden, valor
+""").execution_options(query_shape="OptionsRepoPG.load")
+
+
+class OptionsRepoPG:
+    """Opciones de onboarding cargadas desde ``opcion_onboarding`` (una vez, al arrancar)."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def load(self) -> Dict[str, List[str]]:
+        """``tipo`` -> valores en orden (``careers``, ``years``)."""
+        res = await self.session.execute(_LOAD)
+        out: Dict[str, List[str]] = {}
+        for tipo, valor in res.all():
+            out.setdefault(tipo, []).append(valor)
+        return out
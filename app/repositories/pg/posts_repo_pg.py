@@ -1,8 +1,203 @@
 from __future__ import annotations
-from typing import Any, Dict, Optional, List
+from functools import lru_cache
+from typing import Any, Dict, Optional, List, Tuple
 
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import TextClause
+
+# Expresión de orden de cada modo del feed; el desempate siempre es post_id DESC
+_SORT_EXPR = {
+    "new": "p.creado_en",
+    "hot": "p.hot_score",
+    "top": "p.score",
+    "relevance": "ts_rank(p.busqueda, websearch_to_tsquery('spanish', :q))::float8",
+}
+
+# ------- Sentencias (se arman una sola vez, al importar el módulo) -------
+# Con el mismo texto SQL en cada llamada, asyncpg reutiliza el prepared
+# statement de la conexión y Postgres puede pasar a un plan genérico.
+
+_POST_COLUMNS = """
+  p.post_id, p.comunidad_id, p.autor_id, p.titulo, p.cuerpo, p.mejor_comentario_id,
+  p.creado_en, p.actualizado_en, p.estado,
+  c.nombre AS community_name,
+  p.etiqueta,
+  p.upvotes, p.downvotes, p.score, p.comments_count, p.hot_score"""
+
+
+@lru_cache(maxsize=None)
+def _list_statement(sort: str, by_community: bool, search: bool, seek: bool) -> TextClause:
+    """
+    Una sentencia por forma de consulta del feed (orden x filtros presentes):
+    a lo sumo 4 x 2 x 2 x 2 textos distintos, cada uno con su propio plan.
+    """
+    key = _SORT_EXPR[sort]
+    where = ["p.estado = 'A'"]
+    if by_community:
+        where.append("p.comunidad_id = :cid")
+    if search:
+        where.append("p.busqueda @@ websearch_to_tsquery('spanish', :q)")
+    if seek:
+        where.append(f"({key}, p.post_id) < (:after_key, :after_id)")
+    rank = f", {_SORT_EXPR['relevance']} AS rank" if sort == "relevance" else ""
+    return text(f"""
+        SELECT {_POST_COLUMNS}{rank}
+        FROM post p
+        JOIN comunidad c ON c.comunidad_id = p.comunidad_id
+        WHERE {" AND ".join(where)}
+        ORDER BY {key} DESC, p.post_id DESC
+        LIMIT :lim
+    """).execution_options(query_shape=f"PostsRepoPG.list:{sort}")
+
+
+_GET = text(f"""
+    SELECT {_POST_COLUMNS}
+    FROM post p
+    JOIN comunidad c ON c.comunidad_id = p.comunidad_id
+    WHERE p.post_id = :id
+""").execution_options(query_shape="PostsRepoPG.get")
+
+# Versión para GET condicional: sólo lo que cambia la representación, sin join
+_VERSION = text("""
+    SELECT actualizado_en, estado, upvotes, downvotes, comments_count, mejor_comentario_id
+    FROM post WHERE post_id = :id
+""").execution_options(query_shape="PostsRepoPG.version")
+
+_GET_VOTE = text("""
+    SELECT valor FROM post_voto WHERE post_id = :pid AND usuario_id = :uid
+""").execution_options(query_shape="PostsRepoPG.get_vote")
+
+_CREATE = text("""
+    INSERT INTO post (comunidad_id, autor_id, titulo, cuerpo, etiqueta)
+    VALUES (:cid, :uid, :title, :body, :tag)
+    RETURNING post_id, comunidad_id, autor_id, titulo, cuerpo, mejor_comentario_id,
+              creado_en, actualizado_en, estado, etiqueta
+""").execution_options(query_shape="PostsRepoPG.create")
+
+# Los votos de un post se serializan tomando antes el lock de su fila: el
+# FOR UPDATE sobre post_voto no alcanza, porque dos primeros votos
+# concurrentes no encuentran fila que bloquear y ambos contarían como nuevos.
+# En READ COMMITTED la sentencia siguiente ya ve el voto del que tenía el lock.
+_LOCK_POST = text(
+    "SELECT 1 FROM post WHERE post_id = :pid FOR UPDATE"
+).execution_options(query_shape="PostsRepoPG.vote:lock")
+_LOCK_POSTS = text("""
+    SELECT post_id FROM post
+    WHERE post_id = ANY(CAST(:pids AS bigint[]))
+    ORDER BY post_id  -- siempre en el mismo orden, para no cruzar locks
+    FOR UPDATE
+""").execution_options(query_shape="PostsRepoPG.vote_many:lock")
+
+_VOTE = text("""
+    WITH prev AS (
+      SELECT valor FROM post_voto
+      WHERE post_id = :pid AND usuario_id = :uid
+    ), ins AS (
+      INSERT INTO post_voto (post_id, usuario_id, valor)
+      VALUES (:pid, :uid, :val)
+      ON CONFLICT (post_id, usuario_id)
+      DO UPDATE SET valor = EXCLUDED.valor, votado_en = NOW()
+      RETURNING valor
+    ), d AS (
+      SELECT
+        (ins.valor = 1)::int  - COALESCE((SELECT (valor = 1)::int  FROM prev), 0) AS d_up,
+        (ins.valor = -1)::int - COALESCE((SELECT (valor = -1)::int FROM prev), 0) AS d_down
+      FROM ins
+    )
+    UPDATE post p SET
+      upvotes   = p.upvotes + d.d_up,
+      downvotes = p.downvotes + d.d_down,
+      score     = p.score + d.d_up - d.d_down,
+      hot_score = post_hot_score(p.score + d.d_up - d.d_down, p.comments_count, p.creado_en)
+    FROM d
+    WHERE p.post_id = :pid
+""").execution_options(query_shape="PostsRepoPG.vote")
+
+_VOTE_MANY = text("""
+    WITH input AS (
+      SELECT i.post_id, i.usuario_id, i.valor
+      FROM unnest(CAST(:pids AS bigint[]), CAST(:uids AS bigint[]), CAST(:vals AS smallint[]))
+           AS i(post_id, usuario_id, valor)
+      JOIN post p ON p.post_id = i.post_id
+      JOIN usuario u ON u.usuario_id = i.usuario_id
+    ), prev AS (
+      SELECT pv.post_id, pv.usuario_id, pv.valor
+      FROM post_voto pv
+      JOIN input i ON i.post_id = pv.post_id AND i.usuario_id = pv.usuario_id
+    ), ins AS (
+      INSERT INTO post_voto (post_id, usuario_id, valor)
+      SELECT post_id, usuario_id, valor FROM input
+      ON CONFLICT (post_id, usuario_id)
+      DO UPDATE SET valor = EXCLUDED.valor, votado_en = NOW()
+    ), d AS (
+      SELECT
+        i.post_id,
+        SUM((i.valor = 1)::int  - COALESCE((pr.valor = 1)::int, 0))  AS d_up,
+        SUM((i.valor = -1)::int - COALESCE((pr.valor = -1)::int, 0)) AS d_down
+      FROM input i
+      LEFT JOIN prev pr ON pr.post_id = i.post_id AND pr.usuario_id = i.usuario_id
+      GROUP BY i.post_id
+    )
+    UPDATE post p SET
+      upvotes   = p.upvotes + d.d_up,
+      downvotes = p.downvotes + d.d_down,
+      score     = p.score + d.d_up - d.d_down,
+      hot_score = post_hot_score((p.score + d.d_up - d.d_down)::int, p.comments_count, p.creado_en)
+    FROM d
+    WHERE p.post_id = d.post_id
+    RETURNING p.post_id
+""").execution_options(query_shape="PostsRepoPG.vote_many")
+
+_BOOKMARK_EXISTS = text(
+    "SELECT 1 FROM post_guardado WHERE post_id=:pid AND usuario_id=:uid"
+).execution_options(query_shape="PostsRepoPG.toggle_bookmark:exists")
+_BOOKMARK_DELETE = text(
+    "DELETE FROM post_guardado WHERE post_id=:pid AND usuario_id=:uid"
+).execution_options(query_shape="PostsRepoPG.toggle_bookmark:delete")
+_BOOKMARK_INSERT = text(
+    "INSERT INTO post_guardado (post_id, usuario_id) VALUES (:pid,:uid)"
+).execution_options(query_shape="PostsRepoPG.toggle_bookmark:insert")
+
+_DELETE = text(
+    "UPDATE post SET estado = 'E' WHERE post_id = :pid"
+).execution_options(query_shape="PostsRepoPG.delete")
+
+_RECONCILE_STATS = text("""
+    UPDATE post p SET
+      upvotes = s.upvotes,
+      downvotes = s.downvotes,
+      score = s.upvotes - s.downvotes,
+      comments_count = s.comments_count,
+      hot_score = post_hot_score(s.upvotes - s.downvotes, s.comments_count, p.creado_en)
+    FROM (
+      SELECT
+        p2.post_id,
+        COALESCE(v.upvotes, 0)::int AS upvotes,
+        COALESCE(v.downvotes, 0)::int AS downvotes,
+        COALESCE(cm.comments_count, 0)::int AS comments_count
+      FROM post p2
+      LEFT JOIN (
+        SELECT post_id,
+               COUNT(*) FILTER (WHERE valor = 1)  AS upvotes,
+               COUNT(*) FILTER (WHERE valor = -1) AS downvotes
+        FROM post_voto GROUP BY post_id
+      ) v ON v.post_id = p2.post_id
+      LEFT JOIN (
+        SELECT post_id, COUNT(*) AS comments_count
+        FROM comentario GROUP BY post_id
+      ) cm ON cm.post_id = p2.post_id
+    ) s
+    WHERE p.post_id = s.post_id
+      AND (p.upvotes, p.downvotes, p.score, p.comments_count)
+          IS DISTINCT FROM (s.upvotes, s.downvotes, s.upvotes - s.downvotes, s.comments_count)
+""").execution_options(query_shape="PostsRepoPG.reconcile_stats")
+
+_REDECAY_HOT = text("""
+    UPDATE post SET hot_score = post_hot_score(score, comments_count, creado_en)
+    WHERE estado = 'A' AND creado_en > NOW() - make_interval(days => :days)
+""").execution_options(query_shape="PostsRepoPG.redecay_hot")
+
 
 class PostsRepoPG:
     def __init__(self, session: AsyncSession):
@@ -26,61 +221,52 @@ class PostsRepoPG:
             "downvotes": int(row.get("downvotes", 0)),
             "score": int(row.get("score", 0)),
             "comments_count": int(row.get("comments_count", 0)),
+            "hot_score": float(row.get("hot_score", 0.0)),
+            **({"rank": row["rank"]} if row.get("rank") is not None else {}),
         }
 
-    async def list(self, community_id: Optional[str], q: Optional[str], limit: int = 20) -> List[Dict[str, Any]]:
-        where = ["p.estado = 'A'"]
+    async def list(
+        self,
+        community_id: Optional[str],
+        q: Optional[str],
+        limit: int = 20,
+        after: Optional[tuple] = None,
+        sort: str = "new",
+    ) -> List[Dict[str, Any]]:
+        """
+        Posts activos ordenados según ``sort``: ``new`` (creado_en), ``hot``
+        (hot_score precalculado), ``top`` (score) o ``relevance`` (ts_rank, requiere
+        ``q``). Si viene ``q`` se filtra por full-text (índice GIN sobre ``post.busqueda``).
+
+        ``after`` es la clave keyset ``(valor de orden, post_id)`` del último post
+        de la página anterior.
+        """
         params: Dict[str, Any] = {"lim": limit}
         if community_id:
-            where.append("p.comunidad_id = :cid")
             params["cid"] = int(community_id)
         if q:
-            where.append("(p.titulo ILIKE '%' || :q || '%' OR p.cuerpo ILIKE '%' || :q || '%')")
             params["q"] = q
-        sql = f"""
-        SELECT
-          p.post_id, p.comunidad_id, p.autor_id, p.titulo, p.cuerpo, p.mejor_comentario_id,
-          p.creado_en, p.actualizado_en, p.estado,
-          c.nombre AS community_name,
-          p.etiqueta,
-          COALESCE(SUM(CASE WHEN pv.valor = 1 THEN 1 ELSE 0 END),0)::int AS upvotes,
-          COALESCE(SUM(CASE WHEN pv.valor = -1 THEN 1 ELSE 0 END),0)::int AS downvotes,
-          COALESCE(SUM(CASE WHEN pv.valor = 1 THEN 1 WHEN pv.valor = -1 THEN -1 ELSE 0 END),0)::int AS score,
-          COALESCE(COUNT(DISTINCT c2.comentario_id),0)::int AS comments_count
-        FROM post p
-        JOIN comunidad c ON c.comunidad_id = p.comunidad_id
-        LEFT JOIN post_voto pv ON pv.post_id = p.post_id
-        LEFT JOIN comentario c2 ON c2.post_id = p.post_id
-        WHERE {" AND ".join(where)}
-        GROUP BY p.post_id, c.nombre, p.etiqueta
-        ORDER BY p.creado_en DESC
-        LIMIT :lim
-        """
-        res = await self.session.execute(text(sql), params)
+        if after:
+            params["after_key"], params["after_id"] = after
+        stmt = _list_statement(sort, bool(community_id), bool(q), bool(after))
+        res = await self.session.execute(stmt, params)
         return [self._to_public(dict(r)) for r in res.mappings().all()]
 
     async def get(self, post_id: str) -> Optional[Dict[str, Any]]:
-        sql = """
-        SELECT
-          p.post_id, p.comunidad_id, p.autor_id, p.titulo, p.cuerpo, p.mejor_comentario_id,
-          p.creado_en, p.actualizado_en, p.estado,
-          c.nombre AS community_name,
-          p.etiqueta,
-          COALESCE(SUM(CASE WHEN pv.valor = 1 THEN 1 ELSE 0 END),0)::int AS upvotes,
-          COALESCE(SUM(CASE WHEN pv.valor = -1 THEN 1 ELSE 0 END),0)::int AS downvotes,
-          COALESCE(SUM(CASE WHEN pv.valor = 1 THEN 1 WHEN pv.valor = -1 THEN -1 ELSE 0 END),0)::int AS score,
-          COALESCE(COUNT(DISTINCT c2.comentario_id),0)::int AS comments_count
-        FROM post p
-        JOIN comunidad c ON c.comunidad_id = p.comunidad_id
-        LEFT JOIN post_voto pv ON pv.post_id = p.post_id
-        LEFT JOIN comentario c2 ON c2.post_id = p.post_id
-        WHERE p.post_id = :id
-        GROUP BY p.post_id, c.nombre, p.etiqueta
-        """
-        res = await self.session.execute(text(sql), {"id": int(post_id)})
+        res = await self.session.execute(_GET, {"id": int(post_id)})
         row = res.mappings().first()
         return self._to_public(dict(row)) if row else None
 
+    async def version(self, post_id: str) -> Optional[Tuple]:
+        res = await self.session.execute(_VERSION, {"id": int(post_id)})
+        row = res.first()
+        return tuple(row) if row else None
+
+    async def get_vote(self, post_id: str, user_id: str) -> int:
+        """Voto ya persistido del usuario en el post (0 si no votó)."""
+        res = await self.session.execute(_GET_VOTE, {"pid": int(post_id), "uid": int(user_id)})
+        return res.scalar() or 0
+
     async def create(
         self,
         *,
@@ -90,14 +276,8 @@ class PostsRepoPG:
         body: str,
         tag: str,
     ) -> Dict[str, Any]:
-        sql = """
-        INSERT INTO post (comunidad_id, autor_id, titulo, cuerpo, etiqueta)
-        VALUES (:cid, :uid, :title, :body, :tag)
-        RETURNING post_id, comunidad_id, autor_id, titulo, cuerpo, mejor_comentario_id,
-                  creado_en, actualizado_en, estado, etiqueta
-        """
         res = await self.session.execute(
-            text(sql),
+            _CREATE,
             {
                 "cid": int(community_id),
                 "uid": int(author_id),
@@ -107,46 +287,68 @@ class PostsRepoPG:
             },
         )
         row = dict(res.mappings().one())
-        await self.session.commit()
-        row.update({"upvotes": 0, "downvotes": 0, "score": 0, "comments_count": 0})
+        row.update({"upvotes": 0, "downvotes": 0, "score": 0, "comments_count": 0, "hot_score": 0.0})
         return self._to_public(row)
 
-    async def vote(self, *, post_id: str, user_id: str, value: int) -> Dict[str, Any]:
-        upsert = """
-        INSERT INTO post_voto (post_id, usuario_id, valor)
-        VALUES (:pid, :uid, :val)
-        ON CONFLICT (post_id, usuario_id)
-        DO UPDATE SET valor = EXCLUDED.valor, votado_en = NOW()
+    async def vote(self, *, post_id: str, user_id: str, value: int) -> Optional[Dict[str, Any]]:
+        """
+        Registra el voto y ajusta los contadores desnormalizados y el hot_score de
+        ``post`` en la misma sentencia (y por lo tanto en la misma transacción).
+        El delta se calcula contra el voto previo del usuario, si lo había, con
+        la fila del post bloqueada hasta el commit. Si el post no existe no se
+        inserta nada y devuelve ``None``.
         """
+        locked = await self.session.execute(_LOCK_POST, {"pid": int(post_id)})
+        if locked.first() is None:
+            return None
         await self.session.execute(
-            text(upsert),
+            _VOTE,
             {
                 "pid": int(post_id),
                 "uid": int(user_id),
                 "val": int(value),
             },
         )
-        await self.session.commit()
         return await self.get(post_id)
 
+    async def vote_many(self, votes: List[Tuple[str, str, int]]) -> List[str]:
+        """
+        Upsert multi-fila de votos ``(post_id, usuario_id, valor)`` (sin pares
+        repetidos) con el ajuste de contadores y hot_score de cada post, todo en
+        una sentencia, con las filas de los posts bloqueadas como en ``vote``.
+        Los votos a posts o usuarios inexistentes se descartan. Devuelve los
+        post_id actualizados.
+        """
+        pids = [int(pid) for pid, _, _ in votes]
+        await self.session.execute(_LOCK_POSTS, {"pids": sorted(set(pids))})
+        res = await self.session.execute(
+            _VOTE_MANY,
+            {
+                "pids": pids,
+                "uids": [int(uid) for _, uid, _ in votes],
+                "vals": [int(val) for _, _, val in votes],
+            },
+        )
+        post_ids = [str(r[0]) for r in res.all()]
+        return post_ids
+
     async def toggle_bookmark(self, *, post_id: str, user_id: str) -> Dict[str, Any]:
         exists = await self.session.execute(
-            text("SELECT 1 FROM post_guardado WHERE post_id=:pid AND usuario_id=:uid"),
+            _BOOKMARK_EXISTS,
             {"pid": int(post_id), "uid": int(user_id)},
         )
         if exists.first():
             await self.session.execute(
-                text("DELETE FROM post_guardado WHERE post_id=:pid AND usuario_id=:uid"),
+                _BOOKMARK_DELETE,
                 {"pid": int(post_id), "uid": int(user_id)},
             )
             action = "removed"
         else:
             await self.session.execute(
-                text("INSERT INTO post_guardado (post_id, usuario_id) VALUES (:pid,:uid)"),
+                _BOOKMARK_INSERT,
                 {"pid": int(post_id), "uid": int(user_id)},
             )
             action = "added"
-        await self.session.commit()
         return {"status": "ok", "action": action}
 
     async def delete(self, post_id: str) -> Dict[str, Any]:
@@ -154,7 +356,22 @@ class PostsRepoPG:
         Elimina un post marcándolo como 'E' (Eliminado) para cumplir con la
         restricción ck_post_estado {A,H,E}.
         """
-        q = text("UPDATE post SET estado = 'E' WHERE post_id = :pid")
-        await self.session.execute(q, {"pid": int(post_id)})
-        await self.session.commit()
+        await self.session.execute(_DELETE, {"pid": int(post_id)})
         return {"status": "deleted"}
+
+    async def reconcile_stats(self) -> int:
+        """
+        Recalcula los contadores desnormalizados de ``post`` (votos y comentarios)
+        a partir de ``post_voto`` y ``comentario``, junto con su hot_score. Sólo toca las filas que
+        derivaron; devuelve cuántas se corrigieron.
+        """
+        res = await self.session.execute(_RECONCILE_STATS)
+        return res.rowcount
+
+    async def redecay_hot(self, window_days: int = 7) -> int:
+        """
+        Re-decae el hot_score de los posts activos de los últimos ``window_days``
+        días. Los más viejos ya tienen un puntaje despreciable y quedan congelados.
+        """
+        res = await self.session.execute(_REDECAY_HOT, {"days": window_days})
+        return res.rowcount
@@ -5,7 +5,57 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.schemas.users import UserCreate, UserPublic
-from app.core.security import hash_password, verify_password
+from app.core.security import password_hasher
+
+_PUBLIC_COLUMNS = "usuario_id, email, nombreCompleto, username, rol, bio, avatar_url"
+
+_CREATE = text(f"""
+    INSERT INTO usuario (email, nombreCompleto, username, rol, bio, avatar_url, password_hash)
+    VALUES (:email, :nombre, :username, :rol, NULL, NULL, :password_hash)
+    RETURNING {_PUBLIC_COLUMNS}
+""").execution_options(query_shape="UsersRepoPG.create")
+
+_GET_BY_EMAIL = text(
+    f"SELECT {_PUBLIC_COLUMNS}, password_hash FROM usuario WHERE email = :email"
+).execution_options(query_shape="UsersRepoPG.get_by_email")
+
+_GET_PUBLIC = text(
+    f"SELECT {_PUBLIC_COLUMNS} FROM usuario WHERE usuario_id = :id"
+).execution_options(query_shape="UsersRepoPG.get_public")
+
+_VERSION = text(
+    "SELECT actualizado_en FROM usuario WHERE usuario_id = :id"
+).execution_options(query_shape="UsersRepoPG.version")
+
+_SET_PASSWORD_HASH = text(
+    "UPDATE usuario SET password_hash = :h WHERE usuario_id = :id"
+).execution_options(query_shape="UsersRepoPG.verify:rehash")
+
+# Una sola forma para cualquier combinación de campos: NULL = no tocar
+_UPDATE = text(f"""
+    UPDATE usuario SET
+      nombreCompleto = COALESCE(:nombre, nombreCompleto),
+      bio = COALESCE(:bio, bio),
+      avatar_url = COALESCE(:avatar, avatar_url)
+    WHERE usuario_id = :id
+    RETURNING {_PUBLIC_COLUMNS}
+""").execution_options(query_shape="UsersRepoPG.update")
+
+_GET_ONBOARDING = text("""
+    SELECT carrera_nombre, cuatrimestre, on_boarded
+    FROM preferencia_usuario WHERE usuario_id = :id
+""").execution_options(query_shape="UsersRepoPG.get_onboarding")
+
+_SET_ONBOARDING = text("""
+    INSERT INTO preferencia_usuario (usuario_id, carrera_nombre, cuatrimestre, on_boarded)
+    VALUES (:id, :carrera, :cuatri, :done)
+    ON CONFLICT (usuario_id)
+    DO UPDATE SET carrera_nombre = EXCLUDED.carrera_nombre,
+                  cuatrimestre = EXCLUDED.cuatrimestre,
+                  on_boarded = EXCLUDED.on_boarded,
+                  actualizado_en = NOW()
+""").execution_options(query_shape="UsersRepoPG.set_onboarding")
+
 
 class UsersRepoPG:
     """
@@ -31,40 +81,32 @@ class UsersRepoPG:
 
     # ------- CRUD auth/perfil -------
     async def create(self, user: UserCreate) -> UserPublic:
-        q = text("""
-            INSERT INTO usuario (email, nombreCompleto, username, rol, bio, avatar_url, password_hash)
-            VALUES (:email, :nombre, :username, :rol, NULL, NULL, :password_hash)
-            RETURNING usuario_id, email, nombreCompleto, username, rol, bio, avatar_url
-        """)
-        res = await self.session.execute(q, {
+        password_hash = await password_hasher.hash(user.password)
+        res = await self.session.execute(_CREATE, {
             "email": user.email,
             "nombre": user.name,
             "username": user.username,
             "rol": user.role,
-            "password_hash": hash_password(user.password).encode()  # passlib -> bytes
+            "password_hash": password_hash.encode()  # passlib -> bytes
         })
         row = res.mappings().one()
-        await self.session.commit()
         return self._to_public(dict(row))
 
     async def get_by_email(self, email: str) -> Optional[dict]:
-        q = text("""
-            SELECT usuario_id, email, nombreCompleto, username, rol, bio, avatar_url, password_hash
-            FROM usuario WHERE email = :email
-        """)
-        res = await self.session.execute(q, {"email": email})
+        res = await self.session.execute(_GET_BY_EMAIL, {"email": email})
         row = res.mappings().first()
         return dict(row) if row else None
 
     async def get_public(self, user_id: str) -> Optional[UserPublic]:
-        q = text("""
-            SELECT usuario_id, email, nombreCompleto, username, rol, bio, avatar_url
-            FROM usuario WHERE usuario_id = :id
-        """)
-        res = await self.session.execute(q, {"id": int(user_id)})
+        res = await self.session.execute(_GET_PUBLIC, {"id": int(user_id)})
         row = res.mappings().first()
         return self._to_public(dict(row)) if row else None
 
+    async def version(self, user_id: str) -> Optional[tuple]:
+        res = await self.session.execute(_VERSION, {"id": int(user_id)})
+        row = res.first()
+        return tuple(row) if row else None
+
     async def verify(self, email: str, password: str) -> Optional[dict]:
         rec = await self.get_by_email(email)
         if not rec:
@@ -73,41 +115,31 @@ class UsersRepoPG:
         stored = rec["password_hash"]
         if isinstance(stored, memoryview):
             stored = stored.tobytes()
-        ok = verify_password(password, bytes(stored))
+        ok, new_hash = await password_hasher.verify_and_update(password, bytes(stored))
+        if ok and new_hash:
+            # el costo de bcrypt cambió: persistimos el hash regenerado
+            await self.session.execute(
+                _SET_PASSWORD_HASH,
+                {"h": new_hash.encode(), "id": rec["usuario_id"]},
+            )
         return rec if ok else None
 
     async def update(self, user_id: str, patch: dict) -> Optional[UserPublic]:
-        sets = []
-        params = {"id": int(user_id)}
-        if (name := patch.get("name")) is not None:
-            sets.append("nombreCompleto = :nombre")
-            params["nombre"] = name
-        if (bio := patch.get("bio")) is not None:
-            sets.append("bio = :bio")
-            params["bio"] = bio
-        if (avatar := patch.get("avatar_url")) is not None:
-            sets.append("avatar_url = :avatar")
-            params["avatar"] = avatar
-        if not sets:
+        params = {
+            "id": int(user_id),
+            "nombre": patch.get("name"),
+            "bio": patch.get("bio"),
+            "avatar": patch.get("avatar_url"),
+        }
+        if all(v is None for k, v in params.items() if k != "id"):
             return await self.get_public(user_id)
-
-        q = text(f"""
-            UPDATE usuario SET {", ".join(sets)}
-            WHERE usuario_id = :id
-            RETURNING usuario_id, email, nombreCompleto, username, rol, bio, avatar_url
-        """)
-        res = await self.session.execute(q, params)
+        res = await self.session.execute(_UPDATE, params)
         row = res.mappings().first()
-        await self.session.commit()
         return self._to_public(dict(row)) if row else None
 
     # ------- Onboarding / preferencias -------
     async def get_onboarding(self, user_id: str) -> dict:
-        q = text("""
-            SELECT carrera_nombre, cuatrimestre, on_boarded
-            FROM preferencia_usuario WHERE usuario_id = :id
-        """)
-        res = await self.session.execute(q, {"id": int(user_id)})
+        res = await self.session.execute(_GET_ONBOARDING, {"id": int(user_id)})
         row = res.mappings().first()
         return {
             "done": bool(row["on_boarded"]) if row else False,
@@ -122,17 +154,7 @@ class UsersRepoPG:
         career = careers[0] if careers else None
         year = data.get("year")
         done = bool(career or data.get("favorite_communities"))
-        q = text("""
-            INSERT INTO preferencia_usuario (usuario_id, carrera_nombre, cuatrimestre, on_boarded)
-            VALUES (:id, :carrera, :cuatri, :done)
-            ON CONFLICT (usuario_id)
-            DO UPDATE SET carrera_nombre = EXCLUDED.carrera_nombre,
-                          cuatrimestre = EXCLUDED.cuatrimestre,
-                          on_boarded = EXCLUDED.on_boarded,
-                          actualizado_en = NOW()
-        """)
-        await self.session.execute(q, {"id": int(user_id), "carrera": career, "cuatri": year, "done": done})
-        await self.session.commit()
+        await self.session.execute(_SET_ONBOARDING, {"id": int(user_id), "carrera": career, "cuatri": year, "done": done})
         return {
             "done": done,
             "careers": careers,
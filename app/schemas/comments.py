@@ -8,3 +8,4 @@ class CommentPublic(BaseModel):
 
 class CommentCreate(BaseModel):
     content: str
+    parent_id: str | None = None   # respuesta a otro comentario (threads)
@@ -1,6 +1,9 @@
 from enum import Enum
+from typing import Generic, TypeVar
 from pydantic import BaseModel
 
+T = TypeVar("T")
+
 class Role(str, Enum):
     Profesor = "Profesor"
     Estudiante = "Estudiante"
@@ -10,6 +13,6 @@ class VoteStatus(str, Enum):
     down = "down"
     none = "none"
 
-class Page(BaseModel):
-    items: list
-    next_cursor: str | None = None
+class Page(BaseModel, Generic[T]):
+    items: list[T]
+    next_cursor: str | None = None   # cursor opaco para pedir la página siguiente (None = última)
@@ -10,3 +10,8 @@ class CommunityPublic(CommunityBase):
 
 class CommunityCreate(CommunityBase):
     pass
+
+class CommunitySuggestion(BaseModel):
+    id: str
+    name: str
+    member_count: int = 0
@@ -2,13 +2,17 @@ from fastapi import HTTPException, status
 from app.schemas.auth import LoginRequest, AuthResponse
 from app.schemas.users import UserCreate, UserPublic
 from app.core.security import create_access_token
+from app.db.uow import NullUnitOfWork
 
 class AuthService:
-    def __init__(self, users):
+    def __init__(self, users, uow=None):
         self.users = users
+        self.uow = uow or NullUnitOfWork()
 
     async def login(self, body: LoginRequest) -> AuthResponse:
-        rec = await self.users.verify(body.email, body.password)
+        # verify puede reescribir el hash (rehash-on-login): va en transacción
+        async with self.uow.transaction():
+            rec = await self.users.verify(body.email, body.password)
         if not rec:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Credenciales inválidas")
         token = create_access_token(str(rec["usuario_id"]))
@@ -1,20 +1,52 @@
+from app.core.pagination import decode_cursor, page_window
+from app.db.uow import NullUnitOfWork
+from app.schemas.common import Page
 from app.schemas.communities import CommunityCreate, CommunityPublic
+from app.services.community_suggest import CommunitySuggestIndex
+
+SUGGEST_MAX_LIMIT = 50
 
 class CommunitiesService:
-    def __init__(self, repo):
+    def __init__(self, repo, uow=None, suggest_index: CommunitySuggestIndex | None = None):
         self.repo = repo
+        self.uow = uow or NullUnitOfWork()
+        self.suggest_index = suggest_index
 
     async def create(self, body: CommunityCreate) -> CommunityPublic:
-        return await self.repo.create(body)
+        async with self.uow.transaction():
+            community = await self.repo.create(body)
+        # recién después del commit: el índice no debe sugerir una comunidad que no existe
+        if self.suggest_index is not None:
+            self.suggest_index.add(community.id, community.name, community.member_count)
+        return community
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[dict]:
+        """Comunidades cuyo nombre (alguna de sus palabras) empieza con ``prefix``."""
+        if self.suggest_index is None:
+            return []
+        return self.suggest_index.suggest(prefix, max(1, min(limit, SUGGEST_MAX_LIMIT)))
 
-    async def search(self, q: str | None, limit: int = 20) -> list[CommunityPublic]:
-        return await self.repo.search(q, limit)
+    async def search(self, q: str | None, limit: int = 20, cursor: str | None = None) -> Page[CommunityPublic]:
+        after = decode_cursor(cursor, int, str) if cursor else None
+        rows = await self.repo.search(q, limit + 1, after=after)
+        items, next_cursor = page_window(rows, limit, lambda c: (c.member_count, c.name))
+        return Page[CommunityPublic](items=items, next_cursor=next_cursor)
 
     async def join(self, community_id: str, user_id: str) -> None:
-        await self.repo.join(community_id, user_id)
+        async with self.uow.transaction():
+            await self.repo.join(community_id, user_id)
 
     async def leave(self, community_id: str, user_id: str) -> None:
-        await self.repo.leave(community_id, user_id)
+        async with self.uow.transaction():
+            await self.repo.leave(community_id, user_id)
 
-    async def get(self, community_id: str) -> CommunityPublic | None:
+    async def get(self, community_id: str, version: tuple | None = None) -> CommunityPublic | None:
+        """Con ``version`` el caché de lecturas sólo sirve una copia de esa misma versión."""
+        get_versioned = getattr(self.repo, "get_versioned", None)
+        if version is not None and get_versioned is not None:
+            return await get_versioned(community_id, version)
         return await self.repo.get(community_id)
+
+    async def version(self, community_id: str) -> tuple | None:
+        """``(actualizado_en, member_count)`` de la comunidad, para el ETag."""
+        return await self.repo.version(community_id)
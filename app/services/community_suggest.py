@@ -0,0 +1,133 @@
+"""
+Autocompletado de nombres de comunidades (``GET /communities/suggest``).
+
+``CommunitySuggestIndex`` vive en memoria, uno por proceso (armado en el
+lifespan), y responde sin tocar la base: un arreglo ordenado de claves
+normalizadas con ``fold`` (minúsculas, sin acentos) donde un prefijo es un
+rango contiguo que se encuentra con ``bisect``. Se indexa cada palabra del
+nombre, así "lin" encuentra "Álgebra Lineal". Los resultados se ordenan por
+cantidad de miembros y nombre.
+
+Las altas de comunidades se agregan al vuelo (``CommunitiesService.create``);
+las de otros workers y los cambios de miembros llegan con la recarga
+periódica (``community_suggest_refresh_seconds``, ver ``app/infra/jobs.py``).
+La recarga llama a ``begin_refresh`` antes de leer la base: las altas que
+lleguen mientras espera se anotan y ``replace`` las conserva.
+"""
+
+from __future__ import annotations
+
+import bisect
+import heapq
+import re
+from typing import Dict, Iterable, List, Tuple
+
+from app.core.text import fold
+
+_WORD_START = re.compile(r"(?<!\w)\w", re.UNICODE)
+_SPACES = re.compile(r"\s+")
+
+# (community_id, nombre, member_count)
+IndexEntry = Tuple[str, str, int]
+# (-member_count, nombre normalizado, community_id): orden del ranking
+Rank = Tuple[int, str, str]
+
+_SCAN_COST = 4
+
+
+def _normalize(text: str) -> str:
+    return _SPACES.sub(" ", fold(text)).strip()
+
+
+def _keys(name: str) -> List[str]:
+    """El nombre normalizado desde el comienzo de cada palabra."""
+    folded = _normalize(name)
+    return [folded[m.start():] for m in _WORD_START.finditer(folded)]
+
+
+class CommunitySuggestIndex:
+    """
+    Dos arreglos ordenados: las claves (con el puesto en el ranking de su
+    comunidad, para ordenar el rango de un prefijo) y el ranking completo. Un
+    prefijo con pocas coincidencias se resuelve ordenando su rango; uno muy
+    amplio ("a"), recorriendo el ranking hasta juntar ``limit`` que coincidan.
+    """
+
+    def __init__(self, entries: Iterable[IndexEntry] = ()):
+        self._recent: Dict[str, IndexEntry] | None = None
+        self.replace(entries)
+
+    def __len__(self) -> int:
+        return len(self._info)
+
+    @staticmethod
+    def _rank(cid: str, name: str, member_count: int) -> Rank:
+        return (-member_count, _normalize(name), cid)
+
+    def begin_refresh(self) -> None:
+        """Empieza a anotar las altas (``add``) hasta el próximo ``replace``."""
+        self._recent = {}
+
+    def replace(self, entries: Iterable[IndexEntry]) -> None:
+        """
+        Reconstruye el índice completo (se arma aparte y se reemplaza de una vez).
+        Las altas anotadas desde ``begin_refresh`` que no estén en ``entries``
+        (la lectura empezó antes que ellas) se agregan.
+        """
+        entries = list(entries)
+        if self._recent:
+            listed = {cid for cid, _, _ in entries}
+            entries.extend(e for cid, e in self._recent.items() if cid not in listed)
+        self._recent = None
+        info: Dict[str, Tuple[str, int, Tuple[str, ...]]] = {}
+        pairs: List[Tuple[str, Rank]] = []
+        ranking: List[Rank] = []
+        for cid, name, member_count in entries:
+            keys = tuple(_keys(name))
+            rank = self._rank(cid, name, member_count)
+            info[cid] = (name, member_count, keys)
+            ranking.append(rank)
+            pairs.extend((key, rank) for key in keys)
+        pairs.sort()
+        ranking.sort()
+        self._keys, self._key_ranks = [k for k, _ in pairs], [r for _, r in pairs]
+        self._ranking = ranking
+        self._info = info
+
+    def add(self, community_id: str, name: str, member_count: int = 0) -> None:
+        if self._recent is not None:
+            self._recent[community_id] = (community_id, name, member_count)
+        if community_id in self._info:
+            return
+        keys = tuple(_keys(name))
+        rank = self._rank(community_id, name, member_count)
+        self._info[community_id] = (name, member_count, keys)
+        for key in keys:
+            i = bisect.bisect_right(self._keys, key)
+            self._keys.insert(i, key)
+            self._key_ranks.insert(i, rank)
+        bisect.insort(self._ranking, rank)
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict[str, object]]:
+        needle = _normalize(prefix)
+        if not needle or limit <= 0:
+            return []
+        lo = bisect.bisect_left(self._keys, needle)
+        # la primera clave que ya no empieza con ``needle``
+        hi = bisect.bisect_left(self._keys, needle[:-1] + chr(ord(needle[-1]) + 1), lo)
+        if lo == hi:
+            return []
+        info = self._info
+        # Recorrer el ranking cuesta ~limit / densidad de coincidencias pasos
+        # (más caros que los de ordenar el rango): se elige el camino más corto
+        if _SCAN_COST * limit * len(self._ranking) < (hi - lo) ** 2:
+            best = []
+            for rank in self._ranking:
+                if any(key.startswith(needle) for key in info[rank[2]][2]):
+                    best.append(rank)
+                    if len(best) == limit:
+                        break
+        else:
+            # set: una comunidad puede coincidir por más de una palabra
+            best = heapq.nsmallest(limit, set(self._key_ranks[lo:hi]))
+        return [{"id": cid, "name": info[cid][0], "member_count": info[cid][1]} for _, _, cid in best]
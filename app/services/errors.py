@@ -0,0 +1,10 @@
+"""
+Errores de dominio de los servicios.
+
+Los servicios no conocen HTTP: levantan estas excepciones y las rutas las
+traducen al status que corresponda.
+"""
+
+
+class NotFound(LookupError):
+    """El recurso pedido no existe."""
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from app.db.uow import NullUnitOfWork
 from app.schemas.onboarding import OnboardingRequest, OnboardingState
 
 
@@ -9,14 +10,16 @@ class OnboardingService:
     Soporta tanto repositorios síncronos (memoria) como asíncronos (PostgreSQL).
     """
 
-    def __init__(self, users, comms):
+    def __init__(self, users, comms, uow=None):
         self.users = users
         self.comms = comms
+        self.uow = uow or NullUnitOfWork()
 
     async def save(self, user_id: str, body: OnboardingRequest) -> OnboardingState:
         """
         Guarda las preferencias de onboarding para el usuario y devuelve el estado actualizado.
         Si el repositorio devuelve una corutina, la espera antes de continuar.
+        Preferencias y membresías se confirman juntas, en una sola transacción.
         """
         payload = {
             "careers": body.careers,
@@ -25,15 +28,14 @@ class OnboardingService:
             "favorite_communities": body.favorite_communities,
         }
 
-        # Llama a set_onboarding; puede ser síncrono o asíncrono
-        res = self.users.set_onboarding(user_id, payload)
-        state = await res if hasattr(res, "__await__") else res
+        async with self.uow.transaction():
+            # Llama a set_onboarding; puede ser síncrono o asíncrono
+            res = self.users.set_onboarding(user_id, payload)
+            state = await res if hasattr(res, "__await__") else res
 
-        # Auto-unirse a comunidades favoritas si el repo tiene join
-        for cid in body.favorite_communities:
-            join_res = self.comms.join(cid, user_id)
-            if hasattr(join_res, "__await__"):
-                await join_res
+            # Auto-unirse a las comunidades favoritas, todas en un solo INSERT
+            if body.favorite_communities:
+                await self.comms.join_many(user_id, body.favorite_communities)
 
         return OnboardingState(**state)
 
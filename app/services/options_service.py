@@ -2,14 +2,19 @@
 Servicio para proporcionar opciones utilizadas en el onboarding.
 
 Actualmente devuelve listas estáticas de carreras universitarias, años
-académicos y años de graduación. En un futuro podría consultar una base
-de datos para obtener estos valores de manera dinámica.
+académicos y años de graduación. ``OptionsCatalog`` guarda esas listas ya
+serializadas para servirlas sin recalcularlas en cada request; opcionalmente
+las carreras y años pueden venir de la tabla ``opcion_onboarding``.
 """
 
 from __future__ import annotations
 
+import json
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List
+from typing import Dict, List
+
+from app.core.conditional import make_etag
 
 
 class OptionsService:
@@ -43,10 +48,69 @@ class OptionsService:
             "5º Año",
         ]
 
-    def get_grad_years(self) -> List[str]:
+    def get_grad_years(self, now: datetime | None = None) -> List[str]:
         """
         Devuelve una lista de años de graduación estimados. Genera
         dinámicamente los próximos ocho años a partir del año en curso.
         """
-        current_year = datetime.now().year
+        current_year = (now or datetime.now()).year
         return [str(current_year + offset) for offset in range(0, 8)]
+
+
+# Cache-Control de las listas fijas (carreras, años): un día de frescura y una
+# semana más sirviendo la copia vieja mientras se revalida
+STATIC_CACHE_CONTROL = "public, max-age=86400, stale-while-revalidate=604800"
+
+
+@dataclass(frozen=True)
+class EncodedOptions:
+    """Una lista de opciones ya serializada a JSON, con su ETag."""
+
+    body: bytes
+    etag: str
+
+    @classmethod
+    def encode(cls, values: List[str]) -> "EncodedOptions":
+        # mismo formato que JSONResponse de FastAPI
+        body = json.dumps(values, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return cls(body=body, etag=make_etag(body))
+
+
+class OptionsCatalog:
+    """
+    Respuestas de ``/options/*`` pre-serializadas.
+
+    Se arma una vez por proceso (en el lifespan); las rutas devuelven los bytes
+    tal cual, sin pasar por la validación del ``response_model`` ni por el
+    encoder JSON. Los años de graduación se recalculan sólo cuando cambia el año.
+
+    ``overrides`` permite reemplazar las listas fijas (``careers``, ``years``)
+    por las cargadas de la base (tabla ``opcion_onboarding``).
+    """
+
+    def __init__(self, service: OptionsService | None = None, overrides: Dict[str, List[str]] | None = None):
+        self.service = service or OptionsService()
+        overrides = overrides or {}
+        self._static = {
+            "careers": EncodedOptions.encode(overrides.get("careers") or self.service.get_careers()),
+            "years": EncodedOptions.encode(overrides.get("years") or self.service.get_years()),
+        }
+        self._grad_years_for: int | None = None
+        self._grad_years: EncodedOptions | None = None
+
+    def get(self, name: str) -> EncodedOptions:
+        return self._static[name]
+
+    def grad_years(self, now: datetime | None = None) -> EncodedOptions:
+        now = now or datetime.now()
+        if self._grad_years is None or self._grad_years_for != now.year:
+            self._grad_years = EncodedOptions.encode(self.service.get_grad_years(now))
+            self._grad_years_for = now.year
+        return self._grad_years
+
+    @staticmethod
+    def grad_years_cache_control(now: datetime | None = None) -> str:
+        """Cacheable hasta fin de año (con tope de un día), cuando cambia la lista."""
+        now = now or datetime.now()
+        until_new_year = (datetime(now.year + 1, 1, 1) - now).total_seconds()
+        return f"public, max-age={max(0, min(86400, int(until_new_year)))}"
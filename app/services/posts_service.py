@@ -1,13 +1,59 @@
 from __future__ import annotations
-from typing import Optional, List, Dict, Any
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+
+from app.core.pagination import decode_cursor, encode_cursor, page_window
+from app.db.uow import NullUnitOfWork
+from app.infra.vote_buffer import VoteBufferFull
+from app.schemas.common import Page
+from app.services.errors import NotFound
+
+# Campo de orden y tipo de la clave del cursor para cada modo del feed
+_SORT_KEYS = {
+    "new": ("created_at", datetime),
+    "hot": ("hot_score", float),
+    "top": ("score", int),
+    "relevance": ("rank", float),
+}
+
+# Topes del árbol de comentarios (format=tree)
+MAX_TREE_DEPTH = 10
+MAX_CHILDREN_PER_LEVEL = 100
+
+def _created_key(item: Dict[str, Any]) -> tuple:
+    return (item["created_at"], int(item["id"]))
+
+def _replies_cursor(parent_id: Optional[str], last: Optional[Dict[str, Any]]) -> str:
+    """Cursor de "cargar más respuestas": (padre, clave del último hijo ya entregado)."""
+    if last is None:
+        return encode_cursor(parent_id, None, None)
+    return encode_cursor(parent_id, *_created_key(last))
 
 class PostsService:
-    def __init__(self, posts_repo, comments_repo):
+    def __init__(self, posts_repo, comments_repo, vote_buffer=None, uow=None):
         self.posts = posts_repo
         self.comments = comments_repo
+        self.vote_buffer = vote_buffer
+        self.uow = uow or NullUnitOfWork()
 
-    async def list_posts(self, community_id: Optional[str], q: Optional[str], limit: int = 20) -> List[Dict[str, Any]]:
-        return await self.posts.list(community_id=community_id, q=q, limit=limit)
+    async def list_posts(
+        self,
+        community_id: Optional[str],
+        q: Optional[str],
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        sort: Optional[str] = None,
+    ) -> Page:
+        """
+        Feed paginado por cursor. Sin ``sort`` explícito se ordena por fecha, o
+        por relevancia si hay búsqueda (``q``).
+        """
+        sort = sort or ("relevance" if q else "new")
+        field, key_type = _SORT_KEYS[sort]
+        after = decode_cursor(cursor, key_type, int) if cursor else None
+        rows = await self.posts.list(community_id=community_id, q=q, limit=limit + 1, after=after, sort=sort)
+        items, next_cursor = page_window(rows, limit, lambda item: (item[field], int(item["id"])))
+        return Page(items=items, next_cursor=next_cursor)
 
     async def create(
         self,
@@ -18,25 +64,123 @@ class PostsService:
         body: str,
         tag: str,
     ) -> Dict[str, Any]:
-        return await self.posts.create(
-            community_id=community_id,
-            author_id=author_id,
-            title=title,
-            body=body,
-            tag=tag,
-        )
+        async with self.uow.transaction():
+            return await self.posts.create(
+                community_id=community_id,
+                author_id=author_id,
+                title=title,
+                body=body,
+                tag=tag,
+            )
 
-    async def get(self, post_id: str) -> Optional[Dict[str, Any]]:
+    async def get(self, post_id: str, version: Optional[tuple] = None) -> Optional[Dict[str, Any]]:
+        """
+        Con ``version`` (la del ETag recién leída) el caché de lecturas sólo
+        sirve una copia de esa misma versión; si no, la recarga.
+        """
+        get_versioned = getattr(self.posts, "get_versioned", None)
+        if version is not None and get_versioned is not None:
+            return await get_versioned(post_id, version)
         return await self.posts.get(post_id)
 
+    async def version(self, post_id: str) -> Optional[tuple]:
+        """Campos que determinan la representación del post (para el ETag)."""
+        return await self.posts.version(post_id)
+
     async def vote(self, *, post_id: str, user_id: str, value: int) -> Dict[str, Any]:
-        return await self.posts.vote(post_id=post_id, user_id=user_id, value=value)
+        if self.vote_buffer is None:
+            return await self._vote_now(post_id=post_id, user_id=user_id, value=value)
+        # Write-behind: se encola el voto y se responde con un puntaje optimista.
+        # Los contadores leídos sólo reflejan votos ya volcados, así que el delta
+        # se calcula contra el voto persistido del usuario (no contra el pendiente)
+        post = await self.posts.get(post_id)
+        if not post:
+            raise NotFound(post_id)
+        prev = await self.posts.get_vote(post_id, user_id)
+        try:
+            self.vote_buffer.add(post_id, user_id, value)
+        except VoteBufferFull:
+            # el buffer está al tope (la base no da abasto o está caída): escritura directa
+            return await self._vote_now(post_id=post_id, user_id=user_id, value=value)
+        d_up = (value == 1) - (prev == 1)
+        d_down = (value == -1) - (prev == -1)
+        return {
+            **post,
+            "upvotes": post["upvotes"] + d_up,
+            "downvotes": post["downvotes"] + d_down,
+            "score": post["score"] + d_up - d_down,
+            "vote_pending": True,
+        }
+
+    async def _vote_now(self, *, post_id: str, user_id: str, value: int) -> Dict[str, Any]:
+        # voto + relectura del post en la misma transacción
+        async with self.uow.transaction():
+            post = await self.posts.vote(post_id=post_id, user_id=user_id, value=value)
+        if post is None:
+            raise NotFound(post_id)
+        return post
 
     async def toggle_bookmark(self, *, post_id: str, user_id: str) -> Dict[str, Any]:
-        return await self.posts.toggle_bookmark(post_id=post_id, user_id=user_id)
+        async with self.uow.transaction():
+            return await self.posts.toggle_bookmark(post_id=post_id, user_id=user_id)
+
+    async def list_comments(self, post_id: str, limit: int = 50, cursor: Optional[str] = None) -> Page:
+        after = decode_cursor(cursor, datetime, int) if cursor else None
+        rows = await self.comments.list_for_post(post_id, limit + 1, after=after)
+        items, next_cursor = page_window(rows, limit, _created_key)
+        return Page(items=items, next_cursor=next_cursor)
+
+    async def add_comment(self, *, post_id: str, author_id: str, body: str, parent_id: Optional[str] = None) -> Dict[str, Any]:
+        async with self.uow.transaction():
+            return await self.comments.create(post_id=post_id, author_id=author_id, body=body, parent_id=parent_id)
+
+    async def comment_tree(
+        self,
+        post_id: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        depth: int = 3,
+        children_limit: int = 10,
+    ) -> Page:
+        """
+        Comentarios anidados, cargados con una sola consulta al repo.
+
+        ``items`` son los comentarios del primer nivel, cada uno con ``replies``
+        (hasta ``children_limit`` por nivel y ``depth`` niveles) y ``reply_count``.
+        Si un comentario tiene más respuestas que las incluidas, trae
+        ``more_replies_cursor``: pasándolo como ``cursor`` se obtiene la página
+        siguiente de sus respuestas (con sus propios subárboles).
+        """
+        depth = max(1, min(depth, MAX_TREE_DEPTH))
+        children_limit = max(1, min(children_limit, MAX_CHILDREN_PER_LEVEL))
+        parent_id, after = None, None
+        if cursor:
+            parent_id, after_ts, after_id = decode_cursor(cursor, str, datetime, int)
+            after = (after_ts, after_id) if after_ts is not None else None
+        rows = await self.comments.list_tree(
+            post_id=post_id, parent_id=parent_id, limit=limit + 1, after=after,
+            depth=depth, children_limit=children_limit,
+        )
+        roots = [r for r in rows if r["depth"] == 1]
+        has_more = len(roots) > limit
+        roots = roots[:limit]
+        next_cursor = _replies_cursor(parent_id, roots[-1]) if has_more else None
+
+        children: Dict[str, List[Dict[str, Any]]] = {}
+        for r in rows:
+            if r["depth"] > 1:
+                children.setdefault(r["parent_id"], []).append(r)
+
+        def build(node: Dict[str, Any]) -> Dict[str, Any]:
+            replies = children.get(node["id"], [])
+            out = {k: v for k, v in node.items() if k != "depth"}
+            out["replies"] = [build(child) for child in replies]
+            more = node["reply_count"] > len(replies)
+            out["more_replies_cursor"] = _replies_cursor(node["id"], replies[-1] if replies else None) if more else None
+            return out
 
-    async def list_comments(self, post_id: str, limit: int = 50) -> List[Dict[str, Any]]:
-        return await self.comments.list_for_post(post_id, limit)
+        return Page(items=[build(r) for r in roots], next_cursor=next_cursor)
 
     async def delete(self, *, post_id: str, user_id: str) -> dict:
-        return await self.posts.delete(post_id)
+        async with self.uow.transaction():
+            return await self.posts.delete(post_id)
@@ -1,14 +1,25 @@
+from app.db.uow import NullUnitOfWork
 from app.schemas.users import UserCreate, UserUpdate, UserPublic
 
 class UsersService:
-    def __init__(self, users):
+    def __init__(self, users, uow=None):
         self.users = users
+        self.uow = uow or NullUnitOfWork()
 
-    async def get(self, user_id: str) -> UserPublic | None:
+    async def get(self, user_id: str, version: tuple | None = None) -> UserPublic | None:
+        """Con ``version`` el caché de lecturas sólo sirve una copia de esa misma versión."""
+        get_versioned = getattr(self.users, "get_public_versioned", None)
+        if version is not None and get_versioned is not None:
+            return await get_versioned(user_id, version)
         return await self.users.get_public(user_id)
 
+    async def version(self, user_id: str) -> tuple | None:
+        """``(actualizado_en,)`` del usuario, para ETag / Last-Modified."""
+        return await self.users.version(user_id)
+
     async def update(self, user_id: str, patch: UserUpdate) -> UserPublic | None:
-        return await self.users.update(user_id, patch.model_dump(exclude_none=True))
+        async with self.uow.transaction():
+            return await self.users.update(user_id, patch.model_dump(exclude_none=True))
 
     async def create(self, user: UserCreate) -> UserPublic:
         """
@@ -18,10 +29,11 @@ class UsersService:
         implementar `create` de forma síncrona (memoria) o asíncrona (Postgres);
         este wrapper se encarga de hacer await cuando sea necesario.
         """
-        res = self.users.create(user)
-        if hasattr(res, "__await__"):
-            return await res
-        return res
+        async with self.uow.transaction():
+            res = self.users.create(user)
+            if hasattr(res, "__await__"):
+                return await res
+            return res
 
     async def get_by_email(self, email: str) -> dict | None:
         """
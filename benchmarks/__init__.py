@@ -0,0 +1,13 @@
+"""
+Benchmarks de carga de la API.
+
+Levantan la app en el mismo proceso (httpx + ASGI, sin red) contra el backend
+en memoria o contra un Postgres local, corren escenarios con guion y reportan
+latencias p50/p95/p99 y throughput en JSON, etiquetado con el commit::
+
+    python -m benchmarks.run --backend memory --out results/memory.json
+    python -m benchmarks.run --backend pg --database-url postgresql+asyncpg://... --load-dump
+    python -m benchmarks.compare results/base.json results/new.json
+
+Ver ``benchmarks/run.py`` para todas las opciones.
+"""
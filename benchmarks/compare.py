@@ -0,0 +1,71 @@
+"""
+Compara dos reportes de ``benchmarks.run``.
+
+    python -m benchmarks.compare base.json nuevo.json [--threshold 10]
+
+Muestra, por escenario, p50/p95/p99 y throughput de ambos con la variación
+porcentual. Sale con código 1 si algún p95 empeoró más que ``--threshold`` %
+o si el throughput cayó más que eso.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+_METRICS = ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+
+
+def _load(path: str) -> Dict[str, Any]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def _delta(old: float, new: float) -> float:
+    return (new - old) / old * 100 if old else 0.0
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any], threshold: float) -> List[str]:
+    """Imprime la tabla y devuelve la lista de regresiones encontradas."""
+    regressions: List[str] = []
+    print(f"base:  {base['meta'].get('commit')}  ({base['meta'].get('backend')})")
+    print(f"nuevo: {new['meta'].get('commit')}  ({new['meta'].get('backend')})")
+    for key in ("backend", "concurrency", "settings"):
+        if base["meta"].get(key) != new["meta"].get(key):
+            print(f"ojo: '{key}' difiere entre las corridas, la comparación puede no ser justa")
+    for name, old in base["scenarios"].items():
+        cur = new["scenarios"].get(name)
+        if cur is None:
+            continue
+        print(f"\n{name}")
+        for metric in _METRICS:
+            d = _delta(old[metric], cur[metric])
+            print(f"  {metric:<15} {old[metric]:>10.2f} {cur[metric]:>10.2f} {d:>+8.1f}%")
+        if _delta(old["p95_ms"], cur["p95_ms"]) > threshold:
+            regressions.append(f"{name}: p95 {old['p95_ms']:.2f} -> {cur['p95_ms']:.2f} ms")
+        if _delta(old["throughput_rps"], cur["throughput_rps"]) < -threshold:
+            regressions.append(f"{name}: throughput {old['throughput_rps']:.1f} -> {cur['throughput_rps']:.1f} rps")
+        if cur["errors"] > old["errors"]:
+            regressions.append(f"{name}: errores {old['errors']} -> {cur['errors']}")
+    return regressions
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.compare")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=10.0, help="tolerancia en %% (default 10)")
+    args = parser.parse_args(argv)
+
+    regressions = compare(_load(args.base), _load(args.new), args.threshold)
+    if regressions:
+        print("\nRegresiones:")
+        for r in regressions:
+            print(f"  - {r}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Arranque de la app en el mismo proceso y loop de medición.
+
+La app se importa recién dentro de ``boot`` porque ``Settings`` se lee al
+importar ``app.core.config``: las variables de entorno (``STORAGE_BACKEND``,
+``DATABASE_URL``, ...) tienen que estar puestas antes.
+
+El cliente habla con la app por ASGI (``httpx.ASGITransport``), sin sockets: la
+medición incluye middlewares, validación, servicios, repos y serialización,
+pero no el servidor HTTP ni la red.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List
+
+import httpx
+
+from benchmarks.stats import summarize
+
+DUMP_PATH = Path(__file__).resolve().parent.parent / "rau_db_dump_postgres.sql"
+
+
+def configure_env(backend: str, database_url: str | None, overrides: Dict[str, str] | None = None) -> None:
+    os.environ["STORAGE_BACKEND"] = backend
+    if database_url:
+        os.environ["DATABASE_URL"] = database_url
+    for key, value in (overrides or {}).items():
+        os.environ[key.upper()] = value
+
+
+async def load_dump(database_url: str, *, reset: bool = False) -> None:
+    """
+    Carga ``rau_db_dump_postgres.sql`` en la base de ``database_url``.
+
+    Con ``reset`` primero borra y recrea el schema ``public``: sólo para una
+    base descartable de benchmarks.
+    """
+    import asyncpg
+    from sqlalchemy.engine import make_url
+
+    url = make_url(database_url).set(drivername="postgresql")
+    conn = await asyncpg.connect(url.render_as_string(hide_password=False))
+    try:
+        if reset:
+            await conn.execute("DROP SCHEMA public CASCADE; CREATE SCHEMA public;")
+        await conn.execute(DUMP_PATH.read_text(encoding="utf-8"))
+    finally:
+        await conn.close()
+
+
+@asynccontextmanager
+async def boot() -> AsyncIterator[httpx.AsyncClient]:
+    """Corre el lifespan de la app y entrega un cliente ASGI contra ella."""
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            yield client
+
+
+async def measure(
+    client: httpx.AsyncClient,
+    scenario: Any,
+    ctx: Any,
+    *,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+) -> Dict[str, Any]:
+    """
+    Ejecuta ``requests`` operaciones del escenario repartidas entre
+    ``concurrency`` workers y devuelve el resumen. Las ``warmup`` primeras
+    operaciones se corren antes y no se cuentan.
+    """
+    for i in range(warmup):
+        await scenario.op(client, ctx, {}, i)
+
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        state: Dict[str, Any] = {}  # estado propio del worker (p. ej. el cursor del feed)
+        for i in counter:
+            t0 = time.perf_counter()
+            try:
+                resp = await scenario.op(client, ctx, state, i)
+                failed = resp.status_code >= 400
+            except Exception:
+                failed = True
+            latencies.append((time.perf_counter() - t0) * 1000)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    wall = time.perf_counter() - started
+    return summarize(latencies, errors, wall)
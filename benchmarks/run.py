@@ -0,0 +1,129 @@
+"""
+CLI de benchmarks.
+
+    python -m benchmarks.run [--backend memory|pg] [--database-url URL]
+                             [--load-dump [--reset-schema]]
+                             [--scenarios feed,vote_storm] [--requests N]
+                             [--concurrency C] [--warmup W] [--out archivo.json]
+
+Imprime (o escribe en ``--out``) un JSON con la metadata de la corrida (commit,
+backend, settings relevantes) y, por escenario, p50/p95/p99, media, máximo,
+errores y throughput. Dos archivos se comparan con ``benchmarks.compare``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+from benchmarks import harness
+from benchmarks.scenarios import SCENARIOS, BenchContext, prepare
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _git(*args: str) -> str | None:
+    try:
+        out = subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def _meta(args: argparse.Namespace) -> Dict[str, Any]:
+    from app.core.config import settings
+
+    status = _git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(status) if status is not None else None,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": args.backend,
+        "concurrency": args.concurrency,
+        "warmup": args.warmup,
+        "settings": {
+            "bcrypt_rounds": settings.bcrypt_rounds,
+            "password_hash_workers": settings.password_hash_workers,
+            "vote_buffer_enabled": settings.vote_buffer_enabled,
+            "db_pool_size": settings.db_pool_size,
+            "db_max_overflow": settings.db_max_overflow,
+            "db_statement_mode": settings.db_statement_mode,
+        },
+    }
+
+
+async def _run(args: argparse.Namespace, names: List[str]) -> Dict[str, Any]:
+    if args.load_dump:
+        await harness.load_dump(args.database_url, reset=args.reset_schema)
+
+    from app.core.config import settings
+
+    results: Dict[str, Any] = {}
+    async with harness.boot() as client:
+        ctx = BenchContext(prefix=settings.api_v1_prefix)
+        await prepare(
+            client, ctx,
+            users=args.users, communities=args.communities, posts=args.posts,
+        )
+        for name in names:
+            scenario = SCENARIOS[name]
+            print(f"· {name}: {scenario.description}", file=sys.stderr)
+            results[name] = await harness.measure(
+                client, scenario, ctx,
+                requests=args.requests or scenario.default_requests,
+                concurrency=args.concurrency,
+                warmup=args.warmup,
+            )
+    return {"meta": _meta(args), "scenarios": results}
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description="Benchmarks de la API en proceso")
+    parser.add_argument("--backend", choices=["memory", "pg"], default="memory")
+    parser.add_argument("--database-url", help="URL de SQLAlchemy (postgresql+asyncpg://...) para --backend pg")
+    parser.add_argument("--load-dump", action="store_true", help="cargar rau_db_dump_postgres.sql antes de correr")
+    parser.add_argument("--reset-schema", action="store_true", help="con --load-dump: borrar el schema public antes (¡sólo bases descartables!)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="lista separada por comas")
+    parser.add_argument("--requests", type=int, default=0, help="requests por escenario (0 = el default de cada uno)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--communities", type=int, default=20)
+    parser.add_argument("--posts", type=int, default=200)
+    parser.add_argument("--set", action="append", default=[], metavar="CLAVE=VALOR",
+                        help="override de settings vía entorno, p. ej. --set bcrypt_rounds=10")
+    parser.add_argument("--out", help="archivo JSON de salida (por defecto, stdout)")
+    args = parser.parse_args(argv)
+
+    names = [n.strip() for n in args.scenarios.split(",") if n.strip()]
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        parser.error(f"escenarios desconocidos: {', '.join(unknown)} (disponibles: {', '.join(SCENARIOS)})")
+    if args.backend == "pg" and not args.database_url:
+        parser.error("--backend pg requiere --database-url")
+    if args.load_dump and args.backend != "pg":
+        parser.error("--load-dump sólo aplica a --backend pg")
+
+    overrides = dict(item.split("=", 1) for item in args.set)
+    harness.configure_env(args.backend, args.database_url, overrides)
+
+    report = asyncio.run(_run(args, names))
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
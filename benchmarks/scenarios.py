@@ -0,0 +1,169 @@
+"""
+Escenarios con guion.
+
+Cada escenario es una operación (``op``) que el harness repite N veces con
+cierta concurrencia. Los datos que necesitan (usuarios con token, comunidades,
+posts, un hilo de comentarios profundo) se crean una sola vez por corrida a
+través de la API, con un sufijo único para poder correr varias veces contra la
+misma base de Postgres.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List
+
+import httpx
+
+PASSWORD = "bench-secret-123"
+
+
+@dataclass
+class BenchContext:
+    prefix: str
+    run_id: str = field(default_factory=lambda: str(int(time.time())))
+    rng: random.Random = field(default_factory=lambda: random.Random(42))
+    emails: List[str] = field(default_factory=list)
+    tokens: List[str] = field(default_factory=list)
+    community_ids: List[str] = field(default_factory=list)
+    community_names: List[str] = field(default_factory=list)
+    post_ids: List[str] = field(default_factory=list)
+    thread_post_id: str | None = None
+
+    def url(self, path: str) -> str:
+        return self.prefix + path
+
+    def auth(self, i: int) -> Dict[str, str]:
+        return {"Authorization": "Bearer " + self.tokens[i % len(self.tokens)]}
+
+
+Op = Callable[[httpx.AsyncClient, BenchContext, Dict[str, Any], int], Awaitable[httpx.Response]]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    op: Op
+    default_requests: int
+    description: str
+
+
+# ------- Preparación de datos -------
+
+_TOPICS = ["Finanzas", "Economía", "Programación", "Estadística", "Marketing",
+           "Derecho", "Contabilidad", "Matemática", "Negocios", "Datos"]
+
+
+def _check(resp: httpx.Response) -> httpx.Response:
+    if resp.status_code >= 400:
+        raise RuntimeError(f"{resp.request.method} {resp.request.url.path} -> {resp.status_code}: {resp.text[:200]}")
+    return resp
+
+
+async def prepare(
+    client: httpx.AsyncClient,
+    ctx: BenchContext,
+    *,
+    users: int = 8,
+    communities: int = 20,
+    posts: int = 200,
+    thread_roots: int = 30,
+    thread_depth: int = 3,
+) -> None:
+    """Crea los datos de la corrida. El registro paga bcrypt, por eso pocos usuarios."""
+    for i in range(users):
+        email = f"bench{ctx.run_id}-{i}@bench.ucema.edu.ar"
+        _check(await client.post(ctx.url("/auth/register"), json={
+            "email": email, "password": PASSWORD,
+            "nombreCompleto": f"Bench {i}", "rol": "Estudiante",
+        }))
+        resp = _check(await client.post(ctx.url("/auth/login"), json={"email": email, "password": PASSWORD}))
+        ctx.emails.append(email)
+        ctx.tokens.append(resp.json()["access_token"])
+
+    for i in range(communities):
+        name = f"{_TOPICS[i % len(_TOPICS)]} {ctx.run_id} {i}"
+        resp = _check(await client.post(ctx.url("/communities"), headers=ctx.auth(i), json={
+            "name": name, "description": "comunidad de benchmark",
+        }))
+        ctx.community_ids.append(resp.json()["id"])
+        ctx.community_names.append(name)
+
+    for i in range(posts):
+        resp = _check(await client.post(ctx.url("/posts"), headers=ctx.auth(i), json={
+            "community_id": ctx.community_ids[i % len(ctx.community_ids)],
+            "title": f"Post {ctx.run_id} {i}", "body": "contenido de benchmark " * 8,
+        }))
+        ctx.post_ids.append(resp.json()["id"])
+
+    # Hilo: thread_roots comentarios raíz, cada uno con una cadena de respuestas
+    ctx.thread_post_id = ctx.post_ids[0]
+    comments_url = ctx.url(f"/posts/{ctx.thread_post_id}/comments")
+    for r in range(thread_roots):
+        parent = None
+        for d in range(thread_depth):
+            resp = _check(await client.post(comments_url, headers=ctx.auth(r + d), json={
+                "content": f"comentario {r}.{d}", "parent_id": parent,
+            }))
+            parent = resp.json()["comment"]["id"]
+
+
+# ------- Operaciones -------
+
+async def _login(client: httpx.AsyncClient, ctx: BenchContext, state: Dict[str, Any], i: int) -> httpx.Response:
+    email = ctx.emails[i % len(ctx.emails)]
+    return await client.post(ctx.url("/auth/login"), json={"email": email, "password": PASSWORD})
+
+
+async def _feed_scroll(client: httpx.AsyncClient, ctx: BenchContext, state: Dict[str, Any], i: int) -> httpx.Response:
+    # Cada worker scrollea el feed página a página; al llegar al final vuelve a empezar
+    params = {"limit": 20, "sort": state.setdefault("sort", ("hot", "new", "top")[i % 3])}
+    if state.get("cursor"):
+        params["cursor"] = state["cursor"]
+    resp = await client.get(ctx.url("/posts"), params=params)
+    if resp.status_code == 200:
+        state["cursor"] = resp.json().get("next_cursor")
+    return resp
+
+
+async def _comment_thread(client: httpx.AsyncClient, ctx: BenchContext, state: Dict[str, Any], i: int) -> httpx.Response:
+    return await client.get(
+        ctx.url(f"/posts/{ctx.thread_post_id}/comments"),
+        params={"format": "tree", "depth": 3, "limit": 20},
+    )
+
+
+async def _vote_storm(client: httpx.AsyncClient, ctx: BenchContext, state: Dict[str, Any], i: int) -> httpx.Response:
+    # Muchos votos sobre pocos posts: contención sobre las mismas filas
+    post_id = ctx.post_ids[i % min(5, len(ctx.post_ids))]
+    value = 1 if (i // len(ctx.tokens)) % 2 == 0 else -1
+    return await client.post(ctx.url(f"/posts/{post_id}/vote"), headers=ctx.auth(i), json={"value": value})
+
+
+async def _community_search(client: httpx.AsyncClient, ctx: BenchContext, state: Dict[str, Any], i: int) -> httpx.Response:
+    name = ctx.community_names[i % len(ctx.community_names)]
+    q = name[: 2 + i % 4] if i % 5 else None  # prefijos cortos y, cada tanto, el listado sin filtro
+    params = {"limit": 20}
+    if q:
+        params["q"] = q
+    return await client.get(ctx.url("/communities"), params=params)
+
+
+async def _onboarding(client: httpx.AsyncClient, ctx: BenchContext, state: Dict[str, Any], i: int) -> httpx.Response:
+    favorites = ctx.rng.sample(ctx.community_ids, k=min(5, len(ctx.community_ids)))
+    return await client.post(ctx.url("/onboarding"), headers=ctx.auth(i), json={
+        "careers": ["Ingeniería en Informática"], "year": 2,
+        "favorite_communities": favorites,
+    })
+
+
+SCENARIOS: Dict[str, Scenario] = {s.name: s for s in [
+    Scenario("login", _login, 40, "ráfaga de logins (bcrypt en el pool de hashing)"),
+    Scenario("feed", _feed_scroll, 500, "scroll del feed /posts con cursor"),
+    Scenario("comment_thread", _comment_thread, 300, "lectura de un hilo en formato árbol"),
+    Scenario("vote_storm", _vote_storm, 500, "votos concurrentes sobre pocos posts"),
+    Scenario("community_search", _community_search, 500, "búsqueda de comunidades por prefijo"),
+    Scenario("onboarding", _onboarding, 200, "guardar onboarding con comunidades favoritas"),
+]}
@@ -0,0 +1,29 @@
+"""Resumen estadístico de las muestras de latencia."""
+
+from __future__ import annotations
+
+import math
+from typing import Dict, List
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies_ms: List[float], errors: int, wall_seconds: float) -> Dict[str, float]:
+    values = sorted(latencies_ms)
+    n = len(values)
+    return {
+        "requests": n,
+        "errors": errors,
+        "throughput_rps": round(n / wall_seconds, 2) if wall_seconds > 0 else 0.0,
+        "mean_ms": round(sum(values) / n, 3) if n else 0.0,
+        "p50_ms": round(percentile(values, 50), 3),
+        "p95_ms": round(percentile(values, 95), 3),
+        "p99_ms": round(percentile(values, 99), 3),
+        "max_ms": round(values[-1], 3) if n else 0.0,
+    }
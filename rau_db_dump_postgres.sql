@@ -213,10 +213,7 @@ CREATE INDEX IF NOT EXISTS idx_post_guardado_usuario ON post_guardado (usuario_i
 -- Evitar que un usuario comente en posts de comunidades donde no es miembro (opcional, si lo querés a nivel DB):
 --   Esto puede ser complejo por FK; usualmente se valida en la capa de aplicación.
 
--- Texto rápido: índices trigram (si activás pg_trgm) para búsquedas por título/cuerpo (opcional).
--- CREATE EXTENSION IF NOT EXISTS pg_trgm;
--- CREATE INDEX IF NOT EXISTS idx_post_titulo_trgm ON post USING gin (titulo gin_trgm_ops);
--- CREATE INDEX IF NOT EXISTS idx_post_cuerpo_trgm  ON post USING gin (cuerpo gin_trgm_ops);
+-- Texto rápido: la búsqueda de posts usa full-text (post.busqueda + GIN), ver al final del archivo.
 
 COMMIT;
 
@@ -384,3 +381,131 @@ SELECT setval('post_post_id_seq', (SELECT MAX(usuario_id) FROM usuario));
 ALTER TABLE post ADD COLUMN etiqueta VARCHAR(20) NOT NULL DEFAULT 'Pregunta';
 -- Definición de valores permitidos (ya que estamos, no hay porqué no)
 ALTER TABLE post ADD CONSTRAINT ck_post_etiqueta CHECK (etiqueta IN ('Pregunta', 'Recurso', 'Apunte', 'Discusión'));
+
+
+----------- Contadores desnormalizados de POSTS (votos / comentarios) -----------
+-- Los mantiene el backend en la misma sentencia que escribe el voto o el comentario
+-- (PostsRepoPG.vote, CommentsRepoPG.create). Si derivan, reconstruirlos con:
+--   python -m app.infra.reconcile_stats
+
+ALTER TABLE post ADD COLUMN IF NOT EXISTS upvotes        INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE post ADD COLUMN IF NOT EXISTS downvotes      INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE post ADD COLUMN IF NOT EXISTS score          INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE post ADD COLUMN IF NOT EXISTS comments_count INTEGER NOT NULL DEFAULT 0;
+
+-- Carga inicial a partir de los datos existentes
+UPDATE post p SET
+  upvotes = s.upvotes,
+  downvotes = s.downvotes,
+  score = s.upvotes - s.downvotes,
+  comments_count = s.comments_count
+FROM (
+  SELECT
+    p2.post_id,
+    (SELECT COUNT(*) FROM post_voto v WHERE v.post_id = p2.post_id AND v.valor = 1)::int  AS upvotes,
+    (SELECT COUNT(*) FROM post_voto v WHERE v.post_id = p2.post_id AND v.valor = -1)::int AS downvotes,
+    (SELECT COUNT(*) FROM comentario c WHERE c.post_id = p2.post_id)::int                 AS comments_count
+  FROM post p2
+) s
+WHERE p.post_id = s.post_id;
+
+
+----------- Paginación keyset (cursores) -----------
+-- Soportan los predicados (creado_en, id) < / > (...) de PostsRepoPG.list y
+-- CommentsRepoPG.list_for_post con un index scan, sin OFFSET.
+
+CREATE INDEX IF NOT EXISTS idx_post_feed_keyset
+  ON post (creado_en DESC, post_id DESC) WHERE estado = 'A';
+CREATE INDEX IF NOT EXISTS idx_post_comunidad_keyset
+  ON post (comunidad_id, creado_en DESC, post_id DESC) WHERE estado = 'A';
+CREATE INDEX IF NOT EXISTS idx_comentario_post_keyset
+  ON comentario (post_id, creado_en, comentario_id);
+
+
+----------- Búsqueda full-text de POSTS -----------
+-- Vector ponderado (título 'A' > cuerpo 'B') con stemming en español, mantenido
+-- por Postgres como columna generada. PostsRepoPG.list(q=...) filtra con
+-- websearch_to_tsquery('spanish', q) y ordena por ts_rank.
+
+ALTER TABLE post ADD COLUMN IF NOT EXISTS busqueda tsvector
+  GENERATED ALWAYS AS (
+    setweight(to_tsvector('spanish', coalesce(titulo, '')), 'A') ||
+    setweight(to_tsvector('spanish', coalesce(cuerpo, '')), 'B')
+  ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_post_busqueda ON post USING gin (busqueda);
+
+
+----------- Ranking de POSTS (sort=hot|top|new) -----------
+-- hot_score = votos decaídos por edad. Se recalcula en la misma sentencia que
+-- escribe un voto o un comentario y un job periódico re-decae los posts recientes
+-- (app.infra.jobs). Misma fórmula que app/core/ranking.py.
+
+CREATE OR REPLACE FUNCTION post_hot_score(score INTEGER, comments INTEGER, creado_en TIMESTAMPTZ)
+RETURNS DOUBLE PRECISION LANGUAGE sql STABLE AS $$
+  SELECT (score + 0.5 * comments)
+         / power(GREATEST(EXTRACT(EPOCH FROM (NOW() - creado_en)), 0) / 3600.0 + 2.0, 1.8)
+$$;
+
+ALTER TABLE post ADD COLUMN IF NOT EXISTS hot_score DOUBLE PRECISION NOT NULL DEFAULT 0;
+
+UPDATE post SET hot_score = post_hot_score(score, comments_count, creado_en);
+
+CREATE INDEX IF NOT EXISTS idx_post_hot
+  ON post (hot_score DESC, post_id DESC) WHERE estado = 'A';
+CREATE INDEX IF NOT EXISTS idx_post_comunidad_hot
+  ON post (comunidad_id, hot_score DESC, post_id DESC) WHERE estado = 'A';
+CREATE INDEX IF NOT EXISTS idx_post_top
+  ON post (score DESC, post_id DESC) WHERE estado = 'A';
+CREATE INDEX IF NOT EXISTS idx_post_comunidad_top
+  ON post (comunidad_id, score DESC, post_id DESC) WHERE estado = 'A';
+
+
+----------- Árbol de comentarios (format=tree) -----------
+-- Raíces de un post y respuestas de un comentario en orden de creación, para
+-- la CTE recursiva de CommentsRepoPG.list_tree (LIMIT por nivel con LATERAL).
+
+CREATE INDEX IF NOT EXISTS idx_comentario_raices
+  ON comentario (post_id, creado_en, comentario_id) WHERE comentario_padre_id IS NULL;
+CREATE INDEX IF NOT EXISTS idx_comentario_respuestas
+  ON comentario (comentario_padre_id, creado_en, comentario_id);
+
+
+----------- Opciones de onboarding (OPTIONS_SOURCE=db) -----------
+-- Carreras y años académicos para /options/*. Se leen una vez al arrancar;
+-- si un tipo no tiene filas se usan las listas de OptionsService.
+
+CREATE TABLE IF NOT EXISTS opcion_onboarding (
+  tipo   VARCHAR(20)  NOT NULL,
+  valor  VARCHAR(200) NOT NULL,
+  orden  INT          NOT NULL DEFAULT 0,
+  PRIMARY KEY (tipo, valor),
+  CONSTRAINT ck_opcion_onboarding_tipo CHECK (tipo IN ('careers', 'years'))
+);
+
+
+----------- Cantidad de miembros de COMUNIDADES (ranking) -----------
+-- member_count lo mantiene el backend en la misma sentencia que agrega o quita
+-- la membresía (CommunitiesRepoPG.join / join_many / leave). GET /communities
+-- recorre idx_comunidad_ranking en vez de agregar comunidad_miembro entera.
+-- Si deriva, reconstruirlo con: python -m app.infra.reconcile_stats
+
+ALTER TABLE comunidad ADD COLUMN IF NOT EXISTS member_count INTEGER NOT NULL DEFAULT 0;
+
+UPDATE comunidad c SET
+  member_count = (SELECT COUNT(*) FROM comunidad_miembro m WHERE m.comunidad_id = c.comunidad_id)::int;
+
+CREATE INDEX IF NOT EXISTS idx_comunidad_ranking
+  ON comunidad (member_count DESC, nombre);
+
+
+----------- actualizado_en de COMUNIDADES sin member_count -----------
+-- member_count cambia con cada alta o baja de miembro: si disparara
+-- set_updated_at, actualizado_en se movería sin que cambien los datos de la
+-- comunidad. El trigger se limita a las columnas editables; una columna
+-- editable nueva tiene que sumarse a la lista.
+
+DROP TRIGGER IF EXISTS trg_comunidad_updated_at ON comunidad;
+CREATE TRIGGER trg_comunidad_updated_at
+BEFORE UPDATE OF nombre, descripcion, es_oficial, creado_por ON comunidad
+FOR EACH ROW EXECUTE FUNCTION set_updated_at();
@@ -0,0 +1,41 @@
+import pytest
+
+from benchmarks.compare import compare
+from benchmarks.harness import measure
+from benchmarks.scenarios import SCENARIOS, BenchContext, prepare
+from benchmarks.stats import percentile, summarize
+from tests.conftest import API
+
+
+def test_percentile_and_summary():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50 and percentile(values, 99) == 99 and percentile([], 95) == 0.0
+    summary = summarize(values, errors=2, wall_seconds=2.0)
+    assert summary["requests"] == 100 and summary["errors"] == 2
+    assert summary["throughput_rps"] == 50.0 and summary["max_ms"] == 100
+
+
+def _report(p95, rps, errors=0):
+    return {"meta": {}, "scenarios": {"feed": {
+        "p50_ms": 1.0, "p95_ms": p95, "p99_ms": p95, "throughput_rps": rps, "errors": errors,
+    }}}
+
+
+def test_compare_flags_regressions(capsys):
+    assert compare(_report(10, 100), _report(10.5, 98), threshold=10) == []
+    regressions = compare(_report(10, 100), _report(12, 80, errors=1), threshold=10)
+    assert len(regressions) == 3
+
+
+@pytest.fixture
+async def bench(client):
+    ctx = BenchContext(prefix=API)
+    await prepare(client, ctx, users=2, communities=3, posts=6, thread_roots=2, thread_depth=2)
+    return ctx
+
+
+@pytest.mark.parametrize("name", sorted(SCENARIOS))
+async def test_scenarios_run_without_errors_on_memory(client, bench, name):
+    summary = await measure(client, SCENARIOS[name], bench, requests=6, concurrency=2, warmup=1)
+    assert summary["requests"] == 6
+    assert summary["errors"] == 0
@@ -0,0 +1,65 @@
+import pytest
+
+from app.core import cache as cache_module
+from app.core.cache import LocalTTLCache, NullCache, SharedCacheStandIn, build_cache
+from app.main import app
+from app.repositories.cached import post_key
+from tests.conftest import API
+
+
+async def test_lru_evicts_least_recently_used():
+    cache = LocalTTLCache(max_entries=2)
+    await cache.set("a", 1, 60)
+    await cache.set("b", 2, 60)
+    assert await cache.get("a") == 1  # "b" pasa a ser el menos usado
+    await cache.set("c", 3, 60)
+    assert await cache.get("b") is None
+    assert (await cache.get("a"), await cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+async def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = LocalTTLCache()
+    await cache.set("k", "v", 5)
+    now[0] += 4.9
+    assert await cache.get("k") == "v"
+    now[0] += 0.2
+    assert await cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+
+
+async def test_none_and_zero_ttl_are_not_stored():
+    cache = LocalTTLCache()
+    await cache.set("none", None, 60)
+    await cache.set("zero", 1, 0)
+    assert cache.stats()["entries"] == 0
+
+
+async def test_shared_stand_in_returns_copies():
+    cache = SharedCacheStandIn()
+    value = {"tags": ["a"]}
+    await cache.set("k", value, 60)
+    got = await cache.get("k")
+    got["tags"].append("b")
+    assert await cache.get("k") == value == {"tags": ["a"]}
+
+
+def test_build_cache():
+    assert isinstance(build_cache("local", 10), LocalTTLCache)
+    assert isinstance(build_cache("shared", 10), SharedCacheStandIn)
+    assert isinstance(build_cache("none", 10), NullCache)
+    with pytest.raises(ValueError):
+        build_cache("redis", 10)
+
+
+async def test_post_reads_hit_the_cache_and_delete_invalidates(client, student):
+    cache = app.state.cache
+    await client.get(f"{API}/posts/1")
+    hits = cache.stats()["hits"]
+    await client.get(f"{API}/posts/1")
+    assert cache.stats()["hits"] > hits
+
+    assert (await client.delete(f"{API}/posts/1", headers=student)).status_code == 204
+    assert await cache.get(post_key("1")) is None
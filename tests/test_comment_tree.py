@@ -0,0 +1,44 @@
+from tests.conftest import API
+
+
+async def _comment(client, headers, post_id, body, parent_id=None):
+    res = await client.post(
+        f"{API}/posts/{post_id}/comments", headers=headers, json={"content": body, "parent_id": parent_id},
+    )
+    assert res.status_code == 201, res.text
+    return res.json()["comment"]["id"]
+
+
+async def _tree(client, post_id, **params):
+    res = await client.get(f"{API}/posts/{post_id}/comments", params={"format": "tree", **params})
+    assert res.status_code == 200
+    return res.json()
+
+
+async def test_tree_limits_depth_and_children_and_pages_replies(client, student):
+    post_id = (await client.post(
+        f"{API}/posts", headers=student, json={"community_id": "1", "title": "Hilo", "body": "x"},
+    )).json()["id"]
+    root = await _comment(client, student, post_id, "raíz")
+    replies = [await _comment(client, student, post_id, f"r{i}", root) for i in range(3)]
+    nested = await _comment(client, student, post_id, "anidada", replies[0])
+    other_root = await _comment(client, student, post_id, "otra raíz")
+
+    page = await _tree(client, post_id, depth=2, children_limit=2, limit=1)
+    assert [c["id"] for c in page["items"]] == [root]
+    node = page["items"][0]
+    assert node["reply_count"] == 3
+    assert [r["id"] for r in node["replies"]] == replies[:2]
+    assert node["replies"][0]["replies"] == []           # fuera de depth=2
+    assert node["replies"][0]["more_replies_cursor"]     # pero se puede pedir
+    assert node["more_replies_cursor"]
+
+    more = await _tree(client, post_id, depth=2, children_limit=2, cursor=node["more_replies_cursor"])
+    assert [r["id"] for r in more["items"]] == replies[2:]
+
+    deeper = await _tree(client, post_id, cursor=node["replies"][0]["more_replies_cursor"])
+    assert [r["id"] for r in deeper["items"]] == [nested]
+
+    roots = await _tree(client, post_id, limit=1, cursor=page["next_cursor"])
+    assert [c["id"] for c in roots["items"]] == [other_root]
+    assert roots["next_cursor"] is None
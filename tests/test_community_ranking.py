@@ -0,0 +1,42 @@
+from app.main import app
+from app.repositories.cached import COMMUNITY_RANKING_KEY
+from tests.conftest import API
+
+
+async def _counts(client):
+    items = (await client.get(f"{API}/communities", params={"limit": 100})).json()["items"]
+    return {c["id"]: c["member_count"] for c in items}
+
+
+async def test_join_and_leave_refresh_cached_ranking(client, student):
+    before = await _counts(client)
+    assert await app.state.cache.get(COMMUNITY_RANKING_KEY) is not None
+    cid = next(iter(before))
+
+    await client.delete(f"{API}/communities/{cid}/leave", headers=student)
+    base = (await _counts(client))[cid]
+    res = await client.post(f"{API}/communities/{cid}/join", headers=student)
+    assert res.status_code == 204
+    assert (await _counts(client))[cid] == base + 1
+
+    res = await client.delete(f"{API}/communities/{cid}/leave", headers=student)
+    assert res.status_code == 204
+    assert (await _counts(client))[cid] == base
+
+
+async def test_member_count_follows_join_and_leave(client, student):
+    await client.delete(f"{API}/communities/1/leave", headers=student)
+    base = (await client.get(f"{API}/communities/1")).json()["member_count"]
+
+    assert (await client.post(f"{API}/communities/1/join", headers=student)).status_code == 204
+    assert (await client.post(f"{API}/communities/1/join", headers=student)).status_code == 204
+    assert (await client.get(f"{API}/communities/1")).json()["member_count"] == base + 1
+
+    assert (await client.delete(f"{API}/communities/1/leave", headers=student)).status_code == 204
+    assert (await client.get(f"{API}/communities/1")).json()["member_count"] == base
+
+
+async def test_communities_are_ranked_by_members_then_name(client):
+    items = (await client.get(f"{API}/communities")).json()["items"]
+    keys = [(-c["member_count"], c["name"]) for c in items]
+    assert keys == sorted(keys)
@@ -0,0 +1,48 @@
+from app.infra import jobs
+from app.services.community_suggest import CommunitySuggestIndex
+
+
+def _names(index, prefix, limit=10):
+    return [s["name"] for s in index.suggest(prefix, limit)]
+
+
+def test_prefix_matches_any_word_ignoring_accents():
+    index = CommunitySuggestIndex([("1", "Álgebra Lineal", 5), ("2", "Análisis Matemático", 9), ("3", "Historia", 1)])
+    assert _names(index, "lin") == ["Álgebra Lineal"]
+    assert _names(index, "a") == ["Análisis Matemático", "Álgebra Lineal"]
+    assert _names(index, "A", limit=1) == ["Análisis Matemático"]
+    assert _names(index, "zzz") == [] and _names(index, "") == []
+
+
+def test_add_is_searchable_and_idempotent():
+    index = CommunitySuggestIndex([("1", "Historia", 1)])
+    index.add("2", "Historia del Arte")
+    index.add("2", "Historia del Arte")
+    assert _names(index, "hist") == ["Historia", "Historia del Arte"]
+    assert len(index) == 2
+
+
+def test_replace_keeps_adds_made_during_refresh():
+    index = CommunitySuggestIndex([("1", "Historia", 1)])
+    index.begin_refresh()
+    index.add("2", "Física", 0)             # alta mientras se lee la base
+    index.replace([("1", "Historia", 3)])   # la lectura empezó antes del alta
+    assert _names(index, "f") == ["Física"]
+    assert index.suggest("hist")[0]["member_count"] == 3
+
+    index.add("3", "Química", 0)
+    index.replace([("1", "Historia", 3)])   # sin begin_refresh: reemplazo completo
+    assert _names(index, "q") == [] and _names(index, "f") == []
+
+
+async def test_refresh_job_does_not_drop_concurrent_adds(monkeypatch):
+    index = CommunitySuggestIndex([("1", "Historia", 1)])
+
+    async def index_entries(self):
+        index.add("2", "Física", 0)
+        return [("1", "Historia", 2)]
+
+    monkeypatch.setattr(jobs.CommsRepoMem, "index_entries", index_entries)
+    assert await jobs.refresh_community_index(index, store=object()) == 1
+    assert _names(index, "f") == ["Física"]
+    assert index.suggest("h")[0]["member_count"] == 2
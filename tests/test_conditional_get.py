@@ -0,0 +1,62 @@
+import pytest
+
+from app.core.cache import LocalTTLCache
+from app.infra.seed import seed_minimal
+from app.repositories.cached import CachedPostsRepo
+from app.repositories.memory.comments_repo import CommentsRepo
+from app.repositories.memory.posts_repo import PostsRepo
+from app.repositories.memory.store import MemoryStore
+from app.services.posts_service import PostsService
+from tests.conftest import API
+
+
+class CountingPostsRepo(PostsRepo):
+    def __init__(self, store):
+        super().__init__(store)
+        self.gets = 0
+
+    async def get(self, post_id):
+        self.gets += 1
+        return await super().get(post_id)
+
+
+async def test_versioned_get_serves_cache_until_version_changes():
+    store = MemoryStore()
+    await seed_minimal(store)
+    repo = CountingPostsRepo(store)
+    svc = PostsService(CachedPostsRepo(repo, LocalTTLCache(), 60), CommentsRepo(store))
+
+    version = await svc.version("1")
+    first = await svc.get("1", version)
+    again = await svc.get("1", version)
+    assert again == first and repo.gets == 1
+
+    await repo.vote(post_id="1", user_id="2", value=1)
+    repo.gets = 0
+    new_version = await svc.version("1")
+    assert new_version != version
+    assert (await svc.get("1", new_version))["upvotes"] == first["upvotes"] + 1
+    assert repo.gets == 1
+
+
+@pytest.mark.parametrize("path", ["/posts/1", "/users/1", "/communities/1"])
+async def test_etag_roundtrip(client, path):
+    res = await client.get(API + path)
+    assert res.status_code == 200
+    etag = res.headers["etag"]
+    res = await client.get(API + path, headers={"If-None-Match": etag})
+    assert res.status_code == 304
+    assert res.headers["etag"] == etag
+
+
+async def test_post_etag_changes_after_vote(client, student):
+    first = await client.get(f"{API}/posts/1")
+    await client.post(f"{API}/posts/1/vote", json={"value": 1}, headers=student)
+    res = await client.get(f"{API}/posts/1", headers={"If-None-Match": first.headers["etag"]})
+    assert res.status_code == 200
+    assert res.json()["upvotes"] == first.json()["upvotes"] + 1
+
+
+async def test_missing_resource_is_404(client):
+    assert (await client.get(f"{API}/posts/999")).status_code == 404
+    assert (await client.get(f"{API}/communities/999")).status_code == 404
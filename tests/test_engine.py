@@ -0,0 +1,31 @@
+import pytest
+
+from app.db import database
+from tests.conftest import API
+
+
+async def test_memory_backend_never_creates_an_engine(client):
+    assert (await client.get(f"{API}/posts")).status_code == 200
+    with pytest.raises(RuntimeError):
+        database.get_engine()
+
+
+async def test_init_engine_is_idempotent_and_binds_sessions(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}"
+    try:
+        engine = await database.init_engine(url)
+        assert await database.init_engine(url) is engine
+        assert database.get_engine() is engine
+        async with database.SessionLocal() as session:
+            assert session.bind is engine
+    finally:
+        await database.dispose_engine()
+    with pytest.raises(RuntimeError):
+        database.get_engine()
+    assert database.SessionLocal.kw["bind"] is None
+
+
+def test_build_engine_requires_a_url(monkeypatch):
+    monkeypatch.setattr(database.settings, "database_url", None)
+    with pytest.raises(RuntimeError):
+        database.build_engine()
@@ -0,0 +1,29 @@
+from app.main import app
+from tests.conftest import API
+
+
+async def test_writes_persist_across_requests(client, student):
+    store = app.state.memory_store
+    res = await client.post(
+        f"{API}/posts", headers=student, json={"community_id": "1", "title": "Parcial", "body": "¿Fechas?"},
+    )
+    assert res.status_code == 201
+    post_id = res.json()["id"]
+    assert post_id in store.posts
+
+    feed = (await client.get(f"{API}/posts")).json()["items"]
+    assert feed[0]["id"] == post_id
+    community = (await client.get(f"{API}/posts", params={"communityId": "1"})).json()["items"]
+    assert community[0]["id"] == post_id
+    other = (await client.get(f"{API}/posts", params={"communityId": "2"})).json()["items"]
+    assert post_id not in {p["id"] for p in other}
+
+
+async def test_deleted_post_leaves_the_feed_indexes(client, student):
+    post_id = (await client.post(
+        f"{API}/posts", headers=student, json={"community_id": "1", "title": "Borrar", "body": "x"},
+    )).json()["id"]
+    assert (await client.delete(f"{API}/posts/{post_id}", headers=student)).status_code == 204
+    feed = (await client.get(f"{API}/posts", params={"limit": 100})).json()["items"]
+    assert post_id not in {p["id"] for p in feed}
+    assert all(entry[2] != post_id for entry in app.state.memory_store.posts_by_time)
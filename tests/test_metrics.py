@@ -0,0 +1,66 @@
+import httpx
+from fastapi import FastAPI
+
+from app.api.v1 import metrics as metrics_routes
+from app.core import metrics
+from app.core.config import Settings, settings
+
+
+def test_metrics_disabled_by_default():
+    assert Settings.model_fields["metrics_enabled"].default is False
+
+
+async def _get(headers=None):
+    app = FastAPI()
+    app.include_router(metrics_routes.router)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        return await client.get(settings.metrics_path, headers=headers or {})
+
+
+async def test_metrics_require_admin_token(monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", None)
+    assert (await _get()).status_code == 404
+
+    monkeypatch.setattr(settings, "admin_token", "tok")
+    assert (await _get()).status_code == 403
+    assert (await _get({"X-Admin-Token": "otro"})).status_code == 403
+    res = await _get({"X-Admin-Token": "tok"})
+    assert res.status_code == 200
+    assert "rau_password_hash_tasks" in res.text
+
+
+async def test_middleware_labels_requests_by_route_template():
+    app = FastAPI()
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    @app.get("/metrics-test/{item_id}")
+    async def item(item_id: str):
+        return {"id": item_id}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        for path in ("/metrics-test/1", "/metrics-test/2", "/metrics-test-inexistente/3"):
+            await client.get(path)
+
+    counts = metrics.HTTP_REQUESTS._values
+    assert counts[("GET", "/metrics-test/{item_id}", 200)] >= 2
+    assert counts[("GET", "<unmatched>", 404)] >= 1
+    assert 'route="/metrics-test/{item_id}"' in metrics.render()
+
+
+async def test_engine_statements_are_timed_by_query_shape(tmp_path):
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'm.sqlite'}")
+    metrics.instrument_engine(engine)
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1").execution_options(query_shape="Tests.select_one"))
+            try:
+                await conn.execute(text("SELECT * FROM no_existe").execution_options(query_shape="Tests.broken"))
+            except Exception:
+                pass
+    finally:
+        await engine.dispose()
+    assert 'shape="Tests.select_one"' in metrics.render()
+    assert metrics.DB_STATEMENT_ERRORS._values[("Tests.broken",)] >= 1
@@ -0,0 +1,18 @@
+from app.main import app
+from tests.conftest import API
+
+
+async def test_onboarding_joins_favorites_once(client, student):
+    body = {"careers": ["Economía"], "year": 2, "favorite_communities": ["1", "2", "2", "999"]}
+    for _ in range(2):
+        res = await client.post(f"{API}/onboarding", json=body, headers=student)
+        assert res.status_code == 200
+    assert res.json()["done"] is True
+
+    store = app.state.memory_store
+    me, members = store.users_by_email["est@ucema.edu.ar"], store.members
+    assert me in members["1"] and me in members["2"]
+    assert "999" not in members
+
+    counts = {c["id"]: c["member_count"] for c in (await client.get(f"{API}/communities")).json()["items"]}
+    assert counts["1"] == len(members["1"]) and counts["2"] == len(members["2"])
@@ -0,0 +1,34 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from app.services.options_service import OptionsCatalog, OptionsService
+from tests.conftest import API
+
+
+@pytest.mark.parametrize("name", ["careers", "years", "grad-years"])
+async def test_options_are_cacheable_and_revalidate(client, name):
+    res = await client.get(f"{API}/options/{name}")
+    assert res.status_code == 200
+    assert all(isinstance(v, str) for v in res.json())
+    assert res.headers["Cache-Control"].startswith("public, max-age=")
+
+    again = await client.get(f"{API}/options/{name}", headers={"If-None-Match": res.headers["ETag"]})
+    assert again.status_code == 304 and again.content == b""
+    assert again.headers["ETag"] == res.headers["ETag"]
+
+
+def test_catalog_body_matches_service_and_overrides():
+    catalog = OptionsCatalog(overrides={"careers": ["Ingeniería"]})
+    assert json.loads(catalog.get("careers").body) == ["Ingeniería"]
+    assert json.loads(catalog.get("years").body) == OptionsService().get_years()
+    assert catalog.get("careers").etag != OptionsCatalog().get("careers").etag
+
+
+def test_grad_years_rebuild_only_when_the_year_changes():
+    catalog = OptionsCatalog()
+    first = catalog.grad_years(datetime(2025, 3, 1))
+    assert catalog.grad_years(datetime(2025, 12, 31)) is first
+    assert json.loads(catalog.grad_years(datetime(2026, 1, 1)).body)[0] == "2026"
+    assert OptionsCatalog.grad_years_cache_control(datetime(2025, 12, 31, 23, 59)) == "public, max-age=60"
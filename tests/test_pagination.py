@@ -0,0 +1,74 @@
+import pytest
+
+from app.core.pagination import InvalidCursor, decode_cursor, encode_cursor, page_window
+from tests.conftest import API
+
+
+def test_cursor_roundtrip():
+    from datetime import datetime, timezone
+
+    ts = datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    assert decode_cursor(encode_cursor(ts, 7), datetime, int) == (ts, 7)
+
+
+def test_naive_datetime_cursor_is_read_as_utc():
+    from datetime import datetime, timezone
+
+    (ts,) = decode_cursor(encode_cursor(datetime(2025, 1, 2, 3, 4, 5)), datetime)
+    assert ts == datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+
+def test_invalid_cursor_raises():
+    with pytest.raises(InvalidCursor):
+        decode_cursor("no-es-un-cursor", int, int)
+
+
+def test_page_window():
+    rows = [1, 2, 3]
+    assert page_window(rows, 3, lambda r: (r,)) == ([1, 2, 3], None)
+    items, cursor = page_window(rows, 2, lambda r: (r,))
+    assert items == [1, 2] and decode_cursor(cursor, int) == (2,)
+    assert page_window(rows, 0, lambda r: (r,)) == ([], None)
+    assert page_window([], 0, lambda r: (r,)) == ([], None)
+
+
+@pytest.mark.parametrize("path", ["/posts", "/posts/1/comments", "/communities"])
+@pytest.mark.parametrize("limit", [0, -3, 101])
+async def test_out_of_range_limit_is_422(client, path, limit):
+    res = await client.get(API + path, params={"limit": limit})
+    assert res.status_code == 422
+
+
+async def test_bad_cursor_is_400(client):
+    res = await client.get(f"{API}/posts", params={"cursor": "basura"})
+    assert res.status_code == 400
+
+
+@pytest.mark.parametrize("created_at,status", [("2999-01-01T00:00:00", 200), ("no-es-fecha", 400)])
+async def test_hand_made_new_feed_cursor_does_not_500(client, created_at, status):
+    cursor = encode_cursor(created_at, 1)
+    res = await client.get(f"{API}/posts", params={"sort": "new", "cursor": cursor})
+    assert res.status_code == status
+
+
+async def test_feed_pages_cover_all_posts_once(client):
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 1, **({"cursor": cursor} if cursor else {})}
+        page = (await client.get(f"{API}/posts", params=params)).json()
+        seen += [p["id"] for p in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    everything = (await client.get(f"{API}/posts", params={"limit": 100})).json()["items"]
+    assert seen == [p["id"] for p in everything]
+    assert len(seen) == len(set(seen)) > 1
+
+
+async def test_community_pages_follow_ranking(client):
+    page1 = (await client.get(f"{API}/communities", params={"limit": 2})).json()
+    page2 = (await client.get(f"{API}/communities", params={"limit": 2, "cursor": page1["next_cursor"]})).json()
+    names = [c["name"] for c in page1["items"] + page2["items"]]
+    counts = [c["member_count"] for c in page1["items"] + page2["items"]]
+    assert counts == sorted(counts, reverse=True)
+    assert len(names) == len(set(names)) == 3
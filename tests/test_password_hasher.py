@@ -0,0 +1,22 @@
+import asyncio
+
+from app.core.config import settings
+from app.core.security import PasswordHasher, pwd_ctx
+
+
+async def test_hash_and_verify_run_in_the_pool():
+    hasher = PasswordHasher(max_workers=1)
+    hashed = await hasher.hash("secret123")
+    results = await asyncio.gather(*(hasher.verify_and_update(pw, hashed) for pw in ("secret123", "otra", "secret123")))
+    assert [ok for ok, _ in results] == [True, False, True]
+    assert all(new is None for _, new in results)
+    stats = hasher.stats()
+    assert stats["completed"] == 4 and stats["queued"] == stats["in_flight"] == 0
+
+
+async def test_verify_rehashes_outdated_cost():
+    hasher = PasswordHasher(max_workers=1)
+    old = pwd_ctx.handler("bcrypt").using(rounds=settings.bcrypt_rounds + 1).hash("secret123")
+    ok, new = await hasher.verify_and_update("secret123", old)
+    assert ok and new is not None and new != old
+    assert pwd_ctx.verify("secret123", new)
@@ -0,0 +1,50 @@
+import importlib
+import pkgutil
+
+import pytest
+from sqlalchemy import make_url
+from sqlalchemy.sql.elements import TextClause
+
+import app.repositories.pg as pg_repos
+from app.db import database
+
+
+def _statements():
+    for info in pkgutil.iter_modules(pg_repos.__path__):
+        module = importlib.import_module(f"{pg_repos.__name__}.{info.name}")
+        for name, value in vars(module).items():
+            if isinstance(value, TextClause):
+                yield f"{info.name}.{name}", value
+
+
+def test_module_statements_declare_a_unique_query_shape():
+    shapes = {}
+    for name, stmt in _statements():
+        shape = stmt.get_execution_options().get("query_shape")
+        assert shape, f"{name} sin query_shape"
+        shapes.setdefault(shape, []).append(name)
+    assert shapes
+    assert {s: n for s, n in shapes.items() if len(n) > 1} == {}
+
+
+@pytest.mark.parametrize("url,pooled", [
+    ("postgresql+asyncpg://u:p@db:5432/rau", False),
+    ("postgresql+asyncpg://u:p@db:6432/rau", True),
+    ("postgresql+asyncpg://u:p@ep-x-pooler.neon.tech/rau", True),
+])
+def test_statement_strategy_follows_the_pooler(monkeypatch, url, pooled):
+    monkeypatch.setattr(database.settings, "db_statement_mode", "auto")
+    args = database._asyncpg_connect_args(make_url(url))
+    if pooled:
+        assert args["statement_cache_size"] == args["prepared_statement_cache_size"] == 0
+        assert args["prepared_statement_name_func"]() != args["prepared_statement_name_func"]()
+    else:
+        assert args["prepared_statement_cache_size"] == database.settings.db_prepared_statement_cache_size
+        assert "prepared_statement_name_func" not in args
+
+
+def test_statement_mode_overrides_detection(monkeypatch):
+    monkeypatch.setattr(database.settings, "db_statement_mode", "pgbouncer")
+    assert database.uses_transaction_pooler(make_url("postgresql+asyncpg://u:p@db:5432/rau"))
+    monkeypatch.setattr(database.settings, "db_statement_mode", "prepared")
+    assert not database.uses_transaction_pooler(make_url("postgresql+asyncpg://u:p@db:6432/rau"))
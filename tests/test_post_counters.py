@@ -0,0 +1,28 @@
+from tests.conftest import API
+
+
+async def _post(client, post_id="1"):
+    return (await client.get(f"{API}/posts/{post_id}")).json()
+
+
+async def test_vote_flip_adjusts_counters(client, student):
+    up = (await client.post(f"{API}/posts/1/vote", json={"value": 1}, headers=student)).json()
+    again = (await client.post(f"{API}/posts/1/vote", json={"value": 1}, headers=student)).json()
+    down = (await client.post(f"{API}/posts/1/vote", json={"value": -1}, headers=student)).json()
+
+    # el estudiante pudo haber votado en la semilla: se compara contra su voto previo
+    assert again["score"] == up["score"] and again["upvotes"] == up["upvotes"]
+    assert down["upvotes"] == up["upvotes"] - 1
+    assert down["downvotes"] == up["downvotes"] + 1
+    assert down["score"] == up["score"] - 2
+    assert down["score"] == down["upvotes"] - down["downvotes"]
+    after = await _post(client)
+    assert (after["upvotes"], after["downvotes"]) == (down["upvotes"], down["downvotes"])
+
+
+async def test_comment_increments_comments_count(client, student):
+    before = (await _post(client))["comments_count"]
+    res = await client.post(f"{API}/posts/1/comments", json={"content": "Gracias"}, headers=student)
+    assert res.status_code == 201
+    assert res.json()["post"]["comments_count"] == before + 1
+    assert (await _post(client))["comments_count"] == before + 1
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.ranking import hot_score
+from tests.conftest import API
+
+
+def test_hot_score_grows_with_votes_and_decays_with_age():
+    now = datetime(2025, 5, 1, tzinfo=timezone.utc)
+    fresh, old = now - timedelta(hours=1), now - timedelta(days=2)
+    assert hot_score(10, 0, fresh, now) > hot_score(1, 0, fresh, now)
+    assert hot_score(10, 0, fresh, now) > hot_score(10, 0, old, now)
+    assert hot_score(0, 5, fresh, now) > hot_score(0, 0, fresh, now)
+
+
+async def _feed(client, sort):
+    return (await client.get(f"{API}/posts", params={"sort": sort, "limit": 100})).json()["items"]
+
+
+@pytest.mark.parametrize("sort,field", [("hot", "hot_score"), ("top", "score"), ("new", "created_at")])
+async def test_feed_is_ordered_by_sort_field(client, sort, field):
+    items = await _feed(client, sort)
+    assert [p[field] for p in items] == sorted((p[field] for p in items), reverse=True)
+
+
+async def test_votes_move_posts_up_the_hot_and_top_feeds(client, prof, student):
+    last = (await _feed(client, "hot"))[-1]["id"]
+    for headers in (prof, student):
+        await client.post(f"{API}/posts/{last}/vote", json={"value": 1}, headers=headers)
+    assert (await _feed(client, "hot"))[0]["id"] == last
+    assert (await _feed(client, "top"))[0]["id"] == last
+
+
+async def test_top_feed_pages_with_cursor(client):
+    first = (await client.get(f"{API}/posts", params={"sort": "top", "limit": 2})).json()
+    rest = (await client.get(
+        f"{API}/posts", params={"sort": "top", "limit": 100, "cursor": first["next_cursor"]},
+    )).json()
+    paged = [p["id"] for p in first["items"] + rest["items"]]
+    assert paged == [p["id"] for p in await _feed(client, "top")]
@@ -0,0 +1,37 @@
+from app.core.text import tokenize
+from tests.conftest import API
+
+
+def test_tokenize_folds_stems_and_drops_stopwords():
+    assert tokenize("Los Apuntes de Álgebra") == tokenize("apunte algebra")
+    assert tokenize("complejidades") == tokenize("complejidad")
+    assert tokenize("de la y") == []
+
+
+async def _create(client, headers, title, body):
+    res = await client.post(f"{API}/posts", headers=headers, json={"community_id": "1", "title": title, "body": body})
+    return res.json()["id"]
+
+
+async def test_search_ranks_title_matches_first_and_pages(client, student):
+    in_body = await _create(client, student, "Duda de final", "Pregunta sobre complejidad algorítmica")
+    in_title = await _create(client, student, "Complejidades algorítmicas", "Ver apunte")
+
+    ranked = [p["id"] for p in (await client.get(f"{API}/posts", params={"q": "complejidad"})).json()["items"]]
+    assert ranked.index(in_title) < ranked.index(in_body)
+
+    paged, cursor = [], None
+    while True:
+        params = {"q": "complejidad", "limit": 1, **({"cursor": cursor} if cursor else {})}
+        page = (await client.get(f"{API}/posts", params=params)).json()
+        paged += [p["id"] for p in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert paged == ranked
+
+
+async def test_search_requires_every_term(client, student):
+    await _create(client, student, "Complejidad", "grafos")
+    res = (await client.get(f"{API}/posts", params={"q": "complejidad inexistentísimo"})).json()
+    assert res["items"] == []
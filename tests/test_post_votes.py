@@ -0,0 +1,78 @@
+import pytest
+
+from app.infra.seed import seed_minimal
+from app.infra.vote_buffer import VoteBuffer
+from app.repositories.memory.comments_repo import CommentsRepo
+from app.repositories.memory.posts_repo import PostsRepo
+from app.repositories.memory.store import MemoryStore
+from app.services.errors import NotFound
+from app.services.posts_service import PostsService
+from tests.conftest import API
+
+
+@pytest.fixture
+async def store() -> MemoryStore:
+    store = MemoryStore()
+    await seed_minimal(store)
+    return store
+
+
+def _service(store: MemoryStore, buffer: VoteBuffer | None = None) -> PostsService:
+    return PostsService(PostsRepo(store), CommentsRepo(store), buffer)
+
+
+async def _noop_flush(votes):
+    return []
+
+
+async def test_buffered_vote_flip_is_scored_against_persisted_vote(store):
+    repo = PostsRepo(store)
+    before = await repo.get("1")
+    await repo.vote(post_id="1", user_id="2", value=1)  # voto ya persistido
+
+    buffer = VoteBuffer(_noop_flush, flush_interval=60, max_batch=500)
+    post = await _service(store, buffer).vote(post_id="1", user_id="2", value=-1)
+
+    assert post["vote_pending"] is True
+    assert post["upvotes"] == before["upvotes"]
+    assert post["downvotes"] == before["downvotes"] + 1
+    assert post["score"] == before["score"] - 1
+    assert buffer.pending == {("1", "2"): -1}
+
+
+async def test_buffered_repeat_vote_does_not_change_score(store):
+    repo = PostsRepo(store)
+    persisted = await repo.vote(post_id="1", user_id="2", value=1)
+    buffer = VoteBuffer(_noop_flush, flush_interval=60, max_batch=500)
+    svc = _service(store, buffer)
+    await svc.vote(post_id="1", user_id="2", value=-1)
+    post = await svc.vote(post_id="1", user_id="2", value=1)
+    assert post["score"] == persisted["score"]
+
+
+async def test_vote_on_missing_post_raises_not_found(store):
+    buffer = VoteBuffer(_noop_flush, flush_interval=60, max_batch=500)
+    with pytest.raises(NotFound):
+        await _service(store, buffer).vote(post_id="999", user_id="2", value=1)
+    assert buffer.pending == {}
+
+
+async def test_vote_route_maps_not_found_to_404(client, student):
+    res = await client.post(f"{API}/posts/999/vote", json={"value": 1}, headers=student)
+    assert res.status_code == 404
+
+
+async def test_unbuffered_vote_on_missing_post_leaves_no_vote(store):
+    with pytest.raises(NotFound):
+        await _service(store).vote(post_id="999", user_id="2", value=1)
+    assert "999" not in store.post_votes
+
+
+async def test_full_buffer_falls_back_to_direct_write(store):
+    buffer = VoteBuffer(_noop_flush, flush_interval=60, max_batch=500, max_pending=1)
+    svc = _service(store, buffer)
+    await svc.vote(post_id="1", user_id="2", value=1)
+    post = await svc.vote(post_id="2", user_id="2", value=1)
+    assert "vote_pending" not in post
+    assert buffer.pending == {("1", "2"): 1}
+    assert store.post_votes["2"]["2"] == 1
@@ -0,0 +1,80 @@
+import asyncio
+import sys
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.core.profiling import ProfilerMiddleware, Sampler, _label
+
+
+@pytest.fixture
+def profiled_app(tmp_path):
+    app = FastAPI()
+
+    @app.get("/lento")
+    async def slow_handler():
+        await asyncio.sleep(0.05)
+        return {"ok": True}
+
+    app.add_middleware(ProfilerMiddleware, token="tok", interval_ms=1, output_dir=str(tmp_path))
+    return app
+
+
+async def _get(app, headers=None):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        return await client.get("/lento", headers=headers or {})
+
+
+async def test_requests_without_the_token_are_not_profiled(profiled_app, tmp_path):
+    for headers in (None, {"X-Profile": "otro"}):
+        res = await _get(profiled_app, headers)
+        assert res.json() == {"ok": True} and "x-profile-id" not in res.headers
+    assert list(tmp_path.iterdir()) == []
+
+
+async def test_profile_is_stored_and_attributes_awaits(profiled_app, tmp_path):
+    res = await _get(profiled_app, {"X-Profile": "tok"})
+    assert res.json() == {"ok": True}
+    stored = (tmp_path / f"{res.headers['x-profile-id']}.folded").read_text()
+    assert stored.startswith("# GET /lento ")
+    assert "slow_handler" in stored
+
+
+async def test_profile_can_replace_the_body(profiled_app):
+    res = await _get(profiled_app, {"X-Profile": "tok", "X-Profile-Return": "folded"})
+    assert res.headers["content-type"].startswith("text/plain")
+    lines = res.text.splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any("slow_handler" in line and "[await " in line for line in lines)
+
+
+async def test_profile_has_samples_and_none_dropped(profiled_app, tmp_path):
+    res = await _get(profiled_app, {"X-Profile": "tok"})
+    header, *stacks = (tmp_path / f"{res.headers['x-profile-id']}.folded").read_text().splitlines()
+    samples = sum(int(line.rsplit(" ", 1)[1]) for line in stacks)
+    assert samples > 0
+    assert header.endswith(f"{samples} muestras, 0 descartadas")
+
+
+def test_label_without_co_qualname():
+    code = SimpleNamespace(co_name="handler", co_filename="/otro/lugar/mod.py", co_firstlineno=7)
+    assert _label(code) == "handler (/otro/lugar/mod.py:7)"
+
+
+def test_overlapping_profiles_restore_the_switch_interval():
+    original = sys.getswitchinterval()
+    loop = asyncio.new_event_loop()
+    try:
+        first = Sampler(None, loop, 0.001, sys._getframe())
+        second = Sampler(None, loop, 0.002, sys._getframe())
+        first.start()
+        second.start()
+        assert sys.getswitchinterval() < original
+        first.stop()  # termina primero el que empezó primero
+        assert sys.getswitchinterval() < original
+        second.stop()
+        assert sys.getswitchinterval() == original
+    finally:
+        loop.close()
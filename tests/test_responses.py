@@ -0,0 +1,56 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from pydantic import BaseModel
+
+from app.core import responses
+from app.core.responses import FastJSONResponse
+from tests.conftest import API
+
+
+class Item(BaseModel):
+    name: str
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_serializes_repo_shapes(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(responses, "orjson", None)
+    elif responses.orjson is None:
+        pytest.skip("orjson no instalado")
+    body = FastJSONResponse({"n": Decimal("1.5"), "tags": {"a"}, "item": Item(name="ñ"), 1: None}).body
+    assert body == '{"n":1.5,"tags":["a"],"item":{"name":"ñ"},"1":null}'.encode()
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_utc_datetimes_keep_offset(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(responses, "orjson", None)
+    elif responses.orjson is None:
+        pytest.skip("orjson no instalado")
+    body = FastJSONResponse({"t": datetime(2025, 3, 1, 12, 0, tzinfo=timezone.utc)}).body
+    assert body == b'{"t":"2025-03-01T12:00:00+00:00"}'
+
+
+async def test_list_endpoints_return_json_pages(client):
+    for path in ("/posts", "/posts/1/comments", "/communities"):
+        res = await client.get(API + path)
+        assert res.status_code == 200
+        assert res.headers["content-type"] == "application/json"
+        assert set(res.json()) == {"items", "next_cursor"}
+
+
+async def test_post_timestamps_match_between_list_and_detail(client):
+    listed = (await client.get(f"{API}/posts", params={"limit": 1})).json()["items"][0]
+    detail = (await client.get(f"{API}/posts/{listed['id']}")).json()
+    assert listed["created_at"] == detail["created_at"]
+
+
+async def test_suggest_schema_is_documented(client):
+    res = await client.get(f"{API}/communities/suggest", params={"prefix": "a"})
+    assert res.status_code == 200
+    assert all(set(item) == {"id", "name", "member_count"} for item in res.json())
+    spec = (await client.get("/openapi.json")).json()
+    schema = spec["paths"][f"{API}/communities/suggest"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert schema["items"]["$ref"].endswith("/CommunitySuggestion")
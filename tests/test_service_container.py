@@ -0,0 +1,34 @@
+from app.api import deps
+from app.api.deps import ServiceContainer
+from app.core.cache import LocalTTLCache
+from app.repositories.memory.store import MemoryStore
+
+
+class FakeSession:
+    closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+def test_services_share_repos_within_a_request():
+    container = ServiceContainer(store=MemoryStore(), cache=LocalTTLCache())
+    assert container.onboarding.users is container.users.users is container.users_repo
+    assert container.onboarding.comms is container.communities.repo
+    assert container.posts.uow is container.users.uow
+
+
+async def test_pg_session_is_opened_only_when_a_repo_needs_it(monkeypatch):
+    monkeypatch.setattr(deps, "BACKEND", "pg")
+    sessions = []
+    container = ServiceContainer(session_factory=lambda: sessions.append(FakeSession()) or sessions[-1])
+
+    container.uow  # la unidad de trabajo no abre la sesión
+    await container.aclose()
+    assert sessions == []
+
+    container.posts
+    container.users
+    assert len(sessions) == 1
+    await container.aclose()
+    assert sessions[0].closed
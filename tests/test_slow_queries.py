@@ -0,0 +1,59 @@
+import json
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.slow_queries import SlowQueryLog, instrument_engine, normalize_sql, parameter_shapes
+
+
+def test_normalize_sql_hides_literals():
+    sql = "SELECT *  FROM post\n WHERE titulo = 'l''algebra' AND post_id = 42 AND $1 > 0.5"
+    assert normalize_sql(sql) == "SELECT * FROM post WHERE titulo = ? AND post_id = ? AND $1 > ?"
+
+
+def test_parameter_shapes_drop_values():
+    assert parameter_shapes({"q": "secreto", "ids": [1, 2], "x": None}) == {
+        "q": "str(7)", "ids": "list[2]<int>", "x": "null",
+    }
+    assert parameter_shapes(("a", 1)) == ["str(1)", "int"]
+
+
+def test_log_keeps_recent_entries_and_filters_by_shape(tmp_path):
+    log_file = tmp_path / "slow.jsonl"
+    file_logger = logging.getLogger("app.db.slow_queries.file")
+    try:
+        log = SlowQueryLog(threshold_ms=100, max_entries=2, log_file=str(log_file))
+        for shape in ("A", "B", "A"):
+            log.record(shape=shape, statement="SELECT 1", parameters={}, seconds=0.2)
+    finally:
+        for handler in file_logger.handlers[:]:
+            handler.close()
+            file_logger.removeHandler(handler)
+    assert [e["shape"] for e in log.snapshot()] == ["A", "B"]
+    assert [e["id"] for e in log.snapshot(shape="A")] == [3]
+    assert log.recorded == 3
+    log.clear()
+    assert log.snapshot() == []
+    assert [json.loads(line)["shape"] for line in log_file.read_text().splitlines()] == ["A", "B", "A"]
+
+
+def test_explain_only_samples_reads():
+    log = SlowQueryLog(threshold_ms=0, explain_sample_rate=1.0, explain_cooldown=60)
+    assert not log._should_explain("w", "UPDATE post SET score = 1")
+    assert not log._should_explain("w", "WITH x AS (DELETE FROM post RETURNING 1) SELECT 1")
+    assert log._should_explain("r", "SELECT 1")
+    assert not log._should_explain("r", "SELECT 1")  # cooldown por forma
+
+
+async def test_engine_records_statements_over_threshold(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 's.sqlite'}")
+    log = SlowQueryLog(threshold_ms=0, explain_sample_rate=1.0)
+    instrument_engine(engine, log)
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT :v").execution_options(query_shape="Tests.slow"), {"v": 1})
+    finally:
+        await engine.dispose()
+    entry = log.snapshot(shape="Tests.slow")[0]
+    assert entry["sql"] == "SELECT ?" and entry["explain"] is None  # EXPLAIN sólo en Postgres
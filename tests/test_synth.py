@@ -0,0 +1,45 @@
+from collections import Counter
+from datetime import datetime, timezone
+
+from app.infra.seed import seed_minimal
+from app.infra.synth import SynthConfig, populate_memory
+from app.repositories.memory.store import MemoryStore
+
+NOW = datetime(2025, 6, 1, tzinfo=timezone.utc)
+CONFIG = SynthConfig(users=30, communities=5, posts=60)
+
+
+async def _populated():
+    store = MemoryStore()
+    await seed_minimal(store)
+    counts = await populate_memory(store, CONFIG, now=NOW)
+    return store, counts
+
+
+async def test_counts_and_denormalized_counters_are_consistent():
+    store, counts = await _populated()
+    synth_posts = [p for p in store.posts.values() if int(p["id"]) > 3]
+    assert counts["post"] == len(synth_posts) == CONFIG.posts
+    assert counts["usuario"] == CONFIG.users and counts["comunidad"] == CONFIG.communities
+
+    comments = Counter(c["post_id"] for c in store.comments.values())
+    for post in synth_posts:
+        votes = store.post_votes.get(post["id"], {}).values()
+        assert post["upvotes"] == sum(v == 1 for v in votes)
+        assert post["downvotes"] == sum(v == -1 for v in votes)
+        assert post["score"] == post["upvotes"] - post["downvotes"]
+        assert post["comments_count"] == comments[post["id"]]
+    assert all(c["parent_id"] is None or c["parent_id"] in store.comments for c in store.comments.values())
+
+
+async def test_generation_is_deterministic_and_ids_keep_advancing():
+    a, _ = await _populated()
+    b, _ = await _populated()
+    assert [p["title"] for p in a.posts.values()] == [p["title"] for p in b.posts.values()]
+    assert a.next_id("post") not in a.posts
+    assert a.next_id("comentario") not in a.comments
+
+
+def test_scaled_grows_communities_with_the_square_root():
+    scaled = SynthConfig().scaled(4)
+    assert scaled.users == 40_000 and scaled.posts == 400_000 and scaled.communities == 400
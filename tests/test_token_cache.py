@@ -0,0 +1,42 @@
+import jwt
+import pytest
+
+from app.core import security
+from app.core.cache import LocalTTLCache
+from app.core.security import create_access_token, decode_token_cached
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(security, "_token_cache", LocalTTLCache())
+
+
+async def test_valid_tokens_are_verified_once(monkeypatch):
+    token = create_access_token("7")
+    calls = []
+    real = security.decode_token
+    monkeypatch.setattr(security, "decode_token", lambda t: calls.append(t) or real(t))
+    assert (await decode_token_cached(token))["sub"] == "7"
+    assert (await decode_token_cached(token))["sub"] == "7"
+    assert calls == [token]
+
+
+async def test_invalid_tokens_are_never_cached():
+    token = create_access_token("7")[:-2] + "xx"
+    for _ in range(2):
+        with pytest.raises(jwt.InvalidTokenError):
+            await decode_token_cached(token)
+    assert await security._token_cache.get(token) is None
+
+
+async def test_cache_entry_does_not_outlive_exp(monkeypatch):
+    monkeypatch.setattr(security.settings, "token_cache_ttl", 300.0)
+    stored = {}
+
+    async def fake_set(key, value, ttl):
+        stored[key] = ttl
+
+    monkeypatch.setattr(security._token_cache, "set", fake_set)
+    token = create_access_token("7", minutes=1)
+    await decode_token_cached(token)
+    assert 0 < stored[token] <= 60
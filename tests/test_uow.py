@@ -0,0 +1,162 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.cache import LocalTTLCache
+from app.db.uow import NullUnitOfWork, UnitOfWork
+from app.infra.seed import seed_minimal
+from app.repositories.cached import CachedCommunitiesRepo, CachedPostsRepo, community_key, post_key
+from app.repositories.memory.communities_repo import CommunitiesRepo
+from app.repositories.memory.posts_repo import PostsRepo
+from app.repositories.memory.store import MemoryStore
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'uow.sqlite'}")
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE t (v INTEGER)"))
+    yield engine
+    await engine.dispose()
+
+
+async def _values(engine):
+    async with engine.connect() as conn:
+        return [r[0] for r in await conn.execute(text("SELECT v FROM t ORDER BY v"))]
+
+
+async def test_outer_transaction_commits_once(engine):
+    async with AsyncSession(engine) as session:
+        uow = UnitOfWork(lambda: session)
+        async with uow.transaction():
+            assert uow.active
+            await session.execute(text("INSERT INTO t VALUES (1)"))
+            await session.execute(text("INSERT INTO t VALUES (2)"))
+            assert await _values(engine) == []  # nada visible antes del COMMIT
+        assert not uow.active
+    assert await _values(engine) == [1, 2]
+
+
+async def test_exception_rolls_back_everything(engine):
+    async with AsyncSession(engine) as session:
+        uow = UnitOfWork(lambda: session)
+        with pytest.raises(RuntimeError):
+            async with uow.transaction():
+                await session.execute(text("INSERT INTO t VALUES (1)"))
+                raise RuntimeError
+        assert not uow.active
+    assert await _values(engine) == []
+
+
+async def test_nested_failure_only_undoes_its_savepoint(engine):
+    async with AsyncSession(engine) as session:
+        uow = UnitOfWork(lambda: session)
+        async with uow.transaction():
+            await session.execute(text("INSERT INTO t VALUES (1)"))
+            with pytest.raises(RuntimeError):
+                async with uow.transaction():
+                    await session.execute(text("INSERT INTO t VALUES (2)"))
+                    raise RuntimeError
+            await session.execute(text("INSERT INTO t VALUES (3)"))
+    assert await _values(engine) == [1, 3]
+
+
+async def test_null_unit_of_work_is_a_no_op():
+    uow = NullUnitOfWork()
+    async with uow.transaction() as tx:
+        assert tx is None
+    assert not uow.active
+
+
+@pytest.fixture
+async def session():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with AsyncSession(engine) as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.fixture
+async def store() -> MemoryStore:
+    store = MemoryStore()
+    await seed_minimal(store)
+    return store
+
+
+async def test_after_commit_runs_only_after_commit(session):
+    uow, ran = UnitOfWork(lambda: session), []
+
+    async def callback():
+        ran.append(uow.active)
+
+    async with uow.transaction():
+        await uow.after_commit(callback)
+        assert ran == []
+    assert ran == [False]
+
+
+async def test_after_commit_discarded_on_rollback(session):
+    uow, ran = UnitOfWork(lambda: session), []
+
+    async def callback():
+        ran.append(1)
+
+    with pytest.raises(RuntimeError):
+        async with uow.transaction():
+            await uow.after_commit(callback)
+            raise RuntimeError
+    assert ran == []
+
+
+async def test_nested_savepoint_rollback_drops_only_its_callbacks(session):
+    uow, ran = UnitOfWork(lambda: session), []
+
+    def cb(name):
+        async def callback():
+            ran.append(name)
+        return callback
+
+    async with uow.transaction():
+        await uow.after_commit(cb("outer"))
+        async with uow.transaction():
+            await uow.after_commit(cb("inner-ok"))
+        with pytest.raises(RuntimeError):
+            async with uow.transaction():
+                await uow.after_commit(cb("inner-failed"))
+                raise RuntimeError
+    assert ran == ["outer", "inner-ok"]
+
+
+async def test_after_commit_outside_transaction_runs_immediately(session):
+    ran = []
+
+    async def callback():
+        ran.append(1)
+
+    await UnitOfWork(lambda: session).after_commit(callback)
+    await NullUnitOfWork().after_commit(callback)
+    assert ran == [1, 1]
+
+
+async def test_cache_invalidation_waits_for_commit(session, store):
+    cache, uow = LocalTTLCache(), UnitOfWork(lambda: session)
+    posts = CachedPostsRepo(PostsRepo(store), cache, 60, uow=uow)
+    comms = CachedCommunitiesRepo(CommunitiesRepo(store), cache, 60, uow=uow)
+    await posts.get("1")
+    await comms.get("1")
+
+    with pytest.raises(RuntimeError):
+        async with uow.transaction():
+            await posts.delete("1")
+            await comms.join("1", "3")
+            raise RuntimeError
+    assert await cache.get(post_key("1")) is not None
+    assert await cache.get(community_key("1")) is not None
+
+    async with uow.transaction():
+        await posts.vote(post_id="1", user_id="2", value=1)
+        await comms.leave("1", "2")
+        assert (await cache.get(post_key("1")))[1]["upvotes"] == 0  # todavía la versión previa
+        assert await cache.get(community_key("1")) is not None
+    assert (await cache.get(post_key("1")))[1]["upvotes"] == 1
+    assert await cache.get(community_key("1")) is None
@@ -0,0 +1,160 @@
+import asyncio
+
+import pytest
+
+from app.infra.vote_buffer import VoteBuffer, VoteBufferFull
+
+
+def _buffer(flush_fn, **kwargs) -> VoteBuffer:
+    return VoteBuffer(flush_fn, flush_interval=kwargs.pop("flush_interval", 60), max_batch=500, **kwargs)
+
+
+async def _noop_flush(votes):
+    return []
+
+
+async def test_coalesces_votes_per_post_and_user():
+    flushed = []
+
+    async def flush_fn(votes):
+        flushed.extend(votes)
+        return [pid for pid, _, _ in votes]
+
+    buf = _buffer(flush_fn)
+    assert buf.add("1", "u1", 1) == 0
+    assert buf.add("1", "u1", -1) == 1
+    buf.add("2", "u1", 1)
+    assert await buf.flush() == 2
+    assert flushed == [("1", "u1", -1), ("2", "u1", 1)]
+    assert buf.pending == {}
+
+
+async def test_failed_flush_requeues_without_overwriting_newer_votes():
+    calls = 0
+
+    async def flush_fn(votes):
+        nonlocal calls
+        calls += 1
+        buf.add("1", "u1", -1)  # llega un voto más nuevo durante el volcado
+        raise RuntimeError("db caída")
+
+    buf = _buffer(flush_fn)
+    buf.add("1", "u1", 1)
+    buf.add("2", "u1", 1)
+    with pytest.raises(RuntimeError):
+        await buf.flush()
+    assert buf.pending == {("1", "u1"): -1, ("2", "u1"): 1}
+    assert buf.failed_flushes == 1
+
+
+async def test_cancelled_flush_requeues_batch():
+    started = asyncio.Event()
+
+    async def flush_fn(votes):
+        started.set()
+        await asyncio.sleep(10)
+
+    buf = _buffer(flush_fn)
+    buf.add("1", "u1", 1)
+    task = asyncio.create_task(buf.flush())
+    await started.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert buf.pending == {("1", "u1"): 1}
+
+
+async def test_stop_waits_for_inflight_flush():
+    started, release = asyncio.Event(), asyncio.Event()
+    flushed = []
+
+    async def flush_fn(votes):
+        started.set()
+        await release.wait()
+        flushed.extend(votes)
+        return []
+
+    buf = _buffer(flush_fn, flush_interval=0.01)
+    buf.start()
+    buf.add("1", "u1", 1)
+    await started.wait()
+    stopping = asyncio.create_task(buf.stop())
+    await asyncio.sleep(0.05)
+    release.set()
+    await stopping
+    assert flushed == [("1", "u1", 1)]
+    assert buf.pending == {}
+
+
+async def test_stop_retries_and_keeps_votes_when_flush_keeps_failing():
+    calls = 0
+
+    async def flush_fn(votes):
+        nonlocal calls
+        calls += 1
+        if calls < 3:
+            raise RuntimeError("db caída")
+        return []
+
+    buf = _buffer(flush_fn)
+    buf.add("1", "u1", 1)
+    await buf.stop(retries=3, retry_delay=0)
+    assert calls == 3 and buf.pending == {}
+
+    async def always_fails(votes):
+        raise RuntimeError("db caída")
+
+    buf = _buffer(always_fails)
+    buf.add("1", "u1", 1)
+    await buf.stop(retries=2, retry_delay=0)  # no re-lanza
+    assert buf.pending == {("1", "u1"): 1}
+
+
+async def test_repeated_failures_isolate_and_drop_bad_votes():
+    flushed = []
+
+    async def flush_fn(votes):
+        if ("2", "borrado", 1) in votes:
+            raise RuntimeError("usuario inexistente")
+        flushed.extend(votes)
+        return [pid for pid, _, _ in votes]
+
+    buf = _buffer(flush_fn, max_failures=2)
+    for pid in "1234":
+        buf.add(pid, "u1", 1)
+    buf.add("2", "borrado", 1)
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await buf.flush()
+    assert len(buf.pending) == 5
+
+    assert await buf.flush() == 4
+    assert sorted(flushed) == [(pid, "u1", 1) for pid in "1234"]
+    assert buf.pending == {} and buf.dropped_votes == 1 and buf.flushed_votes == 4
+
+
+async def test_isolation_keeps_votes_when_the_database_is_down():
+    calls = 0
+
+    async def flush_fn(votes):
+        nonlocal calls
+        calls += 1
+        raise RuntimeError("db caída")
+
+    buf = _buffer(flush_fn, max_failures=0)
+    for pid in range(64):
+        buf.add(str(pid), "u1", 1)
+    with pytest.raises(RuntimeError):
+        await buf.flush()
+    assert len(buf.pending) == 64 and buf.dropped_votes == 0
+    assert calls <= 10  # se corta en vez de probar voto por voto
+
+
+async def test_add_rejects_new_votes_over_max_pending():
+    buf = _buffer(_noop_flush, max_pending=2)
+    buf.add("1", "u1", 1)
+    buf.add("2", "u1", 1)
+    with pytest.raises(VoteBufferFull):
+        buf.add("3", "u1", 1)
+    assert buf.add("1", "u1", -1) == 1  # reemplazar uno pendiente no crece
+    assert len(buf.pending) == 2